@@ -1,10 +1,23 @@
-import requests
 import json
 import time
-import random
-from cninfo_db import CninfoAnnouncementDB
-from driverController import DriverController
+from cninfo_db import CninfoAnnouncementDB, BufferedRecordWriter
+from driverPool import DriverPool
+from cninfo_session import CninfoSession
+from cninfo_async import AsyncPageFetcher
+import common_path  # noqa: F401 (共用模块目录加入sys.path)
+from rate_limiter import get_limiter
+from cninfo_shard import ShardPlanner
+from cninfo_pipeline import CninfoPipeline
+from cninfo_checkpoint import CrawlCheckpoint
+from blob_store import BlobStore
+from file_manifest import FileManifest
+from file_downloader import FileDownloader
+from text_index import TextIndex
+import threading
 import os
+import re
+import logging
+from datetime import datetime, timedelta, timezone
 from selenium.webdriver.common.by import By
 
 
@@ -27,23 +40,180 @@ class Cninfo:
         "Sec-Fetch-Site": "same-origin",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36",
         "X-Requested-With": "XMLHttpRequest",
-        "Cookie": "JSESSIONID=; insert_cookie=",
     }
     """
     默认爬取url
     """
     QUERY_URL = "https://www.cninfo.com.cn/new/hisAnnouncement/query"
+    """
+    公告时间所在时区(北京时间)
+    """
+    TIMEZONE = timezone(timedelta(hours=8))
+    """
+    公告详情页url
+    """
+    DETAIL_URL = "https://www.cninfo.com.cn/new/disclosure/detail?"
+    """
+    公告PDF静态文件地址，与查询结果中的adjunctUrl拼接即为下载地址
+    """
+    STATIC_URL = "https://static.cninfo.com.cn/"
+    """
+    静态文件下载Headers设置
+    """
+    DOWNLOAD_HEADERS = {
+        "Accept": "application/pdf,*/*",
+        "Accept-Language": "zh-CN,zh;q=0.9",
+        "Connection": "keep-alive",
+        "Referer": "https://www.cninfo.com.cn/",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36",
+    }
 
-    def __init__(self):
+    def __init__(self, download_mode="http", pool_size=1, concurrency=4):
         """
         Cninfo类初始化
         db: 初始化/提取文件路径下 公告存储数据库
         searchKey: 初始化公告下载关键词 - 用于灵活搜索
         plate: 初始化公告下载筛选板块 - 用于灵活搜索
+        download_mode: 文件下载方式
+            - "http": 直接根据adjunctUrl下载PDF，失败时回退到浏览器下载
+            - "browser": 仅使用浏览器打开详情页点击下载
+        pool_size: 浏览器池大小，浏览器下载时复用池中的浏览器
+        concurrency: 列表页并发请求数，大于1时使用异步翻页引擎
+        checkpoint: 抓取断点记录，已完成的页码在记录写入数据库后保存
+        blob_store: 公告文件按内容哈希分层存储，相同内容只保存一份
+        manifest: 已保存文件清单(内存索引)，文件是否存在不再逐个访问文件系统
+        file_downloader: HTTP流式下载器(断点续传、大小校验)
         """
         self.db = CninfoAnnouncementDB("cninfo_file/announcements.db")
+        self.writer = BufferedRecordWriter(self.db)
+        self.checkpoint = CrawlCheckpoint(self.db.db_path)
+        self._done_pages = {}
+        self._done_pages_lock = threading.Lock()
+        self.writer.add_flush_callback(self._save_done_pages)
+        self.blob_store = BlobStore("cninfo_file/blobs")
+        self.manifest = FileManifest(self.db.db_path)
         self.searchKey = ""
         self.plate = ""
+        self.download_mode = download_mode
+        self.pool_size = pool_size
+        self._driver_pools = {}
+        self.concurrency = concurrency
+        self.session = CninfoSession(pool_size=max(10, concurrency))
+        # 会话本身已按host限速
+        self.file_downloader = FileDownloader(self.session, rate_limit=False)
+        self._prepared_dirs = set()
+        self.logger = logging.getLogger("Cninfo")
+
+    def get_driver_pool(self, download_dir="cninfo_file/announcements"):
+        """
+        获取指定下载目录对应的浏览器池，不存在时创建
+
+        参数:
+            download_dir (str): 文件下载目录
+
+        返回:
+            DriverPool: 浏览器池
+        """
+        pool = self._driver_pools.get(download_dir)
+        if pool is None:
+            pool = DriverPool(size=self.pool_size, download_dir=download_dir)
+            self._driver_pools[download_dir] = pool
+        return pool
+
+    def prepare_download_dir(self, download_dir):
+        """
+        首次使用下载目录时: 清理崩溃残留的临时文件(.crdownload及过期的.part)，
+        并把目录中已有的文件登记到文件清单
+
+        参数:
+            download_dir (str): 文件下载目录
+        """
+        if download_dir in self._prepared_dirs:
+            return
+        self._prepared_dirs.add(download_dir)
+        os.makedirs(download_dir, exist_ok=True)
+        FileDownloader.cleanup(download_dir, logger=self.logger)
+        self.manifest.scan_directory(download_dir)
+
+    def close(self):
+        """
+        写入缓冲区中的记录并关闭所有浏览器池，程序退出前调用
+        """
+        self.writer.close()
+        for pool in self._driver_pools.values():
+            pool.close()
+        self._driver_pools = {}
+        self.session.close()
+        self.checkpoint.close()
+        self.manifest.close()
+        self.db.close()
+
+    def record_exists(self, announcement_id):
+        """
+        检查公告是否已保存(包括缓冲区中尚未写入数据库的记录)
+
+        参数:
+            announcement_id (str): 公告ID
+
+        返回:
+            bool: 是否已保存
+        """
+        return self.db.record_exists(announcement_id) or self.writer.is_pending(
+            announcement_id
+        )
+
+    def crawl_key(self, start_date, end_date):
+        """
+        当前查询条件对应的断点key
+
+        参数:
+            start_date (str): 开始日期(YYYY-MM-DD格式)
+            end_date (str): 结束日期(YYYY-MM-DD格式)
+
+        返回:
+            str: 断点key
+        """
+        return CrawlCheckpoint.make_key(
+            "szse", self.plate, self.searchKey, f"{start_date}~{end_date}"
+        )
+
+    def mark_page_done(self, crawl_key, page_num):
+        """
+        标记页面已处理完成，下次缓冲区写入数据库后保存到断点
+
+        参数:
+            crawl_key (str): 断点key
+            page_num (int): 页码
+        """
+        with self._done_pages_lock:
+            self._done_pages.setdefault(crawl_key, set()).add(page_num)
+
+    def _save_done_pages(self):
+        """
+        缓冲写入器的回调: 记录已写入数据库后保存已完成的页码
+        """
+        with self._done_pages_lock:
+            done_pages, self._done_pages = self._done_pages, {}
+        for crawl_key, page_nums in done_pages.items():
+            self.checkpoint.mark_pages(crawl_key, page_nums)
+
+    def finish_crawl(self, crawl_key, page_nums):
+        """
+        写入缓冲区并检查页面是否都已完成，全部完成时清除断点
+
+        参数:
+            crawl_key (str): 断点key
+            page_nums (iterable): 本次抓取的全部页码
+
+        返回:
+            bool: 是否全部完成
+        """
+        self.writer.flush()
+        if set(page_nums) - self.checkpoint.completed_pages(crawl_key):
+            print("crawl not finished, run again with resume to continue")
+            return False
+        self.checkpoint.clear(crawl_key)
+        return True
 
     def edit_payload(self, searchKey, plate):
         """
@@ -56,53 +226,94 @@ class Cninfo:
         self.searchKey = searchKey
         self.plate = plate
 
-    def query_get(self, start_date, end_date):
+    def build_payload(
+        self,
+        start_date,
+        end_date,
+        page_num=1,
+        filtered=True,
+        sort_name="",
+        sort_type="",
+    ):
         """
-        查询指定日期范围内的公告总页数
+        构造公告查询参数
 
         参数:
             start_date (str): 开始日期(YYYY-MM-DD格式)
             end_date (str): 结束日期(YYYY-MM-DD格式)
+            page_num (int): 页码，默认1
+            filtered (bool): 是否使用当前设置的关键词和板块，默认True
+            sort_name (str): 排序字段，如"time"，默认为空(服务端默认排序)
+            sort_type (str): 排序方式"asc"/"desc"，默认为空
 
         返回:
-            int: 总页数，查询失败返回None
+            dict: 查询参数
         """
-        # payload
-        payload = {
-            "pageNum": "1",
+        return {
+            "pageNum": f"{page_num}",
             "pageSize": "30",
             "column": "szse",
             "tabName": "fulltext",
-            "plate": self.plate,  # "",
+            "plate": self.plate if filtered else "",
             "stock": "",
-            "searchkey": self.searchKey,  # "",
+            "searchkey": self.searchKey if filtered else "",
             "secid": "",
             "category": "",
             "trade": "",
             "seDate": f"{start_date}~{end_date}",
-            "sortName": "",
-            "sortType": "",
+            "sortName": sort_name,
+            "sortType": sort_type,
             "isHLtitle": "true",
         }
 
-        response = requests.post(
-            url=self.QUERY_URL, headers=self.DEFAULT_HEADERS, data=payload
-        )
+    def post_query(self, payload):
+        """
+        发送公告查询请求(共享会话，连接复用，失败自动重试)
+
+        参数:
+            payload (dict): 查询参数
+
+        返回:
+            dict: 解析后的查询结果，查询失败返回None
+        """
+        self.session.warm_up(headers=self.DEFAULT_HEADERS)
+        try:
+            response = self.session.post(
+                url=self.QUERY_URL, headers=self.DEFAULT_HEADERS, data=payload
+            )
+        except Exception as e:
+            print(f"请求失败：{e}")
+            return None
 
         if response.status_code == 200:
-            data = response.text
-            data = json.loads(data)
-            total_record = data["totalRecordNum"]
-            total_announcement = data["totalAnnouncement"]
-            total_page = data["totalpages"]
-            print(f"total records: {total_record}")
-            print(f"total announcements: {total_announcement}")
-            print(f"total pages: {total_page}")
-            return total_page
+            return json.loads(response.text)
         else:
             print(f"请求失败，状态码：{response.status_code}")
             return None
 
+    def query_get(self, start_date, end_date):
+        """
+        查询指定日期范围内的公告总页数
+
+        参数:
+            start_date (str): 开始日期(YYYY-MM-DD格式)
+            end_date (str): 结束日期(YYYY-MM-DD格式)
+
+        返回:
+            int: 总页数，查询失败返回None
+        """
+        data = self.post_query(self.build_payload(start_date, end_date))
+        if data is None:
+            return None
+
+        total_record = data["totalRecordNum"]
+        total_announcement = data["totalAnnouncement"]
+        total_page = data["totalpages"]
+        print(f"total records: {total_record}")
+        print(f"total announcements: {total_announcement}")
+        print(f"total pages: {total_page}")
+        return total_page
+
     def query_record(self, date):
         """
         查询指定日期的公告总数
@@ -113,112 +324,341 @@ class Cninfo:
         返回:
             int: 公告总数，查询失败返回None
         """
-        # payload
-        payload = {
-            "pageNum": "1",
-            "pageSize": "30",
-            "column": "szse",
-            "tabName": "fulltext",
-            "plate": "",
-            "stock": "",
-            "searchkey": "",
-            "secid": "",
-            "category": "",
-            "trade": "",
-            "seDate": f"{date}~{date}",
-            "sortName": "",
-            "sortType": "",
-            "isHLtitle": "true",
-        }
-
-        response = requests.post(
-            url=self.QUERY_URL, headers=self.DEFAULT_HEADERS, data=payload
-        )
-
-        if response.status_code == 200:
-            data = response.text
-            data = json.loads(data)
-            total_record = data["totalRecordNum"]
-            total_announcement = data["totalAnnouncement"]
-            total_page = data["totalpages"]
-            print(f"total records: {total_record}")
-            print(f"total announcements: {total_announcement}")
-            print(f"total pages: {total_page}")
-            return total_record
-        else:
-            print(f"请求失败，状态码：{response.status_code}")
+        data = self.post_query(self.build_payload(date, date, filtered=False))
+        if data is None:
             return None
 
-    def query_all(self, start_date, end_date, total_page, max_save_cnt=100, max_fail=5):
+        total_record = data["totalRecordNum"]
+        total_announcement = data["totalAnnouncement"]
+        total_page = data["totalpages"]
+        print(f"total records: {total_record}")
+        print(f"total announcements: {total_announcement}")
+        print(f"total pages: {total_page}")
+        return total_record
+
+    def query_all(
+        self,
+        start_date,
+        end_date,
+        total_page,
+        max_save_cnt=100,
+        max_fail=5,
+        start_page=1,
+        resume=False,
+    ):
         """
         下载指定日期范围内的所有公告
 
         参数:
             start_date (str): 开始日期(YYYY-MM-DD格式)
             end_date (str): 结束日期(YYYY-MM-DD格式)
-            total_page (int): 总页数
+            total_page (int): 总页数(最后一页页码)
             max_save_cnt (int): 最大保存文件数，默认100
             max_fail (int): 最大失败次数，默认5
+            start_page (int): 起始页码，默认1
+            resume (bool): 是否跳过断点中已完成的页面，默认False
+
+        返回:
+            int: 下载文件数
         """
         # payload
         total_save_cnt = 0
         total_fail_cnt = 0
+        crawl_key = self.crawl_key(start_date, end_date)
+        done_pages = self.checkpoint.completed_pages(crawl_key) if resume else set()
         # for i in range(1, 2):
-        for i in range(1, total_page + 1):
+        for i in range(start_page, total_page + 1):
+            if i in done_pages:
+                continue
             if total_fail_cnt >= max_fail:
                 print("program has failed to much")
                 break
             if total_save_cnt >= max_save_cnt:
                 print(f"program have save enough files: {total_save_cnt} files")
-            time.sleep(random.randint(1, 2))
-            payload = {
-                "pageNum": f"{i}",
-                "pageSize": "30",
-                "column": "szse",
-                "tabName": "fulltext",
-                "plate": self.plate,  # "",
-                "stock": "",
-                "searchkey": self.searchKey,  # "",
-                "secid": "",
-                "secid": "",
-                "category": "",
-                "trade": "",
-                "seDate": f"{start_date}~{end_date}",
-                "sortName": "",
-                "sortType": "",
-                "isHLtitle": "true",
-            }
-
-            response = requests.post(
-                url=self.QUERY_URL, headers=self.DEFAULT_HEADERS, data=payload
-            )
+            payload = self.build_payload(start_date, end_date, page_num=i)
 
-            if response.status_code == 200:
-                data = response.text
-                data = json.loads(data)
+            data = self.post_query(payload)
+            if data is not None:
                 success, page_save_cnt = self.save_page(
                     data,
                 )
                 total_save_cnt += page_save_cnt
                 if success == False:
                     total_fail_cnt += 1
+                else:
+                    self.mark_page_done(crawl_key, i)
                 print(f"page {i} have download {page_save_cnt} files")
 
         print(f"total download files cnt: {total_save_cnt}")
+        return total_save_cnt
+
+    def query_all_async(
+        self,
+        start_date,
+        end_date,
+        total_page,
+        max_save_cnt=100,
+        max_fail=5,
+        resume=False,
+    ):
+        """
+        并发抓取指定日期范围内的所有列表页并下载公告，页面返回后立即处理
+
+        参数:
+            start_date (str): 开始日期(YYYY-MM-DD格式)
+            end_date (str): 结束日期(YYYY-MM-DD格式)
+            total_page (int): 总页数
+            max_save_cnt (int): 最大保存文件数，默认100
+            max_fail (int): 最大失败次数，默认5
+            resume (bool): 是否跳过断点中已完成的页面，默认False
+        """
+        totals = {"save": 0, "fail": 0}
+        crawl_key = self.crawl_key(start_date, end_date)
+        done_pages = self.checkpoint.completed_pages(crawl_key) if resume else set()
+
+        def handle_page(page_num, data):
+            if data is None:
+                return True
+            if totals["save"] >= max_save_cnt:
+                print(f"program have save enough files: {totals['save']} files")
+            success, page_save_cnt = self.save_page(data)
+            totals["save"] += page_save_cnt
+            if success == False:
+                totals["fail"] += 1
+            else:
+                self.mark_page_done(crawl_key, page_num)
+            print(f"page {page_num} have download {page_save_cnt} files")
+            if totals["fail"] >= max_fail:
+                print("program has failed to much")
+                return False
+            return True
+
+        fetcher = AsyncPageFetcher(self, concurrency=self.concurrency)
+        pages = [i for i in range(1, total_page + 1) if i not in done_pages]
+        fetcher.run_sync(start_date, end_date, pages, handle_page)
+        print(f"total download files cnt: {totals['save']}")
 
-    def query(self, start_date, end_date):
+    def query(self, start_date, end_date, resume=False):
         """
         查询并下载指定日期范围内的公告
 
         参数:
             start_date (str): 开始日期(YYYY-MM-DD格式)
             end_date (str): 结束日期(YYYY-MM-DD格式)
+            resume (bool): 是否从上次中断处继续，默认False
         """
         total_page = self.query_get(start_date, end_date)
-        if total_page > 0:
-            self.query_all(start_date, end_date, total_page)
+        if total_page and self.concurrency > 1:
+            self.query_all_async(start_date, end_date, total_page, resume=resume)
+        elif total_page:
+            self.query_all(start_date, end_date, total_page, resume=resume)
+        else:
+            print("no data has found")
+            self.writer.flush()
+            return
+        self.finish_crawl(
+            self.crawl_key(start_date, end_date), range(1, total_page + 1)
+        )
+
+    def query_sharded(
+        self, start_date, end_date, workers=4, resume=False, **query_kwargs
+    ):
+        """
+        按公告数量把日期区间切分为分片，并行查询并下载(适用于跨度较长的日期区间)
+
+        参数:
+            start_date (str): 开始日期(YYYY-MM-DD格式)
+            end_date (str): 结束日期(YYYY-MM-DD格式)
+            workers (int): 并行worker数，默认4
+            resume (bool): 是否跳过断点中已完成的分片和页面，默认False
+            query_kwargs: 透传给query_all的参数(如max_save_cnt/max_fail)
+
+        返回:
+            dict: {分片id: 下载文件数}，失败的分片为None
+        """
+        planner = ShardPlanner(self, workers=workers)
+        shards = planner.plan(start_date, end_date)
+        if not shards:
+            print("no data has found")
+            return {}
+        crawl_key = self.crawl_key(start_date, end_date)
+        done_shards = self.checkpoint.completed_shards(crawl_key) if resume else set()
+        for shard in shards:
+            print(f"shard {shard['id']}: {shard['records']} records")
+
+        def on_shard_done(shard, saved, error):
+            # 分片内的页面都已完成才记录分片，记录先写入数据库
+            shard_key = self.crawl_key(shard["start_date"], shard["end_date"])
+            self.writer.flush()
+            pages = range(shard["start_page"], shard["end_page"] + 1)
+            if error or set(pages) - self.checkpoint.completed_pages(shard_key):
+                return
+            self.checkpoint.mark_shard(crawl_key, shard["id"], saved)
+
+        results = planner.run(
+            [shard for shard in shards if shard["id"] not in done_shards],
+            on_shard_done=on_shard_done,
+            resume=resume,
+            **query_kwargs,
+        )
+        self.writer.flush()
+        saved = sum(cnt for cnt in results.values() if cnt)
+        print(f"total download files cnt: {saved}")
+        if {shard["id"] for shard in shards} - self.checkpoint.completed_shards(
+            crawl_key
+        ):
+            print("crawl not finished, run again with resume to continue")
         else:
+            for shard in shards:
+                self.checkpoint.clear(
+                    self.crawl_key(shard["start_date"], shard["end_date"])
+                )
+            self.checkpoint.clear(crawl_key)
+        return results
+
+    def query_pipelined(self, start_date, end_date, resume=False, **pipeline_kwargs):
+        """
+        以流水线方式查询并下载指定日期范围内的公告
+        (列表抓取、记录整理、文件下载、数据库写入同时进行)
+
+        参数:
+            start_date (str): 开始日期(YYYY-MM-DD格式)
+            end_date (str): 结束日期(YYYY-MM-DD格式)
+            resume (bool): 是否跳过断点中已完成的页面，默认False
+            pipeline_kwargs: 透传给CninfoPipeline的参数(如各阶段worker数、队列长度)
+
+        返回:
+            dict: 流水线统计数据
+        """
+        total_page = self.query_get(start_date, end_date)
+        if not total_page:
             print("no data has found")
+            return {}
+        stats = CninfoPipeline(self, **pipeline_kwargs).run(
+            start_date, end_date, total_page, resume=resume
+        )
+        print(f"total download files cnt: {stats.get('saved', 0)}")
+        self.finish_crawl(
+            self.crawl_key(start_date, end_date), range(1, total_page + 1)
+        )
+        return stats
+
+    def tail_once(
+        self, start_date=None, end_date=None, stop_after_known=30, max_pages=50
+    ):
+        """
+        增量同步一次: 按公告时间倒序翻页，连续遇到stop_after_known条已保存的公告时停止
+
+        参数:
+            start_date (str): 开始日期(YYYY-MM-DD格式)，默认当天
+            end_date (str): 结束日期(YYYY-MM-DD格式)，默认当天
+            stop_after_known (int): 连续已保存公告数达到该值时停止翻页，默认30
+            max_pages (int): 单次同步最多翻页数，默认50
+
+        返回:
+            int: 下载文件数
+        """
+        today = datetime.now(self.TIMEZONE).strftime("%Y-%m-%d")
+        start_date = start_date or today
+        end_date = end_date or today
+        total_save_cnt = 0
+        known_cnt = 0
+        for i in range(1, max_pages + 1):
+            payload = self.build_payload(
+                start_date, end_date, page_num=i, sort_name="time", sort_type="desc"
+            )
+            data = self.post_query(payload)
+            if data is None:
+                print(f"page {i} query failed, stop tail sync")
+                break
+            announcements = data.get("announcements") or []
+            # 查重需在保存本页之前进行(保存后新公告也会被视为已存在)
+            for announcement in announcements:
+                if self.record_exists(announcement.get("announcementId")):
+                    known_cnt += 1
+                else:
+                    known_cnt = 0
+            _, page_save_cnt = self.save_page(data)
+            total_save_cnt += page_save_cnt
+            print(f"page {i} have download {page_save_cnt} files")
+            if known_cnt >= stop_after_known:
+                print(f"reach {known_cnt} known announcements, stop tail sync")
+                break
+            if not announcements or i >= int(data.get("totalpages") or 0):
+                break
+        self.writer.flush()
+        print(f"total download files cnt: {total_save_cnt}")
+        return total_save_cnt
+
+    def tail(
+        self,
+        poll_interval=60,
+        rounds=None,
+        start_date=None,
+        end_date=None,
+        **tail_kwargs,
+    ):
+        """
+        定时增量同步最新公告，按Ctrl+C停止
+
+        参数:
+            poll_interval (float): 两次同步之间的间隔(秒)，默认60
+            rounds (int): 同步次数，默认None(一直运行)
+            start_date (str): 开始日期(YYYY-MM-DD格式)，默认每次同步时的当天
+            end_date (str): 结束日期(YYYY-MM-DD格式)，默认每次同步时的当天
+            tail_kwargs: 透传给tail_once的参数(如stop_after_known/max_pages)
+
+        返回:
+            int: 下载文件数
+        """
+        total_save_cnt = 0
+        round_cnt = 0
+        try:
+            while rounds is None or round_cnt < rounds:
+                total_save_cnt += self.tail_once(start_date, end_date, **tail_kwargs)
+                round_cnt += 1
+                if rounds is not None and round_cnt >= rounds:
+                    break
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            print("tail sync stopped")
+        self.writer.flush()
+        return total_save_cnt
+
+    def build_text_index(self, workers=4, retry_failed=False):
+        """
+        为已下载的公告建立全文索引(可选功能，需安装pypdf)，只处理新增的文件
+
+        参数:
+            workers (int): 文本提取进程数
+            retry_failed (bool): 是否重试提取失败的文件
+
+        返回:
+            dict: 统计数据(pending/indexed/failed)
+        """
+        self.writer.flush()
+        index = TextIndex(self.db.db_path, workers=workers)
+        try:
+            return index.build(self.db.list_files(), retry_failed=retry_failed)
+        finally:
+            index.close()
+
+    def search_text(self, query, limit=20):
+        """
+        全文检索已索引的公告正文
+
+        参数:
+            query (str): 检索词(至少3个字)
+            limit (int): 最大返回条数
+
+        返回:
+            list: [{doc_key(announcementId), title, snippet}]
+        """
+        index = TextIndex(self.db.db_path)
+        try:
+            return index.search(query, limit)
+        finally:
+            index.close()
 
     def save_file(
         self,
@@ -235,85 +675,186 @@ class Cninfo:
             max_attempt (int): 最大尝试次数，默认3
 
         返回:
-            bool: 下载是否成功
+            str: 下载完成的文件路径，失败返回None
         """
-        dc = None
         download_status = False
+        downloaded_file = None
+        limiter = get_limiter(url)
         try:
-            dc = DriverController(download_dir=download_dir)
-            if not dc.driver:  # 确保浏览器未初始化
-                dc.start_browser()
-            dc.driver.get(url)
-
-            save_dir = download_dir
-            # attempt
-            for attempt in range(max_attempt):
-                try:
-                    # 记录下载前的文件状态
-                    original_files = set(
-                        f
-                        for f in os.listdir(save_dir)
-                        if os.path.isfile(os.path.join(save_dir, f))
-                    )
+            with self.get_driver_pool(download_dir).driver() as dc:
+                limiter.acquire()
+                start = time.monotonic()
+                dc.driver.get(url)
 
-                    # download click
-                    time.sleep(0.5)
-                    download_link = dc._wait_and_highlight(
-                        By.XPATH, "//button[contains(.,'公告下载')]"
-                    )
-                    dc._reliable_click(download_link)
-                    dc.logger.info("file start downloading ...")
-
-                    # 监控下载进度
-                    for _ in range(60):  # 最多等待30秒
-                        time.sleep(0.5)  # 控制间隔时间
-                        # current_file 排除新文件
-                        current_files = set(
-                            f
-                            for f in os.listdir(save_dir)
-                            if os.path.isfile(os.path.join(save_dir, f))
-                            and not f.endswith(".crdownload")  # 核心修复点
+                # attempt
+                for attempt in range(max_attempt):
+                    if download_status:
+                        break
+                    try:
+                        # 记录下载开始前的状态(下载事件或目录文件)
+                        token = dc.download_watcher.begin()
+
+                        # download click
+                        download_link = dc._wait_and_highlight(
+                            By.XPATH,
+                            "//button[contains(.,'公告下载')]",
+                            clickable=True,
                         )
-                        new_files = current_files - original_files
-
-                        # 检查新文件
-                        if new_files:
-                            # 查看最新修改的文件
-                            newest_file = max(
-                                new_files,
-                                key=lambda f: os.path.getmtime(
-                                    os.path.join(save_dir, f)
-                                ),
-                            )
-                            temp_path = os.path.join(save_dir, newest_file)
-
-                            # 检查文件是否完整（大小稳定）
-                            size1 = os.path.getsize(temp_path)
-                            time.sleep(random.uniform(0.5, 1.0))
-                            size2 = os.path.getsize(temp_path)
-
-                            if size1 == size2 and size1 > 0:
-                                download_status = True
-                                break
-
-                except Exception as e:
-                    dc.logger.error(
-                        f"Download attempt {attempt+1} failed with error: {str(e)}"
-                    )
-                    dc._take_screenshot("download_error")
+                        dc._reliable_click(download_link)
+                        dc.logger.info("file start downloading ...")
+
+                        # 等待下载完成(最多30秒)
+                        downloaded_file = dc.download_watcher.wait(token, timeout=30)
+                        if downloaded_file:
+                            dc.logger.info(f"file downloaded: {downloaded_file}")
+                            download_status = True
+
+                    except Exception as e:
+                        dc.logger.error(
+                            f"Download attempt {attempt+1} failed with error: {str(e)}"
+                        )
+                        dc._take_screenshot("download_error")
+
+                limiter.report(
+                    latency=time.monotonic() - start, error=not download_status
+                )
 
         except ValueError as e:
             self.logger.warning(f"记录不完整: {str(e)}")
-            return False  # 文件已下载但记录未保存
+            return None  # 文件已下载但记录未保存
         except Exception as e:
             self.logger.error(f"下载失败: {str(e)}")
             raise
-        finally:
+        return downloaded_file if download_status else None
+
+    def save_file_http(
+        self,
+        adjunct_url,
+        file_path,
+        expected_size=None,
+    ):
+        """
+        通过HTTP直接下载公告PDF（不启动浏览器），中断时下次从断点续传
+
+        参数:
+            adjunct_url (str): 查询结果中的adjunctUrl，如"finalpage/2025-07-03/1224012345.PDF"
+            file_path (str): 文件保存路径
+            expected_size (int): 查询结果中的adjunctSize(KB)，用于校验文件大小，可为空
+
+        返回:
+            bool: 下载是否成功
+        """
+        url = self.STATIC_URL + adjunct_url.lstrip("/")
+        # adjunctSize单位为KB(取整)，允许1KB误差
+        expected_bytes = (
+            int(expected_size) * 1024 if str(expected_size or "").isdigit() else None
+        )
+        try:
+            return self.file_downloader.download(
+                url,
+                file_path,
+                expected_size=expected_bytes,
+                size_tolerance=1024,
+                headers=self.DOWNLOAD_HEADERS,
+            )
+        except Exception as e:
+            self.logger.error(f"HTTP下载失败: {str(e)}, url: {url}")
+            return False
+
+    def download_announcement(self, announcement, detail_url, download_dir):
+        """
+        下载单条公告文件，http模式下优先直接下载PDF，失败时回退到浏览器下载
+
+        参数:
+            announcement (dict): 查询结果中的单条公告
+            detail_url (str): 公告详情页URL(浏览器下载使用)
+            download_dir (str): 文件下载目录
+
+        返回:
+            str: 下载完成的文件路径，失败返回None
+        """
+        adjunct_url = announcement.get("adjunctUrl")
+        if self.download_mode == "http" and adjunct_url:
+            os.makedirs(download_dir, exist_ok=True)
+            file_path = os.path.join(download_dir, self.file_name(announcement))
+            if self.save_file_http(
+                adjunct_url, file_path, announcement.get("adjunctSize")
+            ):
+                return file_path
+            self.logger.info("HTTP下载失败，回退到浏览器下载")
+        return self.save_file(detail_url, download_dir)
+
+    def store_file(self, record, file_path):
+        """
+        下载完成的文件移入BlobStore，并在记录中写入文件信息，同步更新文件清单
+
+        参数:
+            record (dict): 公告记录(build_record的返回值)
+            file_path (str): 下载完成的文件路径
+
+        返回:
+            dict: 补充了blobHash/filePath/fileSize的公告记录
+        """
+        digest, path, size = self.blob_store.put_file(file_path)
+        self.manifest.remove(file_path)
+        self.manifest.add(path, size, digest, record.get("announcementId"))
+        record["blobHash"] = digest
+        record["filePath"] = path
+        record["fileSize"] = size
+        return record
+
+    @staticmethod
+    def file_name(announcement):
+        """
+        根据公告生成保存文件名: "{secName}：{announcementTitle}.pdf"
+
+        参数:
+            announcement (dict): 查询结果中的单条公告
+
+        返回:
+            str: 文件名(去除高亮标签及文件名非法字符)
+        """
+        name = f"{announcement.get('secName')}：{announcement.get('announcementTitle')}"
+        name = re.sub(r"</?em>", "", name)
+        name = re.sub(r'[\\/*?:"<>|]', "", name)
+        return f"{name}.pdf"
+
+    def build_record(self, announcement):
+        """
+        将查询结果中的单条公告转换为数据库记录
+
+        参数:
+            announcement (dict): 查询结果中的单条公告
+
+        返回:
+            dict: 公告记录(字段见CninfoAnnouncementDB.save_record)
+        """
+        # announcementTime为毫秒时间戳(北京时间)，缺失时从adjunctUrl中解析日期
+        timestamp = announcement.get("announcementTime")
+        if isinstance(timestamp, (int, float)):
+            annoucementTime = datetime.fromtimestamp(
+                timestamp / 1000, tz=self.TIMEZONE
+            ).strftime("%Y-%m-%d")
+        else:
+            timestamp = None
+            adjunctUrl = announcement.get("adjunctUrl", "")
             try:
-                dc.close()
-            except Exception as e:
-                self.logger.error(f"关闭浏览器时出错: {str(e)}")
-        return download_status
+                annoucementTime = adjunctUrl.split("/")[1] if adjunctUrl else ""
+            except IndexError:
+                annoucementTime = ""
+
+        announcement_id = announcement.get("announcementId")
+        return {
+            "secCode": announcement.get("secCode"),
+            "secName": announcement.get("secName"),
+            "announcementId": announcement_id,
+            "announcementTitle": announcement.get("announcementTitle"),
+            "downloadUrl": f"{self.DETAIL_URL}announcementId={announcement_id}",
+            "pageColumn": announcement.get("pageColumn"),
+            "announcementTime": annoucementTime,
+            "announcementDate": annoucementTime or None,
+            "announcementTimestamp": timestamp,
+        }
 
     def save_page(
         self,
@@ -340,11 +881,12 @@ class Cninfo:
                 print(f"no data has found")
                 return False, page_save_cnt
 
+            # 清理残留的临时文件，旧版下载目录中的文件一次性登记到清单
+            self.prepare_download_dir(download_dir)
+
             # 处理有效数据
             max_fail = int(max_fail) if str(max_fail).isdigit() else 1
             fail_cnt = 0
-            # base url
-            base_url = "https://www.cninfo.com.cn/new/disclosure/detail?"
             for announcement in announcements:
                 if fail_cnt >= max_fail:
                     print("reach maximum failure, break")
@@ -357,47 +899,30 @@ class Cninfo:
                     continue
 
                 # 查重检测
-                if self.db.record_exists(announcement_id):
+                if self.record_exists(announcement_id):
                     # print("annoucement exists")
                     continue
 
                 # download
-                is_download = False
-                success = False
+                downloaded_file = None
                 # create filename to check if file exists in directory
-                secName = announcement.get("secName")
-                announcementTitle = announcement.get("announcementTitle")
-                check_file_name = f"{secName}：{announcementTitle}.pdf"
+                check_file_name = self.file_name(announcement)
                 check_file_path = os.path.join(download_dir, check_file_name)
-                if os.path.exists(check_file_path):
+                if self.manifest.contains(check_file_path):
                     print(f"file exists, load info into db: {check_file_name}")
-                    is_download = True
-                    success = True
+                    downloaded_file = check_file_path
 
-                # create download url
-                final_url = f"{base_url}announcementId={announcement_id}"
+                record = self.build_record(announcement)
 
                 # if file not in directory
-                if not is_download:
-                    success = self.save_file(final_url, download_dir)
-
-                adjunctUrl = announcement.get("adjunctUrl", "")
-                try:
-                    annoucementTime = adjunctUrl.split("/")[1] if adjunctUrl else ""
-                except IndexError:
-                    annoucementTime = ""
-
-                record = {
-                    "secCode": announcement.get("secCode"),
-                    "secName": secName,
-                    "announcementId": announcement_id,
-                    "announcementTitle": announcementTitle,
-                    "downloadUrl": final_url,
-                    "pageColumn": announcement.get("pageColumn"),
-                    "announcementTime": annoucementTime,
-                }
-                if success:
-                    self.db.save_record(record)
+                if not downloaded_file:
+                    downloaded_file = self.download_announcement(
+                        announcement, record["downloadUrl"], download_dir
+                    )
+
+                if downloaded_file:
+                    self.store_file(record, downloaded_file)
+                    self.writer.add(record)
                     page_save_cnt += 1
                 else:
                     print("download failed")
@@ -415,13 +940,24 @@ def main():
     交互式设计
     """
     announcementDownloader = Cninfo()
+
+    def ask_resume(start_date, end_date):
+        # 当前查询条件存在未完成的断点时，询问是否继续
+        crawl_key = announcementDownloader.crawl_key(start_date, end_date)
+        if not announcementDownloader.checkpoint.has_checkpoint(crawl_key):
+            return False
+        return input("检测到上次未完成的下载，是否从中断处继续(Y/N): ").upper() == "Y"
+
     while True:
         print("\n请选择功能：")
         print("A. 根据对应日期查询已下载公告数量")
         print("B. 下载公告")
+        print("C. 增量同步最新公告（按时间倒序抓取，遇到已下载公告即停止）")
+        print("D. 建立公告全文索引（需安装pypdf，只处理新下载的文件）")
+        print("E. 全文检索公告正文")
         print("Q. 退出程序")
 
-        choice = input("请输入选项(A/B/Q): ").upper()
+        choice = input("请输入选项(A/B/C/D/E/Q): ").upper()
 
         if choice == "A":
             date = str(input("请输入目标日期(格式:YYYY-MM-DD): "))
@@ -440,17 +976,20 @@ def main():
             print("请选择您要使用的下载功能")
             print("a. 基础下载（下载日期区间内所有公告）")
             print("b. 进阶下载（您可根据【公告关键词】【股市板块】筛选公告进行下载）")
+            print("c. 分片并行下载（按公告数量切分日期区间，适用于长日期区间）")
+            print("d. 流水线下载（列表抓取、文件下载、入库同时进行）")
             print("e. 返回上一级目录")
             print("q. 退出程序")
 
-            subchoice = input("请输入选项(a / b / e / q): ").lower()
+            subchoice = input("请输入选项(a / b / c / d / e / q): ").lower()
 
             if subchoice == "a":
                 print(f"您希望的查询日期区间是: {start_date} ~ {end_date}")
                 confirm = input("请确认开始下载(Y/N): ").upper()
                 if confirm == "Y":
+                    resume = ask_resume(start_date, end_date)
                     print("正在为您启动下载...")
-                    announcementDownloader.query(start_date, end_date)
+                    announcementDownloader.query(start_date, end_date, resume=resume)
                     print("下载完成")
                 else:
                     print("返回上一级目录")
@@ -482,17 +1021,72 @@ def main():
                     keywords = keywords if keywords != "NoSet" else ""
                     plate = plate if plate != "NoSet" else ""
                     announcementDownloader.edit_payload(keywords, plate)
-                    announcementDownloader.query(start_date, end_date)
+                    resume = ask_resume(start_date, end_date)
+                    announcementDownloader.query(start_date, end_date, resume=resume)
                     print("下载完成")
                 else:
                     print("返回上级目录")
                     continue
+            elif subchoice == "c":
+                print(f"您希望的查询日期区间是: {start_date} ~ {end_date}")
+                confirm = input("请确认开始下载(Y/N): ").upper()
+                if confirm == "Y":
+                    resume = ask_resume(start_date, end_date)
+                    print("正在为您规划分片并启动下载...")
+                    announcementDownloader.query_sharded(
+                        start_date, end_date, resume=resume
+                    )
+                    print("下载完成")
+                else:
+                    print("返回上一级目录")
+
+            elif subchoice == "d":
+                print(f"您希望的查询日期区间是: {start_date} ~ {end_date}")
+                confirm = input("请确认开始下载(Y/N): ").upper()
+                if confirm == "Y":
+                    resume = ask_resume(start_date, end_date)
+                    print("正在为您启动流水线下载...")
+                    announcementDownloader.query_pipelined(
+                        start_date, end_date, resume=resume
+                    )
+                    print("下载完成")
+                else:
+                    print("返回上一级目录")
+
             elif subchoice == "q":
                 break
 
             else:
                 print("返回上一级目录")
 
+        elif choice == "C":
+            interval = input("请输入同步间隔秒数(默认60): ").strip()
+            try:
+                interval = float(interval) if interval else 60
+            except ValueError:
+                interval = 0
+            if not 0 < interval < float("inf"):
+                print("无效的同步间隔，使用默认值60秒")
+                interval = 60
+            print("正在为您启动增量同步，按Ctrl+C停止...")
+            announcementDownloader.tail(poll_interval=interval)
+            print("同步结束")
+
+        elif choice == "D":
+            try:
+                stats = announcementDownloader.build_text_index()
+                print(f"索引完成: 新增{stats['indexed']}篇，失败{stats['failed']}篇")
+            except RuntimeError as e:
+                print(str(e))
+
+        elif choice == "E":
+            query = input("请输入检索词(至少3个字): ").strip()
+            try:
+                for hit in announcementDownloader.search_text(query):
+                    print(f"[{hit['doc_key']}] {hit['title']}\n    {hit['snippet']}")
+            except RuntimeError as e:
+                print(str(e))
+
         elif choice == "Q":
             print("程序退出")
             break
@@ -500,6 +1094,8 @@ def main():
         else:
             print("无效选项，请重新选择")
 
+    announcementDownloader.close()
+
 
 if __name__ == "__main__":
     main()
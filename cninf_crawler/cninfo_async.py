@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncPageFetcher:
+    """
+    AsyncPageFetcher - 基于asyncio的公告列表并发翻页引擎
+    - 在并发上限内同时请求多个hisAnnouncement/query页面
+    - 页面按返回顺序(而非页码顺序)交给处理函数，处理与抓取互不阻塞
+    - 已请求但未处理的页面不超过并发上限，处理一页后才请求下一页，
+      处理跟不上时抓取随之放慢，页面不会在内存中堆积，停止时也不会多消耗限速额度
+    - 请求复用Cninfo的共享会话(连接池/重试/Cookie)，在线程池中执行
+    """
+
+    def __init__(self, cninfo, concurrency: int = 4, logger: logging.Logger = None):
+        """
+        初始化翻页引擎
+        参数:
+            cninfo: Cninfo实例，提供build_payload/post_query
+            concurrency: 最大并发请求数
+            logger: 可指定的自定义日志记录器
+        """
+        self.cninfo = cninfo
+        self.concurrency = max(1, int(concurrency))
+        self.logger = logger or logging.getLogger("AsyncPageFetcher")
+
+    async def _fetch_page(self, executor, start_date, end_date, page_num):
+        """
+        抓取单页
+        返回:
+            tuple: (页码, 查询结果dict或None)
+        """
+        loop = asyncio.get_running_loop()
+        payload = self.cninfo.build_payload(start_date, end_date, page_num=page_num)
+        data = await loop.run_in_executor(executor, self.cninfo.post_query, payload)
+        return page_num, data
+
+    async def run(self, start_date, end_date, pages, handle_page):
+        """
+        并发抓取指定页，并按返回顺序逐页处理
+        参数:
+            start_date: 开始日期(YYYY-MM-DD格式)
+            end_date: 结束日期(YYYY-MM-DD格式)
+            pages: 需要抓取的页码(可迭代)
+            handle_page: 处理函数 handle_page(page_num, data) -> bool，
+                在独立线程中执行，返回False时停止抓取剩余页面
+        返回:
+            int: 已处理的页数
+        """
+        loop = asyncio.get_running_loop()
+        handled = 0
+        stopped = False
+        remaining = iter(pages)
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+
+            def schedule_next():
+                for page_num in remaining:
+                    pending.add(
+                        asyncio.ensure_future(
+                            self._fetch_page(executor, start_date, end_date, page_num)
+                        )
+                    )
+                    return
+
+            for _ in range(self.concurrency):
+                schedule_next()
+            try:
+                while pending and not stopped:
+                    done, _ = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        pending.discard(task)
+                        page_num, data = task.result()
+                        handled += 1
+                        # 处理函数会下载文件、写数据库，放到默认线程池避免阻塞事件循环
+                        keep_going = await loop.run_in_executor(
+                            None, handle_page, page_num, data
+                        )
+                        if keep_going is False:
+                            self.logger.info(f"stop fetching after page {page_num}")
+                            stopped = True
+                            break
+                        # 处理完一页才请求下一页
+                        schedule_next()
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        return handled
+
+    def run_sync(self, start_date, end_date, pages, handle_page):
+        """
+        同步入口，供非异步代码调用
+        """
+        return asyncio.run(self.run(start_date, end_date, pages, handle_page))
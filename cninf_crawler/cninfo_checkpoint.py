@@ -0,0 +1,132 @@
+import sqlite3
+import threading
+import logging
+from typing import Set
+
+
+class CrawlCheckpoint:
+    """
+    CrawlCheckpoint - 公告抓取断点记录
+    - 以 (column, plate, searchKey, seDate) 作为任务key，记录已完成的页码和分片
+    - 保存在公告数据库文件中的独立表内，程序崩溃或重启后可从断点继续
+    - 页码只在该页所有公告均已写入数据库后才记录为完成
+    """
+
+    def __init__(self, db_path: str):
+        """
+        初始化断点记录
+        参数:
+            db_path: 数据库文件路径(一般与公告数据库相同)
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger("CrawlCheckpoint")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._init_db()
+
+    def _init_db(self):
+        """
+        初始化断点表结构
+        表结构:
+            - checkpoint_pages: crawl_key, page_num 已完成的页码
+            - checkpoint_shards: crawl_key, shard_id, saved_cnt 已完成的分片
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS checkpoint_pages (
+                crawl_key TEXT NOT NULL,
+                page_num INTEGER NOT NULL,
+                updated_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (crawl_key, page_num)
+            )"""
+            )
+            self._conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS checkpoint_shards (
+                crawl_key TEXT NOT NULL,
+                shard_id TEXT NOT NULL,
+                saved_cnt INTEGER,
+                updated_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (crawl_key, shard_id)
+            )"""
+            )
+
+    @staticmethod
+    def make_key(column: str, plate: str, searchKey: str, seDate: str) -> str:
+        """
+        生成任务key
+        参数:
+            column: 查询栏目
+            plate: 板块
+            searchKey: 关键词
+            seDate: 日期区间，如"2025-07-01~2025-07-03"
+        返回:
+            str: 任务key
+        """
+        return f"{column}|{plate}|{searchKey}|{seDate}"
+
+    def completed_pages(self, crawl_key: str) -> Set[int]:
+        """获取任务已完成的页码"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT page_num FROM checkpoint_pages WHERE crawl_key = ?",
+                (crawl_key,),
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def mark_pages(self, crawl_key: str, page_nums) -> None:
+        """记录已完成的页码(单个事务)"""
+        rows = [(crawl_key, page_num) for page_num in page_nums]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoint_pages (crawl_key, page_num) VALUES (?, ?)",
+                rows,
+            )
+
+    def completed_shards(self, crawl_key: str) -> Set[str]:
+        """获取任务已完成的分片id"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT shard_id FROM checkpoint_shards WHERE crawl_key = ?",
+                (crawl_key,),
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def mark_shard(self, crawl_key: str, shard_id: str, saved_cnt: int = None) -> None:
+        """记录已完成的分片"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoint_shards (crawl_key, shard_id, saved_cnt) "
+                "VALUES (?, ?, ?)",
+                (crawl_key, shard_id, saved_cnt),
+            )
+
+    def has_checkpoint(self, crawl_key: str) -> bool:
+        """任务是否有未清除的断点"""
+        with self._lock:
+            for table in ("checkpoint_pages", "checkpoint_shards"):
+                cursor = self._conn.execute(
+                    f"SELECT 1 FROM {table} WHERE crawl_key = ? LIMIT 1", (crawl_key,)
+                )
+                if cursor.fetchone():
+                    return True
+            return False
+
+    def clear(self, crawl_key: str) -> None:
+        """任务全部完成后清除断点"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM checkpoint_pages WHERE crawl_key = ?", (crawl_key,)
+            )
+            self._conn.execute(
+                "DELETE FROM checkpoint_shards WHERE crawl_key = ?", (crawl_key,)
+            )
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -1,10 +1,54 @@
 import sqlite3
-from typing import Dict
+from typing import Dict, List
 import os
 import logging
+import threading
+from contextlib import contextmanager
+from id_index import AnnouncementIdIndex
 
 
 class CninfoAnnouncementDB:
+    """
+    公告写入语句(已存在则覆盖)
+    """
+    INSERT_SQL = """
+        INSERT OR REPLACE INTO announcements (
+            secCode, secName, announcementId,
+            announcementTitle, downloadUrl, pageColumn, announcementTime,
+            announcementDate, announcementTimestamp, blobHash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+
+    """
+    文件内容写入语句(相同内容只记录一次)
+    """
+    INSERT_BLOB_SQL = """
+        INSERT OR IGNORE INTO blobs (blobHash, path, size) VALUES (?, ?, ?)
+        """
+
+    """
+    保存公告时的必要字段
+    """
+    REQUIRED_FIELDS = [
+        "secCode",
+        "secName",
+        "announcementId",
+        "announcementTitle",
+        "downloadUrl",
+        "pageColumn",
+    ]
+
+    """
+    连接参数: WAL模式下读写互不阻塞，synchronous=NORMAL在WAL下仍保证数据库一致
+    """
+    PRAGMAS = {
+        "busy_timeout": 10000,
+        "synchronous": "NORMAL",
+        "cache_size": -65536,  # 64MB
+        "mmap_size": 268435456,  # 256MB
+        "temp_store": "MEMORY",
+    }
+
     def __init__(self, db_path: str):
         """
         初始化公告数据库
@@ -14,9 +58,14 @@ class CninfoAnnouncementDB:
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self.db_path = os.path.abspath(db_path)
         self.logger = logging.getLogger("CninfoAnnouncementDB")
+        self._write_lock = threading.RLock()
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._readers = threading.local()
+        self._reader_conns = []
         self._init_db()
-        self._id_cache = set()
-        self._load_id_cache()
+        self._id_index = AnnouncementIdIndex(os.path.splitext(self.db_path)[0] + ".ids")
+        self._load_id_index()
 
     def _init_db(self):
         """
@@ -29,6 +78,13 @@ class CninfoAnnouncementDB:
             - downloadUrl: 公告URL
             - pageColumn: 页面栏目
             - announcementTime: 公告时间
+            - announcementDate: 公告日期(YYYY-MM-DD，用于按日期查询)
+            - announcementTimestamp: 公告时间戳(毫秒)
+            - blobHash: 公告文件内容的SHA256(对应blobs表)
+        blobs表结构:
+            - blobHash: 文件内容SHA256(主键)
+            - path: 文件在BlobStore中的路径
+            - size: 文件大小(字节)
         """
         with self._get_connection() as conn:
             conn.execute(
@@ -40,28 +96,117 @@ class CninfoAnnouncementDB:
                 announcementTitle TEXT NOT NULL,
                 downloadUrl TEXT NOT NULL,
                 pageColumn TEXT,
-                announcementTime TEXT
+                announcementTime TEXT,
+                announcementDate TEXT,
+                announcementTimestamp INTEGER,
+                blobHash TEXT
+            )"""
+            )
+            conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS blobs (
+                blobHash TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER,
+                created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )"""
             )
+            self._migrate(conn)
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_secCode ON announcements(secCode)"
             )
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_announcementId ON announcements(announcementId)"
             )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_date_secCode ON announcements(announcementDate, secCode)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_blobHash ON announcements(blobHash)"
+            )
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """获取数据库连接"""
-        conn = sqlite3.connect(self.db_path)
+    def _migrate(self, conn: sqlite3.Connection):
+        """
+        旧版数据库迁移: 补充announcementDate/announcementTimestamp/blobHash列，
+        并由announcementTime回填日期(只在列新增时执行一次)
+        """
+        columns = {
+            row["name"] for row in conn.execute("PRAGMA table_info(announcements)")
+        }
+        if "announcementTimestamp" not in columns:
+            conn.execute(
+                "ALTER TABLE announcements ADD COLUMN announcementTimestamp INTEGER"
+            )
+        if "announcementDate" not in columns:
+            conn.execute("ALTER TABLE announcements ADD COLUMN announcementDate TEXT")
+            cursor = conn.execute(
+                "UPDATE announcements SET announcementDate = date(announcementTime) "
+                "WHERE announcementDate IS NULL"
+            )
+            self.logger.info(f"migrated announcementDate for {cursor.rowcount} records")
+        if "blobHash" not in columns:
+            conn.execute("ALTER TABLE announcements ADD COLUMN blobHash TEXT")
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """
+        创建数据库连接并设置pragma
+        参数:
+            read_only: 是否以只读方式打开
+        """
+        if read_only:
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        for name, value in self.PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
         return conn
 
-    def _load_id_cache(self):
-        """加载现有公告ID到内存缓存"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT announcementId FROM announcements")
-            self._id_cache = {row["announcementId"] for row in cursor.fetchall()}
+    @contextmanager
+    def _get_connection(self):
+        """
+        获取长期复用的写连接(串行使用，退出时提交事务，异常时回滚)
+        """
+        with self._write_lock:
+            with self._conn:
+                yield self._conn
+
+    @contextmanager
+    def _get_read_connection(self):
+        """
+        获取当前线程的只读连接(WAL模式下不会被写事务阻塞)
+        """
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._connect(read_only=True)
+            self._readers.conn = conn
+            with self._write_lock:
+                self._reader_conns.append(conn)
+        yield conn
+
+    def close(self):
+        """关闭写连接和所有只读连接"""
+        with self._write_lock:
+            for conn in self._reader_conns:
+                conn.close()
+            self._reader_conns = []
+            self._readers = threading.local()
+            self._conn.close()
+            self._id_index.close()
+
+    def _load_id_index(self):
+        """
+        打开公告ID索引文件，索引覆盖的行数与数据库不一致时(首次运行/异常退出)重建
+        """
+        with self._get_read_connection() as conn:
+            row_count = conn.execute("SELECT COUNT(*) FROM announcements").fetchone()[0]
+            if self._id_index.open() and self._id_index.row_count == row_count:
+                return
+            self.logger.info("rebuilding announcement id index")
+            cursor = conn.execute("SELECT announcementId FROM announcements")
+            self._id_index.build((row[0] for row in cursor), row_count)
 
     def record_exists(self, announcement_id: str) -> bool:
         """
@@ -71,7 +216,7 @@ class CninfoAnnouncementDB:
         返回:
             bool: 是否存在
         """
-        return announcement_id in self._id_cache
+        return announcement_id in self._id_index
 
     def save_record(self, record: Dict) -> bool:
         """
@@ -85,49 +230,105 @@ class CninfoAnnouncementDB:
                 - downloadUrl: 公告URL
                 - pageColumn: 页面栏目
                 - announcementTime: 公告时间
+            可选字段:
+                - announcementDate: 公告日期(YYYY-MM-DD)，缺省时取announcementTime前10位
+                - announcementTimestamp: 公告时间戳(毫秒)
+                - blobHash / filePath / fileSize: 文件内容哈希、存储路径及大小
         返回:
             bool: 是否保存成功
         """
-        required_fields = [
-            "secCode",
-            "secName",
-            "announcementId",
-            "announcementTitle",
-            "downloadUrl",
-            "pageColumn",
-        ]
-        if not all(field in record for field in required_fields):
+        if not self._has_required_fields(record):
             self.logger.error("缺少必要字段")
             return False
 
         try:
             with self._get_connection() as conn:
-                conn.execute(
-                    """
-                INSERT OR REPLACE INTO announcements (
-                    secCode, secName, announcementId, 
-                    announcementTitle, downloadUrl, pageColumn, announcementTime
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        record["secCode"],
-                        record["secName"],
-                        record["announcementId"],
-                        record["announcementTitle"],
-                        record["downloadUrl"],
-                        record["pageColumn"],
-                        record["announcementTime"],
-                    ),
-                )
-                self._id_cache.add(record["announcementId"])
-                return True
+                conn.execute(self.INSERT_SQL, self._to_row(record))
+                conn.executemany(self.INSERT_BLOB_SQL, self._blob_rows([record]))
+            self._id_index.add(record["announcementId"])
+            return True
         except Exception as e:
             self.logger.error(f"保存失败: {str(e)}")
             return False
 
+    def save_records(self, records: List[Dict]) -> int:
+        """
+        批量保存公告记录(单个事务 + executemany，只提交一次)
+        参数:
+            records: 公告字典列表，字段要求同save_record
+        返回:
+            int: 保存的记录数，保存失败返回-1(事务回滚，不会部分写入)
+        """
+        rows = []
+        valid_records = []
+        for record in records:
+            if not self._has_required_fields(record):
+                self.logger.error(f"缺少必要字段: {record.get('announcementId')}")
+                continue
+            rows.append(self._to_row(record))
+            valid_records.append(record)
+        if not rows:
+            return 0
+
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(self.INSERT_SQL, rows)
+                conn.executemany(self.INSERT_BLOB_SQL, self._blob_rows(valid_records))
+            for row in rows:
+                self._id_index.add(row[2])
+            return len(rows)
+        except Exception as e:
+            self.logger.error(f"批量保存失败: {str(e)}")
+            return -1
+
+    def _has_required_fields(self, record: Dict) -> bool:
+        """检查记录是否包含必要字段"""
+        return all(field in record for field in self.REQUIRED_FIELDS)
+
+    def _to_row(self, record: Dict) -> tuple:
+        """将公告字典转换为INSERT_SQL参数"""
+        announcement_time = record.get("announcementTime")
+        announcement_date = record.get("announcementDate") or (
+            announcement_time[:10] if announcement_time else None
+        )
+        return (
+            record["secCode"],
+            record["secName"],
+            record["announcementId"],
+            record["announcementTitle"],
+            record["downloadUrl"],
+            record["pageColumn"],
+            announcement_time,
+            announcement_date,
+            record.get("announcementTimestamp"),
+            record.get("blobHash"),
+        )
+
+    @staticmethod
+    def _blob_rows(records: List[Dict]) -> list:
+        """记录中的文件信息转换为INSERT_BLOB_SQL参数"""
+        return [
+            (record["blobHash"], record["filePath"], record.get("fileSize"))
+            for record in records
+            if record.get("blobHash") and record.get("filePath")
+        ]
+
+    def list_files(self) -> list:
+        """
+        列出已保存文件的公告(全文索引的输入)
+        返回:
+            list: [(announcementId, announcementTitle, 文件路径, blobHash)]
+        """
+        with self._get_read_connection() as conn:
+            cursor = conn.execute(
+                "SELECT a.announcementId, a.announcementTitle, b.path, a.blobHash "
+                "FROM announcements a JOIN blobs b USING (blobHash)"
+            )
+            return [tuple(row) for row in cursor]
+
     def get_all_records(self) -> list:
         """获取所有公告记录"""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM announcements")
             return [dict(row) for row in cursor.fetchall()]
@@ -146,9 +347,8 @@ class CninfoAnnouncementDB:
                     "DELETE FROM announcements WHERE announcementId = ?",
                     (announcement_id,),
                 )
-                if announcement_id in self._id_cache:
-                    self._id_cache.remove(announcement_id)
-                return True
+            self._id_index.discard(announcement_id)
+            return True
         except Exception as e:
             self.logger.error(f"删除失败: {str(e)}")
             return False
@@ -161,12 +361,7 @@ class CninfoAnnouncementDB:
         返回:
             list: 当天的公告记录列表，按时间排序（如果需要）
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT * FROM announcements WHERE date(announcementTime) = ?", (date,)
-            )
-            return [dict(row) for row in cursor.fetchall()]
+        return self.get_records_between(date, date)
 
     def get_count_by_date(self, date: str) -> int:
         """
@@ -176,10 +371,160 @@ class CninfoAnnouncementDB:
         返回:
             int: 当天的公告数量
         """
-        with self._get_connection() as conn:
+        return self.get_count_between(date, date)
+
+    def get_records_between(
+        self, start_date: str, end_date: str, sec_code: str = None
+    ) -> list:
+        """
+        获取日期区间内的公告记录(使用(announcementDate, secCode)索引)
+        参数:
+            start_date: 开始日期 (格式: 'YYYY-MM-DD')
+            end_date: 结束日期 (格式: 'YYYY-MM-DD')，包含当天
+            sec_code: 股票代码，为空时不筛选
+        返回:
+            list: 公告记录列表，按日期和股票代码排序
+        """
+        sql = "SELECT * FROM announcements WHERE announcementDate BETWEEN ? AND ?"
+        params = [start_date, end_date]
+        if sec_code:
+            sql += " AND secCode = ?"
+            params.append(sec_code)
+        sql += " ORDER BY announcementDate, secCode"
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_count_between(self, start_date: str, end_date: str) -> int:
+        """
+        获取日期区间内的公告数量(只扫描索引)
+        参数:
+            start_date: 开始日期 (格式: 'YYYY-MM-DD')
+            end_date: 结束日期 (格式: 'YYYY-MM-DD')，包含当天
+        返回:
+            int: 公告数量
+        """
+        with self._get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT COUNT(*) FROM announcements WHERE date(announcementTime) = ?",
-                (date,),
+                "SELECT COUNT(*) FROM announcements WHERE announcementDate BETWEEN ? AND ?",
+                (start_date, end_date),
             )
             return cursor.fetchone()[0]
+
+    def get_daily_counts(self, start_date: str, end_date: str) -> Dict[str, int]:
+        """
+        按日统计日期区间内的公告数量
+        参数:
+            start_date: 开始日期 (格式: 'YYYY-MM-DD')
+            end_date: 结束日期 (格式: 'YYYY-MM-DD')，包含当天
+        返回:
+            dict: {日期: 公告数量}
+        """
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT announcementDate, COUNT(*) FROM announcements "
+                "WHERE announcementDate BETWEEN ? AND ? GROUP BY announcementDate",
+                (start_date, end_date),
+            )
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+class BufferedRecordWriter:
+    """
+    BufferedRecordWriter - 缓冲写入器
+    记录先放入内存缓冲区，缓冲区达到batch_size、距上次写入超过flush_interval秒
+    或关闭时，通过CninfoAnnouncementDB.save_records一次性写入
+    """
+
+    def __init__(
+        self,
+        db: CninfoAnnouncementDB,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+    ):
+        """
+        初始化缓冲写入器
+        参数:
+            db: 公告数据库
+            batch_size: 缓冲记录数达到该值时写入
+            flush_interval: 定时写入间隔(秒)
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger("BufferedRecordWriter")
+        self._buffer = []
+        self._pending_ids = set()
+        self._flush_callbacks = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._timer.start()
+
+    def _flush_periodically(self):
+        """后台线程: 定时写入缓冲区"""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def add(self, record: Dict) -> None:
+        """
+        添加一条记录，缓冲区满时立即写入
+        参数:
+            record: 公告字典，字段要求同CninfoAnnouncementDB.save_record
+        """
+        with self._lock:
+            self._buffer.append(record)
+            self._pending_ids.add(record.get("announcementId"))
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def add_flush_callback(self, callback) -> None:
+        """
+        注册写入回调，每次缓冲区成功写入数据库后调用(缓冲区为空时也会调用)
+        用于在记录落盘之后再保存断点等依赖记录的数据
+        参数:
+            callback: 无参数的回调函数
+        """
+        with self._lock:
+            self._flush_callbacks.append(callback)
+
+    def is_pending(self, announcement_id: str) -> bool:
+        """
+        检查公告是否已在缓冲区中(尚未写入数据库)
+        参数:
+            announcement_id: 公告ID
+        返回:
+            bool: 是否在缓冲区中
+        """
+        return announcement_id in self._pending_ids
+
+    def flush(self) -> int:
+        """
+        将缓冲区写入数据库，写入失败时保留缓冲区等待下次重试
+        返回:
+            int: 写入的记录数
+        """
+        with self._lock:
+            saved = 0
+            if self._buffer:
+                saved = self.db.save_records(self._buffer)
+                if saved < 0:
+                    return 0
+                self._buffer = []
+                self._pending_ids = set()
+            for callback in self._flush_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    self.logger.error(f"写入回调失败: {str(e)}")
+            return saved
+
+    def close(self) -> None:
+        """停止定时写入并写入剩余记录"""
+        self._stop.set()
+        self._timer.join()
+        if self.flush() == 0 and self._buffer:
+            self.logger.error(f"关闭时仍有{len(self._buffer)}条记录未写入")
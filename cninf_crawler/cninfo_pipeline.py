@@ -0,0 +1,282 @@
+import logging
+import os
+import queue
+import threading
+
+
+class CninfoPipeline:
+    """
+    CninfoPipeline - 分阶段的生产者/消费者下载流水线
+    列表抓取 -> 记录整理(查重) -> 文件下载 -> 数据库写入
+    - 阶段之间使用有界队列，下游处理不过来时上游自动阻塞(背压)
+    - 每个阶段可单独设置worker数，网络、浏览器和磁盘可以同时工作
+    - 各阶段的数据都带有页码，一页的公告全部处理成功后该页计入断点
+    """
+
+    """
+    队列结束标记
+    """
+    _STOP = object()
+
+    def __init__(
+        self,
+        cninfo,
+        listing_workers: int = 2,
+        normalise_workers: int = 1,
+        download_workers: int = 4,
+        queue_size: int = 100,
+        download_dir: str = "cninfo_file/announcements",
+        logger: logging.Logger = None,
+    ):
+        """
+        初始化流水线
+        参数:
+            cninfo: Cninfo实例
+            listing_workers: 列表页抓取worker数
+            normalise_workers: 记录整理worker数
+            download_workers: 文件下载worker数
+            queue_size: 各阶段之间队列的最大长度
+            download_dir: 文件下载目录
+            logger: 可指定的自定义日志记录器
+        """
+        self.cninfo = cninfo
+        self.listing_workers = max(1, int(listing_workers))
+        self.normalise_workers = max(1, int(normalise_workers))
+        self.download_workers = max(1, int(download_workers))
+        self.queue_size = queue_size
+        self.download_dir = download_dir
+        self.logger = logger or logging.getLogger("CninfoPipeline")
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._outstanding = {}  # 页码 -> [未处理完的公告数, 是否有失败]
+        self.stats = {}
+
+    def _count(self, key: str, n: int = 1) -> None:
+        """线程安全地累加统计数据"""
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    def _item_done(self, page_num, ok: bool = True) -> None:
+        """
+        一条公告处理结束(写入、跳过或失败)，该页全部结束且没有失败时标记页面完成
+        """
+        with self._lock:
+            state = self._outstanding.get(page_num)
+            if state is None:
+                return
+            state[0] -= 1
+            state[1] = state[1] or not ok
+            if state[0] > 0:
+                return
+            del self._outstanding[page_num]
+            failed = state[1]
+        if not failed:
+            self.cninfo.mark_page_done(self._crawl_key, page_num)
+
+    def _release(self, announcement_id) -> None:
+        """公告处理结束(成功或失败)，移出处理中集合，之后页面中的重复公告可重新处理"""
+        with self._lock:
+            self._in_flight.discard(announcement_id)
+
+    def _run_stage(self, name, in_q, out_q, handler, workers, downstream_workers):
+        """
+        启动一个阶段的worker线程
+        参数:
+            name: 阶段名称
+            in_q: 输入队列
+            out_q: 输出队列(最后一个阶段为None)
+            handler: 处理函数 handler(item, emit)，emit(x)将x放入输出队列
+            workers: worker数
+            downstream_workers: 下游worker数，本阶段结束后向下游发送对应数量的结束标记
+        返回:
+            list: worker线程
+        """
+        remaining = [workers]
+
+        def emit(item):
+            out_q.put(item)
+
+        def worker():
+            while True:
+                item = in_q.get()
+                if item is self._STOP:
+                    break
+                try:
+                    handler(item, emit)
+                except Exception as e:
+                    self._count("errors")
+                    self.logger.error(f"[{name}] 处理失败: {str(e)}")
+                    if isinstance(item, tuple):
+                        self._item_done(item[0], ok=False)
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            # 本阶段最后一个worker退出时通知下游结束
+            if last and out_q is not None:
+                for _ in range(downstream_workers):
+                    out_q.put(self._STOP)
+
+        threads = [
+            threading.Thread(target=worker, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in threads:
+            t.start()
+        return threads
+
+    def _fetch_listing(self, page_num, emit):
+        """列表抓取阶段: 页码 -> (页码, 公告)"""
+        payload = self.cninfo.build_payload(
+            self._start_date, self._end_date, page_num=page_num
+        )
+        data = self.cninfo.post_query(payload)
+        if data is None:
+            self._count("failed_pages")
+            return
+        announcements = data.get("announcements") or []
+        self._count("pages")
+        if not announcements:
+            self.cninfo.mark_page_done(self._crawl_key, page_num)
+            return
+        with self._lock:
+            self._outstanding[page_num] = [len(announcements), False]
+        for announcement in announcements:
+            emit((page_num, announcement))
+
+    def _normalise(self, item, emit):
+        """记录整理阶段: (页码, 公告) -> (页码, 公告, 记录)，过滤已存在/正在处理的公告"""
+        page_num, announcement = item
+        announcement_id = announcement.get("announcementId") if announcement else None
+        if not announcement_id:
+            self._item_done(page_num)
+            return
+        with self._lock:
+            duplicate = announcement_id in self._in_flight
+            if not duplicate:
+                self._in_flight.add(announcement_id)
+        if duplicate:
+            # _item_done需要获取self._lock，不能在持有锁时调用
+            self._item_done(page_num)
+            return
+        try:
+            if self.cninfo.record_exists(announcement_id):
+                self._count("skipped")
+                self._release(announcement_id)
+                self._item_done(page_num)
+                return
+
+            record = self.cninfo.build_record(announcement)
+            file_path = os.path.join(
+                self.download_dir, self.cninfo.file_name(announcement)
+            )
+            # 文件已在目录中(文件清单中已登记)，直接写入数据库
+            downloaded_file = (
+                file_path if self.cninfo.manifest.contains(file_path) else None
+            )
+        except Exception:
+            self._release(announcement_id)
+            raise
+        emit((page_num, announcement, record, downloaded_file))
+
+    def _download(self, item, emit):
+        """文件下载阶段: (页码, 公告, 记录) -> (页码, 记录)，下载完成的文件移入BlobStore"""
+        page_num, announcement, record, downloaded_file = item
+        try:
+            if not downloaded_file:
+                downloaded_file = self.cninfo.download_announcement(
+                    announcement, record["downloadUrl"], self.download_dir
+                )
+            if downloaded_file:
+                self.cninfo.store_file(record, downloaded_file)
+        except Exception:
+            self._release(record["announcementId"])
+            raise
+        if downloaded_file:
+            emit((page_num, record))
+        else:
+            self._count("failed_downloads")
+            self.logger.warning(f"download failed: {record['announcementId']}")
+            self._release(record["announcementId"])
+            self._item_done(page_num, ok=False)
+
+    def _write(self, item, emit):
+        """数据库写入阶段(缓冲后批量提交)"""
+        page_num, record = item
+        try:
+            self.cninfo.writer.add(record)
+        finally:
+            # 写入缓冲区后record_exists即可识别，移出处理中集合
+            self._release(record["announcementId"])
+        self._count("saved")
+        self._item_done(page_num)
+
+    def run(
+        self, start_date, end_date, total_page, start_page=1, resume=False
+    ) -> dict:
+        """
+        运行流水线，直到所有页面处理完成
+        参数:
+            start_date: 开始日期(YYYY-MM-DD格式)
+            end_date: 结束日期(YYYY-MM-DD格式)
+            total_page: 总页数(最后一页页码)
+            start_page: 起始页码，默认1
+            resume: 是否跳过断点中已完成的页面，默认False
+        返回:
+            dict: 统计数据(pages/saved/skipped/failed_pages/failed_downloads/errors)
+        """
+        self._start_date = start_date
+        self._end_date = end_date
+        self._crawl_key = self.cninfo.crawl_key(start_date, end_date)
+        self._in_flight = set()
+        self._outstanding = {}
+        self.stats = {}
+        self.cninfo.prepare_download_dir(self.download_dir)
+
+        page_q = queue.Queue()
+        announcement_q = queue.Queue(maxsize=self.queue_size)
+        download_q = queue.Queue(maxsize=self.queue_size)
+        record_q = queue.Queue(maxsize=self.queue_size)
+
+        done_pages = (
+            self.cninfo.checkpoint.completed_pages(self._crawl_key) if resume else set()
+        )
+        for page_num in range(start_page, total_page + 1):
+            if page_num not in done_pages:
+                page_q.put(page_num)
+        for _ in range(self.listing_workers):
+            page_q.put(self._STOP)
+
+        threads = []
+        threads += self._run_stage(
+            "listing",
+            page_q,
+            announcement_q,
+            self._fetch_listing,
+            self.listing_workers,
+            self.normalise_workers,
+        )
+        threads += self._run_stage(
+            "normalise",
+            announcement_q,
+            download_q,
+            self._normalise,
+            self.normalise_workers,
+            self.download_workers,
+        )
+        threads += self._run_stage(
+            "download",
+            download_q,
+            record_q,
+            self._download,
+            self.download_workers,
+            1,
+        )
+        # sqlite写入只使用一个worker
+        threads += self._run_stage("writer", record_q, None, self._write, 1, 0)
+
+        for t in threads:
+            t.join()
+        self.cninfo.writer.flush()
+
+        self.logger.info(f"pipeline finished: {self.stats}")
+        return dict(self.stats)
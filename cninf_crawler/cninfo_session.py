@@ -0,0 +1,131 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import common_path  # noqa: F401 (共用模块目录加入sys.path)
+from rate_limiter import get_limiter
+import logging
+import threading
+import time
+
+
+class CninfoSession:
+    """
+    CninfoSession - 巨潮资讯网共享HTTP会话
+    - 连接池复用TCP/TLS连接(keep-alive)
+    - 对5xx及连接重置自动重试(指数退避)
+    - 每个请求默认超时
+    - Cookie持久化(首次请求前访问搜索页获取JSESSIONID)
+    - 按host自适应限速(AIMD令牌桶)，根据延迟和403/429/5xx动态调整
+    """
+
+    """
+    访问该页面以获取服务器下发的Cookie
+    """
+    WARMUP_URL = "https://www.cninfo.com.cn/new/commonUrl/pageOfSearch?url=disclosure/list/search"
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeout=(5, 30),
+        status_forcelist=(500, 502, 503, 504),
+        user_agent: str = None,
+        logger: logging.Logger = None,
+    ):
+        """
+        初始化会话
+        参数:
+            pool_size: 每个host的最大连接数
+            max_retries: 最大重试次数
+            backoff_factor: 退避系数，第n次重试前等待 backoff_factor * 2^(n-1) 秒
+            timeout: 默认超时时间(秒)，可为 (连接超时, 读取超时)
+            status_forcelist: 需要重试的HTTP状态码
+            user_agent: 会话默认User-Agent
+            logger: 可指定的自定义日志记录器
+        """
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger("CninfoSession")
+        self._warmed_up = False
+        self._warmup_lock = threading.Lock()
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            # 查询接口虽为POST，但只读且幂等，可安全重试
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+
+    def warm_up(self, headers: dict = None) -> bool:
+        """
+        访问搜索页获取Cookie(只执行一次)，失败时不影响后续请求
+        参数:
+            headers: 请求头
+        返回:
+            bool: 是否获取到Cookie
+        """
+        if self._warmed_up:
+            return True
+        with self._warmup_lock:
+            if self._warmed_up:
+                return True
+            try:
+                self.session.get(self.WARMUP_URL, headers=headers, timeout=self.timeout)
+                self.logger.info(
+                    f"cookies: {', '.join(self.session.cookies.keys()) or 'none'}"
+                )
+            except requests.RequestException as e:
+                self.logger.warning(f"获取Cookie失败: {str(e)}")
+            # 不论成功与否只尝试一次，避免每次请求都重复访问
+            self._warmed_up = True
+        return len(self.session.cookies) > 0
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送请求，未指定timeout时使用默认超时，请求前按host限速
+        参数:
+            method: 请求方法
+            url: 请求地址
+            kwargs: 透传给requests的参数
+        返回:
+            requests.Response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        limiter = get_limiter(url)
+        limiter.acquire()
+        start = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            limiter.report(latency=time.monotonic() - start, error=True)
+            raise
+        retry_after = response.headers.get("Retry-After", "")
+        limiter.report(
+            latency=time.monotonic() - start,
+            status=response.status_code,
+            retry_after=float(retry_after) if retry_after.isdigit() else None,
+        )
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """关闭会话及连接池"""
+        self.session.close()
@@ -0,0 +1,199 @@
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+
+class ShardPlanner:
+    """
+    ShardPlanner - 按公告数量把日期区间切分为分片，并在多个worker间并行下载
+    - 用query_record方式的探测请求(只取第一页统计)获取区间内公告数
+    - 超过上限的区间二分，直至单日；单日仍超过上限时按页码区间切分(日内分片)
+    - 日内分片只是同一查询的不同页码区间，仅用于并行翻页，
+      并不能绕过服务端对单个查询的结果数上限，超出上限的公告仍需缩小关键词/板块后另行下载
+    - 相邻的小区间会被合并，避免产生过多只有几条公告的分片
+
+    分片(dict)字段:
+        - id: 分片标识，如"2025-07-01~2025-07-03#1-100"
+        - start_date / end_date: 日期区间(YYYY-MM-DD)
+        - start_page / end_page: 页码区间(包含两端)
+        - records: 分片内公告数(估计值)
+    """
+
+    def __init__(
+        self,
+        cninfo,
+        max_shard_records: int = 3000,
+        page_size: int = 30,
+        workers: int = 4,
+        logger: logging.Logger = None,
+    ):
+        """
+        初始化分片规划器
+        参数:
+            cninfo: Cninfo实例，提供build_payload/post_query/query_all
+            max_shard_records: 单个分片的最大公告数(按日期切分时用于控制分片大小)
+            page_size: 每页公告数，与查询参数pageSize一致
+            workers: 探测及下载的并行worker数
+            logger: 可指定的自定义日志记录器
+        """
+        self.cninfo = cninfo
+        self.max_shard_records = max(page_size, int(max_shard_records))
+        self.page_size = page_size
+        self.workers = max(1, int(workers))
+        self.logger = logger or logging.getLogger("ShardPlanner")
+
+    def probe(self, start_date: str, end_date: str):
+        """
+        探测日期区间内的公告数(使用当前关键词和板块)
+        参数:
+            start_date: 开始日期(YYYY-MM-DD格式)
+            end_date: 结束日期(YYYY-MM-DD格式)
+        返回:
+            int: 公告数，查询失败返回None
+        """
+        data = self.cninfo.post_query(self.cninfo.build_payload(start_date, end_date))
+        if data is None:
+            return None
+        return int(data.get("totalAnnouncement") or data.get("totalRecordNum") or 0)
+
+    def _count_ranges(self, start: datetime, end: datetime) -> list:
+        """
+        逐层探测区间公告数，超过上限且跨多天的区间二分后继续探测
+        返回:
+            list: [(开始日期, 结束日期, 公告数)]，按日期排序
+        """
+        fmt = "%Y-%m-%d"
+        ranges = []
+        pending = [(start, end)]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending:
+                counts = executor.map(
+                    lambda r: self.probe(r[0].strftime(fmt), r[1].strftime(fmt)),
+                    pending,
+                )
+                next_pending = []
+                for (r_start, r_end), count in zip(pending, counts):
+                    if count is None:
+                        raise RuntimeError(
+                            f"probe failed: {r_start:%Y-%m-%d}~{r_end:%Y-%m-%d}"
+                        )
+                    if count <= self.max_shard_records or r_start == r_end:
+                        ranges.append((r_start, r_end, count))
+                    else:
+                        mid = r_start + timedelta(days=(r_end - r_start).days // 2)
+                        next_pending.append((r_start, mid))
+                        next_pending.append((mid + timedelta(days=1), r_end))
+                pending = next_pending
+        return sorted(ranges)
+
+    def plan(self, start_date: str, end_date: str) -> list:
+        """
+        生成分片计划
+        参数:
+            start_date: 开始日期(YYYY-MM-DD格式)
+            end_date: 结束日期(YYYY-MM-DD格式)
+        返回:
+            list: 分片列表
+        """
+        fmt = "%Y-%m-%d"
+        ranges = self._count_ranges(
+            datetime.strptime(start_date, fmt), datetime.strptime(end_date, fmt)
+        )
+
+        shards = []
+        pending = None  # 正在合并的相邻小区间 [开始, 结束, 公告数]
+        for r_start, r_end, count in ranges:
+            if count == 0:
+                continue
+            if count > self.max_shard_records:
+                # 单日公告过多，按页码切分；各分片仍是同一查询，服务端结果数上限依然生效
+                self.logger.warning(
+                    f"{r_start:%Y-%m-%d} has {count} records, split by page range; "
+                    f"server-side result cap still applies to this day"
+                )
+                if pending:
+                    shards.append(self._make_shard(*pending))
+                    pending = None
+                total_page = math.ceil(count / self.page_size)
+                pages_per_shard = self.max_shard_records // self.page_size
+                for first in range(1, total_page + 1, pages_per_shard):
+                    last = min(total_page, first + pages_per_shard - 1)
+                    records = min(count, last * self.page_size)
+                    records -= (first - 1) * self.page_size
+                    shards.append(
+                        self._make_shard(r_start, r_end, records, first, last)
+                    )
+                continue
+            if pending and pending[2] + count <= self.max_shard_records:
+                pending = [pending[0], r_end, pending[2] + count]
+            else:
+                if pending:
+                    shards.append(self._make_shard(*pending))
+                pending = [r_start, r_end, count]
+        if pending:
+            shards.append(self._make_shard(*pending))
+
+        total = sum(shard["records"] for shard in shards)
+        self.logger.info(
+            f"planned {len(shards)} shards for {start_date}~{end_date}, {total} records"
+        )
+        return shards
+
+    def _make_shard(self, start, end, records, start_page=1, end_page=None) -> dict:
+        """构造分片dict"""
+        start_date = start.strftime("%Y-%m-%d")
+        end_date = end.strftime("%Y-%m-%d")
+        if end_page is None:
+            end_page = max(1, math.ceil(records / self.page_size))
+        return {
+            "id": f"{start_date}~{end_date}#{start_page}-{end_page}",
+            "start_date": start_date,
+            "end_date": end_date,
+            "start_page": start_page,
+            "end_page": end_page,
+            "records": records,
+        }
+
+    def run(self, shards: list, on_shard_done=None, **query_kwargs) -> dict:
+        """
+        在worker间并行执行分片下载
+        参数:
+            shards: plan()生成的分片列表
+            on_shard_done: 分片完成回调 on_shard_done(shard, saved_cnt, error)
+            query_kwargs: 透传给Cninfo.query_all的参数(如max_save_cnt/max_fail)
+        返回:
+            dict: {分片id: 下载文件数}，失败的分片为None
+        """
+        results = {}
+        done_cnt = 0
+
+        def run_shard(shard):
+            return self.cninfo.query_all(
+                shard["start_date"],
+                shard["end_date"],
+                shard["end_page"],
+                start_page=shard["start_page"],
+                **query_kwargs,
+            )
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(run_shard, shard): shard for shard in shards}
+            for future in as_completed(futures):
+                shard = futures[future]
+                error = future.exception()
+                saved = None if error else future.result()
+                results[shard["id"]] = saved
+                done_cnt += 1
+                if error:
+                    self.logger.error(
+                        f"[shard {done_cnt}/{len(shards)}] {shard['id']} failed: {error}"
+                    )
+                else:
+                    self.logger.info(
+                        f"[shard {done_cnt}/{len(shards)}] {shard['id']} done, "
+                        f"saved {saved} files"
+                    )
+                if on_shard_done:
+                    on_shard_done(shard, saved, error)
+        return results
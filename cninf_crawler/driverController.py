@@ -3,6 +3,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
+import common_path  # noqa: F401 (共用模块目录加入sys.path)
+from download_watcher import DownloadWatcher
 import logging
 import os
 import time
@@ -15,14 +17,27 @@ class DriverController:
         driver: webdriver.Chrome = None,
         download_dir: str = None,
         logger: logging.Logger = None,
+        debug: bool = False,
     ):
+        """
+        - 初始化driver
+        - 输入：
+            - driver: 可选的现有浏览器驱动实例
+            - download_dir: 文件下载目录
+            - logger: 可指定的自定义日志记录器
+            - debug: 调试模式，高亮操作的元素并加入随机停顿；
+                关闭时只按页面条件显式等待(请求节奏由限速器控制)
+        - 输出：无
+        """
         self.driver = driver
+        self.debug = debug
         self.logger = logger or self._setup_default_logger()
         self.download_dir = (
             download_dir or "cninfo_file/announcements"
         )  # default settings
         os.makedirs(self.download_dir, exist_ok=True)
         self._is_self_managed_driver = False
+        self.download_watcher = None
 
     def _setup_default_logger(self) -> logging.Logger:
         """
@@ -65,6 +80,7 @@ class DriverController:
             "safebrowsing.enabled": False,
         }
         options.add_experimental_option("prefs", prefs)
+        DownloadWatcher.enable_logging(options)
         return options
 
     def start_browser(self, headless: bool = False) -> None:
@@ -86,6 +102,10 @@ class DriverController:
             self.driver = webdriver.Chrome(options=options)
             self.driver.maximize_window()
             self._is_self_managed_driver = True
+            self.download_watcher = DownloadWatcher(
+                self.driver, download_dir, self.logger
+            )
+            self.download_watcher.enable()
             self.logger.info(
                 f"Browser started with download path: {os.path.abspath(download_dir)}"
             )
@@ -94,25 +114,34 @@ class DriverController:
             raise
 
     def _wait_and_highlight(
-        self, by: str, locator: str, timeout: int = 10, highlight_color: str = "red"
+        self,
+        by: str,
+        locator: str,
+        timeout: int = 10,
+        highlight_color: str = "red",
+        clickable: bool = False,
     ):
         """
-        - 等待并高亮元素
+        - 等待元素出现(或可点击)，调试模式下高亮元素并停顿
         - 输入：
         - by: 定位策略
         - locator: 元素定位表达式
         - timeout: 最大等待时间
         - highlight_color: 高亮颜色
+        - clickable: 是否等待元素可点击
         - 输出：找到的页面元素
         """
-        context = self.driver
-        element = WebDriverWait(context, timeout).until(
-            EC.presence_of_element_located((by, locator))
+        condition = (
+            EC.element_to_be_clickable
+            if clickable
+            else EC.presence_of_element_located
         )
-        self.driver.execute_script(
-            f"arguments[0].style.border='3px solid {highlight_color}';", element
-        )
-        time.sleep(random.uniform(0.5, 1.0))
+        element = WebDriverWait(self.driver, timeout).until(condition((by, locator)))
+        if self.debug:
+            self.driver.execute_script(
+                f"arguments[0].style.border='3px solid {highlight_color}';", element
+            )
+            time.sleep(random.uniform(0.5, 1.0))
         return element
 
     def _reliable_click(self, element):
@@ -127,7 +156,7 @@ class DriverController:
         except:
             try:
                 ActionChains(self.driver).move_to_element(element).pause(
-                    random.uniform(0.5, 1.0)
+                    random.uniform(0.5, 1.0) if self.debug else 0
                 ).click().perform()
             except:
                 self.driver.execute_script("arguments[0].click();", element)
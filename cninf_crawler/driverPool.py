@@ -0,0 +1,182 @@
+from driverController import DriverController
+from contextlib import contextmanager
+import logging
+import queue
+import threading
+import time
+
+
+class DriverPool:
+    """
+    DriverPool - 长期复用的浏览器池，避免每个文件都冷启动一次Chrome
+
+    属性：
+        size (int): 池中浏览器的最大数量
+        download_dir (str): 池中浏览器的文件下载目录
+        headless (bool): 是否无头模式运行
+        logger (logging.Logger): 日志记录器
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        download_dir: str = None,
+        headless: bool = False,
+        logger: logging.Logger = None,
+    ):
+        """
+        - 初始化浏览器池(浏览器按需启动，不在此处预先创建)
+        - 输入：
+            - size: 池中浏览器的最大数量
+            - download_dir: 文件下载目录
+            - headless: 是否无头模式运行
+            - logger: 可指定的自定义日志记录器
+        - 输出：无
+        """
+        self.size = max(1, int(size))
+        self.download_dir = download_dir
+        self.headless = headless
+        self.logger = logger or logging.getLogger("DriverPool")
+        self._idle = []
+        self._all = []
+        self._count = 0
+        self._lock = threading.Lock()
+        # 归还浏览器或移除失效浏览器时唤醒等待者，重新检查空闲浏览器和池容量
+        self._available = threading.Condition(self._lock)
+        self._closed = False
+
+    def _create(self) -> DriverController:
+        """
+        - 启动一个新的浏览器并加入池中
+        - 输入：无
+        - 输出：新建的DriverController
+        """
+        dc = DriverController(download_dir=self.download_dir)
+        dc.start_browser(headless=self.headless)
+        self.logger.info(f"Pool browser started (max size: {self.size})")
+        return dc
+
+    def _is_healthy(self, dc: DriverController) -> bool:
+        """
+        - 检查浏览器是否仍可用(会话未失效、窗口未关闭)
+        - 输入：
+            - dc: 待检查的DriverController
+        - 输出：可用返回True，否则False
+        """
+        if dc.driver is None:
+            return False
+        try:
+            return len(dc.driver.window_handles) > 0
+        except Exception:
+            return False
+
+    def _discard(self, dc: DriverController) -> None:
+        """
+        - 关闭并移除失效的浏览器
+        - 输入：
+            - dc: 待移除的DriverController
+        - 输出：无
+        """
+        with self._available:
+            if dc in self._all:
+                self._all.remove(dc)
+                self._count -= 1
+            # 腾出的名额交给等待中的线程新建浏览器
+            self._available.notify()
+        try:
+            dc.close()
+        except Exception as e:
+            self.logger.warning(f"关闭失效浏览器时出错: {str(e)}")
+
+    def acquire(self, timeout: float = None) -> DriverController:
+        """
+        - 从池中借出一个可用浏览器，池未满时按需启动新浏览器
+        - 输入：
+            - timeout: 池满且无空闲浏览器时的最大等待时间(秒)，None表示一直等待
+        - 输出：可用的DriverController(等待超时抛出queue.Empty)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("DriverPool is closed")
+                    if self._idle:
+                        dc = self._idle.pop()
+                        break
+                    if self._count < self.size:
+                        # 先占位，避免并发时超出池大小
+                        self._count += 1
+                        dc = None
+                        break
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise queue.Empty
+                    self._available.wait(remaining)
+
+            if dc is None:
+                try:
+                    dc = self._create()
+                except Exception:
+                    with self._available:
+                        self._count -= 1
+                        self._available.notify()
+                    raise
+                with self._lock:
+                    self._all.append(dc)
+                return dc
+
+            if self._is_healthy(dc):
+                return dc
+            self.logger.warning("Pool browser is unhealthy, restarting")
+            self._discard(dc)
+
+    def release(self, dc: DriverController) -> None:
+        """
+        - 归还浏览器到池中，失效的浏览器直接关闭
+        - 输入：
+            - dc: 借出的DriverController
+        - 输出：无
+        """
+        if self._closed or not self._is_healthy(dc):
+            self._discard(dc)
+            return
+        with self._available:
+            self._idle.append(dc)
+            self._available.notify()
+
+    @contextmanager
+    def driver(self, timeout: float = None):
+        """
+        - 以上下文管理器方式借用浏览器，退出时自动归还
+        - 输入：
+            - timeout: 等待空闲浏览器的最大时间(秒)
+        - 输出：可用的DriverController
+        """
+        dc = self.acquire(timeout=timeout)
+        try:
+            yield dc
+        finally:
+            self.release(dc)
+
+    def close(self) -> None:
+        """
+        - 关闭池中所有浏览器(仅在程序结束时调用)
+        - 输入：无
+        - 输出：无
+        """
+        with self._available:
+            self._closed = True
+            controllers = self._all
+            self._all = []
+            self._idle = []
+            self._count = 0
+            self._available.notify_all()
+        for dc in controllers:
+            try:
+                dc.close()
+            except Exception as e:
+                self.logger.error(f"关闭浏览器时出错: {str(e)}")
+        self.logger.info("Driver pool closed")
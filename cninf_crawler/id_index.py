@@ -0,0 +1,217 @@
+import bisect
+import hashlib
+import heapq
+import logging
+import mmap
+import os
+import struct
+import threading
+from array import array
+
+
+class AnnouncementIdIndex:
+    """
+    AnnouncementIdIndex - 紧凑的公告ID去重索引
+    - 公告ID转换为64位整数，排序后保存在文件中，通过mmap二分查找，不需要把ID加载为Python对象
+    - 新增ID先放在内存中的小集合里，超过merge_threshold时合并写回文件
+    - 文件头记录索引覆盖的数据库行数，用于启动时判断索引是否需要重建
+
+    文件格式(本机字节序):
+        - 8字节魔数 b"CNIDX001"
+        - 8字节 uint64: 索引覆盖的数据库行数
+        - 8字节 uint64: 数组长度
+        - N个 uint64: 排序后的ID
+    """
+
+    MAGIC = b"CNIDX001"
+    HEADER = struct.Struct("=8sQQ")
+
+    def __init__(self, path: str, merge_threshold: int = 10000):
+        """
+        初始化索引(不读取文件，需调用open或build)
+        参数:
+            path: 索引文件路径
+            merge_threshold: 内存中新增ID超过该数量时合并写回文件
+        """
+        self.path = os.path.abspath(path)
+        self.merge_threshold = merge_threshold
+        self.logger = logging.getLogger("AnnouncementIdIndex")
+        self.row_count = 0
+        self._file = None
+        self._mmap = None
+        self._view = None
+        self._ids = ()  # mmap上的uint64视图
+        self._pending = set()  # 尚未写回文件的新增ID
+        self._removed = set()  # 已删除但仍在文件中的ID
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def to_key(announcement_id) -> int:
+        """
+        公告ID转换为64位整数
+        纯数字ID直接使用数值，其他ID取blake2b的63位摘要并置最高位，两类不会冲突
+        """
+        text = str(announcement_id)
+        if text.isdigit() and int(text) < (1 << 63):
+            return int(text)
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") | (1 << 63)
+
+    def open(self) -> bool:
+        """
+        打开并映射索引文件
+        返回:
+            bool: 文件存在且格式正确返回True
+        """
+        with self._lock:
+            self._unmap()
+            if not os.path.exists(self.path):
+                return False
+            self._file = open(self.path, "rb")
+            header = self._file.read(self.HEADER.size)
+            if len(header) != self.HEADER.size:
+                self._unmap()
+                return False
+            magic, row_count, length = self.HEADER.unpack(header)
+            if magic != self.MAGIC or os.path.getsize(self.path) != (
+                self.HEADER.size + length * 8
+            ):
+                self._unmap()
+                return False
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+            self._ids = self._view[self.HEADER.size :].cast("Q")
+            self.row_count = row_count
+            self._pending = set()
+            self._removed = set()
+            return True
+
+    def build(self, announcement_ids, row_count: int, chunk_size: int = 1000000):
+        """
+        由数据库中的全部公告ID重建索引文件
+        分块排序后归并，内存中同一时间只有一个块是Python整数
+        参数:
+            announcement_ids: 公告ID(可迭代，流式读取)
+            row_count: 数据库行数
+            chunk_size: 每个排序块的ID数
+        """
+        runs = []
+        chunk = []
+        for announcement_id in announcement_ids:
+            chunk.append(self.to_key(announcement_id))
+            if len(chunk) >= chunk_size:
+                runs.append(array("Q", sorted(chunk)))
+                chunk = []
+        runs.append(array("Q", sorted(chunk)))
+        with self._lock:
+            self._write(self._unique(heapq.merge(*runs)), row_count)
+        self.logger.info(f"id index rebuilt: {len(self._ids)} ids")
+
+    @staticmethod
+    def _unique(keys):
+        """去除有序序列中的重复值"""
+        last = None
+        for key in keys:
+            if key != last:
+                yield key
+                last = key
+
+    def _write(self, keys, row_count: int, chunk_size: int = 65536) -> None:
+        """将排序后的ID写入临时文件，再原子替换索引文件并重新映射"""
+        temp_path = self.path + ".tmp"
+        length = 0
+        with open(temp_path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, row_count, 0))
+            buffer = array("Q")
+            for key in keys:
+                buffer.append(key)
+                if len(buffer) >= chunk_size:
+                    buffer.tofile(f)
+                    length += len(buffer)
+                    buffer = array("Q")
+            buffer.tofile(f)
+            length += len(buffer)
+            f.seek(0)
+            f.write(self.HEADER.pack(self.MAGIC, row_count, length))
+        # Windows下被映射的文件无法替换，先解除映射
+        self._unmap()
+        os.replace(temp_path, self.path)
+        self.open()
+
+    def _in_file(self, key: int) -> bool:
+        """在映射的有序数组中二分查找"""
+        i = bisect.bisect_left(self._ids, key)
+        return i < len(self._ids) and self._ids[i] == key
+
+    def __contains__(self, announcement_id) -> bool:
+        key = self.to_key(announcement_id)
+        with self._lock:
+            if key in self._pending:
+                return True
+            if key in self._removed:
+                return False
+            return self._in_file(key)
+
+    def __len__(self) -> int:
+        return self.row_count + len(self._pending) - len(self._removed)
+
+    def add(self, announcement_id) -> None:
+        """
+        新增一个公告ID(数据库写入成功后调用)
+        """
+        key = self.to_key(announcement_id)
+        with self._lock:
+            if key in self._removed:
+                self._removed.discard(key)
+            elif not self._in_file(key):
+                self._pending.add(key)
+                if len(self._pending) >= self.merge_threshold:
+                    self.flush()
+
+    def discard(self, announcement_id) -> None:
+        """
+        删除一个公告ID
+        """
+        key = self.to_key(announcement_id)
+        with self._lock:
+            if key in self._pending:
+                self._pending.discard(key)
+            elif self._in_file(key):
+                self._removed.add(key)
+
+    def flush(self) -> None:
+        """
+        将内存中的新增/删除合并写回索引文件
+        """
+        with self._lock:
+            if not self._pending and not self._removed:
+                return
+            row_count = len(self)
+            pending = sorted(self._pending)
+            removed = self._removed
+            merged = (
+                key
+                for key in heapq.merge(self._ids, pending)
+                if key not in removed
+            )
+            self._write(merged, row_count)
+
+    def _unmap(self) -> None:
+        """释放mmap及文件句柄"""
+        if isinstance(self._ids, memoryview):
+            self._ids.release()
+            self._view.release()
+        self._ids = ()
+        self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        """写回未保存的ID并关闭索引"""
+        with self._lock:
+            self.flush()
+            self._unmap()
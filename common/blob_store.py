@@ -0,0 +1,98 @@
+import hashlib
+import os
+import shutil
+import uuid
+
+
+class BlobStore:
+    """
+    BlobStore - 按内容哈希寻址的分层文件存储
+    - 文件以SHA256命名，按哈希前缀分为多级子目录(默认 ab/cd/abcd....pdf)，
+      百万级文件时每个目录下也只有少量文件，目录操作不随归档规模变慢
+    - 相同内容只保存一份，不同标题下载到的同一PDF会映射到同一个文件
+    - 文件名即内容哈希，写入后不会被修改，可以安全地并发写入
+    """
+
+    def __init__(self, root: str, depth: int = 2, width: int = 2, ext: str = ".pdf"):
+        """
+        初始化存储
+        参数:
+            root: 存储根目录
+            depth: 子目录层数
+            width: 每层子目录名取哈希的字符数
+            ext: 默认文件扩展名
+        """
+        self.root = os.path.abspath(root)
+        self.depth = depth
+        self.width = width
+        self.ext = ext
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def hash_file(path: str, chunk_size: int = 1024 * 1024):
+        """
+        计算文件的SHA256
+        参数:
+            path: 文件路径
+            chunk_size: 每次读取的字节数
+        返回:
+            tuple: (十六进制哈希, 文件大小)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        return digest.hexdigest(), size
+
+    def path_for(self, digest: str, ext: str = None) -> str:
+        """
+        内容哈希对应的存储路径
+        参数:
+            digest: 十六进制SHA256
+            ext: 文件扩展名(默认使用初始化时的扩展名)
+        返回:
+            str: 文件路径
+        """
+        parts = [
+            digest[i * self.width : (i + 1) * self.width] for i in range(self.depth)
+        ]
+        name = digest + (self.ext if ext is None else ext)
+        return os.path.join(self.root, *parts, name)
+
+    def exists(self, digest: str, ext: str = None) -> bool:
+        """内容是否已保存"""
+        return os.path.exists(self.path_for(digest, ext))
+
+    def put_file(self, src_path: str, ext: str = None, move: bool = True):
+        """
+        保存文件(内容已存在时不重复保存)
+        参数:
+            src_path: 待保存的文件
+            ext: 文件扩展名(默认使用src_path的扩展名，没有时使用初始化时的扩展名)
+            move: 是否移动源文件(否则复制)
+        返回:
+            tuple: (十六进制哈希, 存储路径, 文件大小)
+        """
+        if ext is None:
+            ext = os.path.splitext(src_path)[1].lower() or self.ext
+        digest, size = self.hash_file(src_path)
+        path = self.path_for(digest, ext)
+        if os.path.exists(path):
+            if move:
+                os.remove(src_path)
+            return digest, path, size
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if move:
+            try:
+                os.replace(src_path, path)
+            except OSError:
+                # 跨磁盘时无法直接重命名
+                shutil.move(src_path, path)
+        else:
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            shutil.copyfile(src_path, temp_path)
+            os.replace(temp_path, path)
+        return digest, path, size
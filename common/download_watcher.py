@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import re
+import time
+
+
+class DownloadWatcher:
+    """
+    DownloadWatcher - 基于Chrome DevTools下载事件的下载完成检测
+    - Browser.setDownloadBehavior(allowAndName, eventsEnabled): 文件先以GUID命名保存，
+      并产生downloadWillBegin/downloadProgress事件
+    - 事件从ChromeDriver性能日志(goog:loggingPrefs)读取，按GUID匹配，下载完成立即返回，
+      与下载目录中已有的文件数量无关，同一目录下的并发下载也不会混淆
+    - 浏览器未开启性能日志时保持原有下载行为，退回到目录轮询
+    """
+
+    """
+    创建浏览器时需开启的日志选项
+    """
+    LOGGING_PREFS = {"performance": "ALL"}
+
+    def __init__(self, driver, download_dir: str, logger: logging.Logger = None):
+        """
+        初始化下载监听
+        参数:
+            driver: Selenium浏览器(创建时需调用enable_logging开启性能日志)
+            download_dir: 浏览器下载目录
+            logger: 可指定的自定义日志记录器
+        """
+        self.driver = driver
+        self.download_dir = os.path.abspath(download_dir)
+        self.logger = logger or logging.getLogger("DownloadWatcher")
+        self.events_enabled = False
+
+    @classmethod
+    def enable_logging(cls, options) -> None:
+        """
+        在浏览器选项中开启性能日志(下载事件通过性能日志读取)
+        参数:
+            options: ChromeOptions
+        """
+        options.set_capability("goog:loggingPrefs", cls.LOGGING_PREFS)
+
+    def enable(self) -> bool:
+        """
+        开启下载事件，性能日志不可用时不修改浏览器的下载行为
+        返回:
+            bool: 是否使用下载事件
+        """
+        try:
+            self.driver.get_log("performance")
+        except Exception:
+            self.logger.info("performance log unavailable, fall back to polling")
+            self.events_enabled = False
+            return False
+        params = {
+            "behavior": "allowAndName",
+            "downloadPath": self.download_dir,
+            "eventsEnabled": True,
+        }
+        try:
+            self.driver.execute_cdp_cmd("Browser.setDownloadBehavior", params)
+        except Exception:
+            try:
+                params.pop("eventsEnabled")
+                self.driver.execute_cdp_cmd("Page.setDownloadBehavior", params)
+            except Exception as e:
+                self.logger.warning(f"setDownloadBehavior failed: {str(e)}")
+                self.events_enabled = False
+                return False
+        self.events_enabled = True
+        return True
+
+    def _read_events(self) -> list:
+        """
+        读取性能日志中的下载事件
+        返回:
+            list: [(事件名, 参数)]
+        """
+        events = []
+        for entry in self.driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get("method", "")
+            if method.endswith(".downloadWillBegin") or method.endswith(
+                ".downloadProgress"
+            ):
+                events.append((method, message.get("params") or {}))
+        return events
+
+    def _list_files(self) -> set:
+        """列出下载目录中已完成的文件(仅轮询模式使用)"""
+        if not os.path.isdir(self.download_dir):
+            return set()
+        return {
+            entry.name
+            for entry in os.scandir(self.download_dir)
+            if entry.is_file() and not entry.name.endswith(".crdownload")
+        }
+
+    def begin(self) -> dict:
+        """
+        在触发下载之前调用: 丢弃之前的日志(轮询模式下记录当前文件)
+        返回:
+            dict: 传给wait的下载标记
+        """
+        if self.events_enabled:
+            self.driver.get_log("performance")
+            return {"files": None}
+        return {"files": self._list_files()}
+
+    def wait(self, token: dict, timeout: float = 30, poll_interval: float = 0.2):
+        """
+        等待下载完成
+        参数:
+            token: begin返回的下载标记
+            timeout: 最大等待时间(秒)
+            poll_interval: 读取事件/轮询的间隔(秒)
+        返回:
+            str: 下载完成的文件路径，超时或下载取消返回None
+        """
+        deadline = time.monotonic() + timeout
+        guid = None
+        suggested_name = None
+        sizes = {}
+        while time.monotonic() < deadline:
+            if self.events_enabled:
+                for method, params in self._read_events():
+                    if method.endswith(".downloadWillBegin") and guid is None:
+                        guid = params.get("guid")
+                        suggested_name = params.get("suggestedFilename")
+                    elif params.get("guid") == guid and guid is not None:
+                        state = params.get("state")
+                        if state == "completed":
+                            return self._finish(guid, suggested_name, params)
+                        if state == "canceled":
+                            self.logger.warning(f"download canceled: {guid}")
+                            return None
+            else:
+                # 轮询模式: 新出现且两次检查大小不变的文件视为下载完成
+                for name in self._list_files() - token["files"]:
+                    path = os.path.join(self.download_dir, name)
+                    size = os.path.getsize(path)
+                    if size > 0 and sizes.get(name) == size:
+                        return path
+                    sizes[name] = size
+            time.sleep(poll_interval)
+        return None
+
+    def _finish(self, guid: str, suggested_name: str, params: dict) -> str:
+        """
+        下载完成: GUID命名的文件重命名为服务端建议的文件名
+        返回:
+            str: 文件路径
+        """
+        guid_path = os.path.join(self.download_dir, guid)
+        if not os.path.exists(guid_path):
+            return params.get("filePath") or os.path.join(
+                self.download_dir, suggested_name or guid
+            )
+        if not suggested_name:
+            return guid_path
+        name = re.sub(r'[\\/*?:"<>|]', "", suggested_name) or guid
+        base, ext = os.path.splitext(name)
+        path = os.path.join(self.download_dir, name)
+        i = 1
+        while os.path.exists(path):
+            path = os.path.join(self.download_dir, f"{base} ({i}){ext}")
+            i += 1
+        os.replace(guid_path, path)
+        return path
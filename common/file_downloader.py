@@ -0,0 +1,270 @@
+import logging
+import os
+import re
+import time
+
+import requests
+
+from rate_limiter import get_limiter
+
+
+class FileDownloader:
+    """
+    FileDownloader - 可断点续传、校验大小的流式文件下载器
+    - 分块写入目标路径旁的 .part 临时文件，完成并校验大小后原子重命名
+    - 连接中断时保留 .part，下次请求通过HTTP Range从已下载的位置继续，
+      程序重启后再次下载同一文件时同样续传
+    - 服务端不支持Range(返回200)时从头下载
+    - 大小校验: Content-Range/Content-Length给出的总大小，以及调用方提供的预期大小
+    """
+
+    """
+    下载中的临时文件后缀
+    """
+    PART_SUFFIX = ".part"
+
+    CONTENT_RANGE_PATTERN = re.compile(r"bytes\s+(\d+)-\d+/(\d+|\*)")
+    UNSATISFIED_RANGE_PATTERN = re.compile(r"bytes\s+\*/(\d+)")
+
+    def __init__(
+        self,
+        session,
+        timeout=(5, 60),
+        chunk_size: int = 64 * 1024,
+        max_attempts: int = 3,
+        rate_limit: bool = True,
+        logger: logging.Logger = None,
+    ):
+        """
+        初始化下载器
+        参数:
+            session: requests.Session(或提供同样get接口的会话，如CninfoSession)
+            timeout: 请求超时时间(秒)，可为 (连接超时, 读取超时)
+            chunk_size: 流式写入块大小(字节)
+            max_attempts: 单个文件的最大请求次数(每次从已下载位置续传)
+            rate_limit: 是否按host限速(会话自身已限速时关闭)
+            logger: 可指定的自定义日志记录器
+        """
+        self.session = session
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.max_attempts = max(1, int(max_attempts))
+        self.rate_limit = rate_limit
+        self.logger = logger or logging.getLogger("FileDownloader")
+
+    def download(
+        self,
+        url: str,
+        save_path: str,
+        expected_size: int = None,
+        size_tolerance: int = 0,
+        headers: dict = None,
+    ) -> bool:
+        """
+        下载文件(同步)
+        参数:
+            url: 文件URL
+            save_path: 保存路径
+            expected_size: 预期文件大小(字节)，可为空
+            size_tolerance: 预期大小允许的误差(字节)
+            headers: 附加请求头
+        返回:
+            bool: 下载成功返回True，否则False
+        """
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        temp_path = save_path + self.PART_SUFFIX
+        for attempt in range(self.max_attempts):
+            offset = os.path.getsize(temp_path) if os.path.exists(temp_path) else 0
+            try:
+                total, resumed = self._fetch(url, temp_path, offset, headers)
+            except _Restart as e:
+                self.logger.warning(f"{str(e)}, restart: {url}")
+                self._remove(temp_path)
+                continue
+            except (requests.RequestException, _Interrupted) as e:
+                # 保留已下载的部分，下一次从断点继续
+                self.logger.warning(
+                    f"download interrupted ({attempt + 1}/{self.max_attempts}): "
+                    f"{url} ({str(e)})"
+                )
+                if attempt + 1 < self.max_attempts:
+                    time.sleep(min(2**attempt, 10))
+                continue
+            except _Rejected as e:
+                self.logger.warning(f"{str(e)}: {url}")
+                self._remove(temp_path)
+                return False
+            except OSError as e:
+                self.logger.error(f"write failed: {save_path} ({str(e)})")
+                self._remove(temp_path)
+                return False
+
+            size = os.path.getsize(temp_path)
+            if total is not None and 0 < size < total:
+                # 连接提前结束但未报错，下一次从断点继续
+                self.logger.warning(f"incomplete: {size}/{total} bytes, url: {url}")
+                continue
+            if not self._size_ok(size, total, expected_size, size_tolerance):
+                self.logger.warning(
+                    f"size mismatch: {size} bytes (server {total}, expected "
+                    f"{expected_size}), url: {url}"
+                )
+                self._remove(temp_path)
+                return False
+            os.replace(temp_path, save_path)
+            if resumed:
+                self.logger.info(f"resumed from {offset} bytes: {save_path}")
+            return True
+        self.logger.error(f"download failed after {self.max_attempts} attempts: {url}")
+        return False
+
+    def _fetch(self, url: str, temp_path: str, offset: int, headers: dict = None):
+        """
+        发送一次请求并写入临时文件
+        参数:
+            url: 文件URL
+            temp_path: 临时文件路径
+            offset: 已下载的字节数(大于0时发送Range请求)
+            headers: 附加请求头
+        返回:
+            tuple: (服务端给出的文件总大小(未知时为None), 是否从断点续传)
+        """
+        request_headers = dict(headers or {})
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+        limiter = get_limiter(url) if self.rate_limit else None
+        if limiter:
+            limiter.acquire()
+        start = time.monotonic()
+        try:
+            with self.session.get(
+                url, headers=request_headers, stream=True, timeout=self.timeout
+            ) as response:
+                if limiter:
+                    limiter.report(
+                        latency=time.monotonic() - start, status=response.status_code
+                    )
+                total, mode = self._check_response(response, offset)
+                if mode is None:
+                    return total, True
+                with open(temp_path, mode) as f:
+                    try:
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            if chunk:
+                                f.write(chunk)
+                    except requests.RequestException as e:
+                        raise _Interrupted(str(e))
+                return total, mode == "ab"
+        except requests.RequestException:
+            if limiter:
+                limiter.report(latency=time.monotonic() - start, error=True)
+            raise
+
+    def _check_response(self, response, offset: int):
+        """
+        根据响应状态决定写入方式
+        返回:
+            tuple: (文件总大小, 写入模式)；写入模式为None表示临时文件已完整
+        """
+        status = response.status_code
+        if status == 416 and offset:
+            # 请求的位置超出文件大小: 临时文件已完整，或服务端文件已变化
+            match = self.UNSATISFIED_RANGE_PATTERN.search(
+                response.headers.get("Content-Range", "")
+            )
+            if match and int(match.group(1)) == offset:
+                return offset, None
+            raise _Restart("range not satisfiable")
+        if status not in (200, 206):
+            raise _Rejected(f"HTTP {status}")
+        # 被拦截时服务端返回的是HTML页面而不是文件
+        if "html" in response.headers.get("Content-Type", ""):
+            raise _Rejected("unexpected html response")
+
+        length = response.headers.get("Content-Length")
+        length = int(length) if length and length.isdigit() else None
+        if status == 206:
+            match = self.CONTENT_RANGE_PATTERN.search(
+                response.headers.get("Content-Range", "")
+            )
+            if not match or int(match.group(1)) != offset:
+                raise _Restart("unexpected content range")
+            total = match.group(2)
+            return (int(total) if total.isdigit() else None), "ab"
+        # 200: 服务端不支持Range(或未发送Range)，从头写入
+        if offset:
+            self.logger.info("server ignored range request, download from start")
+        if response.headers.get("Content-Encoding") not in (None, "identity"):
+            length = None  # 压缩传输时Content-Length不是文件大小
+        return length, "wb"
+
+    @staticmethod
+    def _size_ok(size: int, total: int, expected_size: int, tolerance: int) -> bool:
+        """校验文件大小"""
+        if size == 0:
+            return False
+        if total is not None and size != total:
+            return False
+        if expected_size and abs(size - int(expected_size)) > tolerance:
+            return False
+        return True
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def cleanup(
+        directory: str,
+        crdownload_age: float = 3600,
+        part_age: float = 7 * 86400,
+        logger: logging.Logger = None,
+    ) -> int:
+        """
+        清理下载目录中残留的临时文件
+        - 浏览器崩溃后留下的 .crdownload 无法得知下载地址，超过crdownload_age后删除
+        - .part 保留用于续传，超过part_age仍未续传的删除
+        参数:
+            directory: 下载目录
+            crdownload_age: .crdownload 文件的保留时间(秒)
+            part_age: .part 文件的保留时间(秒)
+            logger: 可指定的自定义日志记录器
+        返回:
+            int: 删除的文件数
+        """
+        if not os.path.isdir(directory):
+            return 0
+        logger = logger or logging.getLogger("FileDownloader")
+        now = time.time()
+        removed = 0
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".crdownload"):
+                max_age = crdownload_age
+            elif entry.name.endswith(FileDownloader.PART_SUFFIX):
+                max_age = part_age
+            else:
+                continue
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime > max_age:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info(f"removed {removed} stale partial downloads in {directory}")
+        return removed
+
+
+class _Interrupted(Exception):
+    """传输中断(保留临时文件续传)"""
+
+
+class _Restart(Exception):
+    """临时文件无法续传(删除后从头下载)"""
+
+
+class _Rejected(Exception):
+    """服务端拒绝或返回的不是文件(不再重试)"""
@@ -0,0 +1,195 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+
+class FileManifest:
+    """
+    FileManifest - 已保存文件清单
+    - 记录每个文件的 (路径, 大小, 内容哈希, 公告key)，保存在公告数据库文件中的独立表内
+    - 启动时整表加载到内存字典，文件是否存在、文件大小都在内存中判断，
+      不再对每条公告访问文件系统(归档目录位于网络存储时stat/listdir很慢)
+    - 旧版下载目录中的文件通过scan_directory一次性登记(每个目录每次运行只扫描一次)
+    - 文件移入BlobStore或删除时同步更新清单
+    """
+
+    """
+    下载中的临时文件不登记
+    """
+    TEMP_SUFFIXES = (".part", ".crdownload", ".tmp")
+
+    def __init__(self, db_path: str):
+        """
+        初始化并加载文件清单
+        参数:
+            db_path: 数据库文件路径(一般与公告数据库相同)
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger("FileManifest")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._by_path = {}
+        self._scanned = set()
+        self._init_db()
+        self._load()
+
+    def _init_db(self):
+        """
+        初始化清单表结构
+        表结构:
+            - path: 文件绝对路径(主键)
+            - size: 文件大小(字节)
+            - blob_hash: 文件内容SHA256(旧版目录中扫描登记的文件为空)
+            - announcement_key: 公告key(深交所为announcementId，上交所为公告URL)
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS file_manifest (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                blob_hash TEXT,
+                announcement_key TEXT,
+                updated_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_manifest_key ON file_manifest(announcement_key)"
+            )
+
+    def _load(self):
+        """整表加载到内存"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT path, size, blob_hash, announcement_key FROM file_manifest"
+            )
+            for path, size, blob_hash, key in cursor:
+                self._index(path, size, blob_hash, key)
+        self.logger.info(f"loaded {len(self._by_path)} files")
+
+    def _index(self, path, size, blob_hash, key):
+        """写入内存索引(调用方持有锁)"""
+        self._by_path[path] = {
+            "path": path,
+            "size": size,
+            "blob_hash": blob_hash,
+            "announcement_key": key,
+        }
+
+    def _unindex(self, path):
+        """删除内存索引(调用方持有锁)"""
+        self._by_path.pop(path, None)
+
+    @staticmethod
+    def _norm(path: str) -> str:
+        """路径规范化(纯字符串处理，不访问文件系统)"""
+        return os.path.abspath(path)
+
+    def __len__(self):
+        return len(self._by_path)
+
+    def contains(self, path: str) -> bool:
+        """文件是否已登记(非空文件)"""
+        entry = self._by_path.get(self._norm(path))
+        return bool(entry and entry["size"])
+
+    def get(self, path: str) -> Optional[Dict]:
+        """
+        获取文件信息
+        返回:
+            dict: {path, size, blob_hash, announcement_key}，未登记时返回None
+        """
+        return self._by_path.get(self._norm(path))
+
+    def add(
+        self,
+        path: str,
+        size: int,
+        blob_hash: str = None,
+        announcement_key: str = None,
+    ) -> None:
+        """
+        登记文件(已登记时更新)
+        参数:
+            path: 文件路径
+            size: 文件大小(字节)
+            blob_hash: 文件内容SHA256
+            announcement_key: 公告key
+        """
+        path = self._norm(path)
+        key = str(announcement_key) if announcement_key is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_manifest (path, size, blob_hash, announcement_key) "
+                "VALUES (?, ?, ?, ?)",
+                (path, size, blob_hash, key),
+            )
+            self._unindex(path)
+            self._index(path, size, blob_hash, key)
+
+    def remove(self, path: str) -> None:
+        """文件移动或删除后注销"""
+        path = self._norm(path)
+        with self._lock:
+            if path not in self._by_path:
+                return
+            with self._conn:
+                self._conn.execute("DELETE FROM file_manifest WHERE path = ?", (path,))
+            self._unindex(path)
+
+    def scan_directory(self, directory: str) -> int:
+        """
+        登记目录中尚未登记的文件，并注销已不存在的文件(每个目录每次运行只扫描一次)
+        参数:
+            directory: 文件目录(不递归)
+        返回:
+            int: 新登记的文件数
+        """
+        directory = self._norm(directory)
+        with self._lock:
+            if directory in self._scanned:
+                return 0
+            self._scanned.add(directory)
+        if not os.path.isdir(directory):
+            return 0
+
+        found = {}
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.endswith(self.TEMP_SUFFIXES):
+                found[entry.path] = entry.stat().st_size
+        with self._lock, self._conn:
+            gone = [
+                path
+                for path in self._by_path
+                if os.path.dirname(path) == directory and path not in found
+            ]
+            new_rows = [
+                (path, size)
+                for path, size in found.items()
+                if self._by_path.get(path, {}).get("size") != size
+            ]
+            self._conn.executemany(
+                "DELETE FROM file_manifest WHERE path = ?", ((p,) for p in gone)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO file_manifest (path, size) VALUES (?, ?)",
+                new_rows,
+            )
+            for path in gone:
+                self._unindex(path)
+            for path, size in new_rows:
+                self._unindex(path)
+                self._index(path, size, None, None)
+        if new_rows or gone:
+            self.logger.info(
+                f"scanned {directory}: {len(new_rows)} added, {len(gone)} removed"
+            )
+        return len(new_rows)
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class AdaptiveRateLimiter:
+    """
+    AdaptiveRateLimiter - 按目标host控制请求速率的令牌桶(AIMD自适应)
+    - 请求成功且延迟正常: 速率加性增加(additive increase)
+    - 出现403/429/5xx或连接异常: 速率乘性减少(multiplicative decrease)，并短暂暂停
+    - 延迟超过目标值: 速率小幅下调
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        rate: float = 1.0,
+        min_rate: float = 0.2,
+        max_rate: float = 10.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        latency_target: float = 3.0,
+        logger: logging.Logger = None,
+    ):
+        """
+        初始化限速器
+        参数:
+            name: 限速器名称(一般为host)
+            rate: 初始速率(请求/秒)
+            min_rate: 最低速率
+            max_rate: 最高速率
+            increase: 每次成功后增加的速率
+            decrease: 出错时速率乘以的系数
+            latency_target: 目标延迟(秒)，超过时降速
+            logger: 可指定的自定义日志记录器
+        """
+        self.name = name
+        self.rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+        self.latency_target = float(latency_target)
+        self.logger = logger or logging.getLogger("AdaptiveRateLimiter")
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """按当前速率补充令牌，桶容量为1秒的请求量(至少1个)"""
+        capacity = max(1.0, self.rate)
+        self._tokens = min(capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self) -> float:
+        """
+        获取一个令牌，令牌不足时阻塞等待
+        返回:
+            float: 实际等待时间(秒)
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                else:
+                    wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def report(
+        self,
+        latency: float = None,
+        status: int = None,
+        error: bool = False,
+        retry_after: float = None,
+    ) -> None:
+        """
+        反馈一次请求结果，用于调整速率
+        参数:
+            latency: 请求耗时(秒)
+            status: HTTP状态码(浏览器请求可为空)
+            error: 是否出现连接异常/下载失败等错误
+            retry_after: 服务器要求的等待时间(秒)
+        """
+        throttled = error or status in (403, 429) or (status is not None and status >= 500)
+        with self._lock:
+            now = time.monotonic()
+            if throttled:
+                # 同一时间窗口内的多个错误只降速一次，避免并发请求把速率瞬间压到底
+                if now - self._last_decrease >= 1.0 / self.rate:
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    self._last_decrease = now
+                    self.logger.warning(
+                        f"[{self.name}] throttled (status={status}, error={error}), "
+                        f"rate -> {self.rate:.2f}/s"
+                    )
+                pause = retry_after if retry_after else 1.0 / self.rate
+                self._paused_until = max(self._paused_until, now + pause)
+            elif latency is not None and latency > self.latency_target:
+                self.rate = max(self.min_rate, self.rate * 0.9)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host_or_url: str, **kwargs) -> AdaptiveRateLimiter:
+    """
+    获取指定host共享的限速器，不存在时按kwargs创建
+    参数:
+        host_or_url: host或完整URL
+        kwargs: 创建限速器时的参数(已存在时忽略)
+    返回:
+        AdaptiveRateLimiter
+    """
+    host = urlparse(host_or_url).netloc or host_or_url
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(name=host, **kwargs)
+            _limiters[host] = limiter
+        return limiter
@@ -0,0 +1,266 @@
+import logging
+import sqlite3
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # 可选依赖: pip install pypdf
+    PdfReader = None
+
+
+def extract_pdf_text(path: str, max_pages: int = None):
+    """
+    提取PDF文本(在子进程中执行)
+    参数:
+        path: PDF文件路径
+        max_pages: 最多提取的页数(默认全部)
+    返回:
+        tuple: (文本, 总页数, 错误信息)，提取失败时文本为None
+    """
+    try:
+        reader = PdfReader(path)
+        pages = reader.pages if max_pages is None else reader.pages[:max_pages]
+        text = "\n".join((page.extract_text() or "") for page in pages)
+        return text, len(reader.pages), None
+    except Exception as e:
+        return None, 0, f"{type(e).__name__}: {str(e)}"
+
+
+class TextIndex:
+    """
+    TextIndex - 公告正文全文索引(可选功能，需安装pypdf)
+    - 在进程池中并行提取已保存PDF的文本，写入SQLite FTS5全文表(与公告数据库同库)
+    - 每条公告以doc_key关联(深交所为announcementId，上交所为url_hash)
+    - 增量处理: 已索引且文件内容未变化的公告跳过；内容相同的文件只提取一次
+    - 使用trigram分词，中文可按任意3个字以上的片段检索(SQLite版本过旧时退回unicode61)
+    """
+
+    """
+    全文表及索引状态表
+    """
+    FTS_TABLE = "announcement_text"
+    STATE_TABLE = "text_index_state"
+
+    def __init__(
+        self,
+        db_path: str,
+        workers: int = 4,
+        batch_size: int = 50,
+        max_pages: int = None,
+        logger: logging.Logger = None,
+    ):
+        """
+        初始化全文索引
+        参数:
+            db_path: 数据库文件路径(一般与公告数据库相同)
+            workers: 文本提取进程数
+            batch_size: 每个事务写入的公告数
+            max_pages: 每个PDF最多提取的页数(默认全部)
+            logger: 可指定的自定义日志记录器
+        """
+        if PdfReader is None:
+            raise RuntimeError("全文索引需要安装pypdf: pip install pypdf")
+        self.db_path = db_path
+        self.workers = max(1, int(workers))
+        self.batch_size = batch_size
+        self.max_pages = max_pages
+        self.logger = logger or logging.getLogger("TextIndex")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._init_db()
+
+    def _init_db(self):
+        """
+        初始化表结构
+        表结构:
+            - announcement_text(FTS5): doc_key, title, body
+            - text_index_state: doc_key(主键), text_rowid(全文表rowid), blob_hash,
+              page_count, status(ok/failed), error, indexed_time
+        """
+        with self._lock, self._conn:
+            try:
+                self._conn.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.FTS_TABLE} "
+                    "USING fts5(doc_key UNINDEXED, title, body, tokenize='trigram')"
+                )
+            except sqlite3.OperationalError:
+                # trigram分词需要SQLite 3.34+
+                self._conn.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.FTS_TABLE} "
+                    "USING fts5(doc_key UNINDEXED, title, body)"
+                )
+            self._conn.execute(
+                f"""
+            CREATE TABLE IF NOT EXISTS {self.STATE_TABLE} (
+                doc_key TEXT PRIMARY KEY,
+                text_rowid INTEGER,
+                blob_hash TEXT,
+                page_count INTEGER,
+                status TEXT NOT NULL,
+                error TEXT,
+                indexed_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )"""
+            )
+
+    def _indexed(self, retry_failed: bool) -> Dict[str, Tuple[str, str]]:
+        """已处理的公告: {doc_key: (blob_hash, status)}"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT doc_key, blob_hash, status FROM {self.STATE_TABLE}"
+            )
+            return {
+                key: (blob_hash, status)
+                for key, blob_hash, status in cursor
+                if not (retry_failed and status == "failed")
+            }
+
+    def pending(self, documents: Iterable, retry_failed: bool = False) -> List:
+        """
+        筛选需要(重新)索引的公告
+        参数:
+            documents: [(doc_key, 标题, 文件路径, 文件内容哈希)]
+            retry_failed: 是否重试提取失败的文件
+        返回:
+            list: 未索引或文件内容已变化的公告
+        """
+        indexed = self._indexed(retry_failed)
+        result = []
+        for doc in documents:
+            key, _, path, blob_hash = doc
+            if not path:
+                continue
+            state = indexed.get(str(key))
+            if state is None or (blob_hash and state[0] != blob_hash):
+                result.append(doc)
+        return result
+
+    def build(self, documents: Iterable, retry_failed: bool = False) -> Dict:
+        """
+        增量建立全文索引
+        参数:
+            documents: [(doc_key, 标题, 文件路径, 文件内容哈希)]，
+                由CninfoAnnouncementDB/AnnouncementDB.list_files提供
+            retry_failed: 是否重试提取失败的文件
+        返回:
+            dict: 统计数据(pending/indexed/failed)
+        """
+        docs = self.pending(documents, retry_failed)
+        stats = {"pending": len(docs), "indexed": 0, "failed": 0}
+        if not docs:
+            self.logger.info("text index is up to date")
+            return stats
+
+        # 内容相同的文件只提取一次
+        groups = {}
+        for doc in docs:
+            groups.setdefault(doc[3] or doc[2], []).append(doc)
+        self.logger.info(f"extracting {len(docs)} documents ({len(groups)} files)")
+
+        batch = []
+        todo = iter(groups.values())
+        futures = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+
+            def submit_next():
+                group = next(todo, None)
+                if group is not None:
+                    future = pool.submit(extract_pdf_text, group[0][2], self.max_pages)
+                    futures[future] = group
+
+            # 同时提交的任务数有上限，结果取出后即释放，提取的文本不会在内存中堆积
+            for _ in range(self.workers * 2):
+                submit_next()
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    group = futures.pop(future)
+                    text, page_count, error = future.result()
+                    for doc in group:
+                        batch.append((doc, text, page_count, error))
+                        stats["failed" if text is None else "indexed"] += 1
+                    submit_next()
+                if len(batch) >= self.batch_size:
+                    self._write(batch)
+                    batch = []
+                    self.logger.info(
+                        f"[{stats['indexed'] + stats['failed']}/{len(docs)}] indexed"
+                    )
+        self._write(batch)
+        self.logger.info(
+            f"Finished. Indexed {stats['indexed']} documents. Failed: {stats['failed']}"
+        )
+        return stats
+
+    def _write(self, batch: List) -> None:
+        """
+        单个事务写入一批提取结果
+        同一公告的旧文本按状态表中记录的rowid删除(doc_key列不建索引，按其删除需全表扫描)
+        """
+        if not batch:
+            return
+        with self._lock, self._conn:
+            states = []
+            for doc, text, page_count, error in batch:
+                key = str(doc[0])
+                row = self._conn.execute(
+                    f"SELECT text_rowid FROM {self.STATE_TABLE} WHERE doc_key = ?",
+                    (key,),
+                ).fetchone()
+                if row and row[0] is not None:
+                    self._conn.execute(
+                        f"DELETE FROM {self.FTS_TABLE} WHERE rowid = ?", (row[0],)
+                    )
+                rowid = None
+                if text is not None:
+                    rowid = self._conn.execute(
+                        f"INSERT INTO {self.FTS_TABLE} (doc_key, title, body) "
+                        "VALUES (?, ?, ?)",
+                        (key, doc[1], text),
+                    ).lastrowid
+                states.append(
+                    (
+                        key,
+                        rowid,
+                        doc[3],
+                        page_count,
+                        "failed" if text is None else "ok",
+                        error,
+                    )
+                )
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.STATE_TABLE} "
+                "(doc_key, text_rowid, blob_hash, page_count, status, error) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                states,
+            )
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        全文检索
+        参数:
+            query: 检索词(按短语匹配；trigram分词时至少3个字)
+            limit: 最大返回条数
+        返回:
+            list: [{doc_key, title, snippet}]，按相关度排序
+        """
+        phrase = '"' + query.replace('"', '""') + '"'
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT doc_key, title, "
+                f"snippet({self.FTS_TABLE}, 2, '[', ']', '...', 32) "
+                f"FROM {self.FTS_TABLE} WHERE {self.FTS_TABLE} MATCH ? "
+                "ORDER BY rank LIMIT ?",
+                (phrase, limit),
+            )
+            return [
+                {"doc_key": key, "title": title, "snippet": snippet}
+                for key, title, snippet in cursor
+            ]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,123 @@
+import math
+import os
+import struct
+import threading
+
+
+class BloomFilter:
+    """
+    BloomFilter - 定长位数组的布隆过滤器(可持久化到文件)
+    - 输入为定长二进制key(如URL的SHA256前16字节)，用双重哈希生成k个位置
+    - 不存在的key一定返回False；返回True时需再查数据库确认(误判率约为error_rate)
+    - 内存占用只与capacity有关，不随记录增长
+
+    文件格式(小端序):
+        - 8字节魔数 b"SSEBLM01"
+        - uint64: 位数组长度(bit)
+        - uint32: 哈希函数个数
+        - uint64: 已添加的key数
+        - uint64: 覆盖的数据库行数
+        - 位数组
+    """
+
+    MAGIC = b"SSEBLM01"
+    HEADER = struct.Struct("<8sQIQQ")
+
+    def __init__(self, capacity: int = 1000000, error_rate: float = 0.001):
+        """
+        输入:
+          - capacity: 预计key数量
+          - error_rate: 期望误判率
+        输出: 无
+        """
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.row_count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, key: bytes):
+        """
+        双重哈希: 第i个位置为 (h1 + i*h2) mod m
+        输入: key(至少16字节，且本身已是均匀分布的哈希值)
+        输出: k个位位置
+        """
+        h1 = int.from_bytes(key[:8], "little")
+        h2 = int.from_bytes(key[8:16], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: bytes) -> None:
+        """
+        添加key
+        输入: key
+        输出: 无
+        """
+        with self._lock:
+            for pos in self._positions(key):
+                self.bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def is_full(self) -> bool:
+        """
+        key数量是否超过容量(超过后误判率上升，应按更大容量重建)
+        """
+        return self.count > self.capacity
+
+    def save(self, path: str) -> None:
+        """
+        保存到文件(先写临时文件再原子替换)
+        输入: 文件路径
+        输出: 无
+        """
+        # 多个进程共用数据库时各自保存，临时文件名按进程区分
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with self._lock:
+            with open(temp_path, "wb") as f:
+                f.write(
+                    self.HEADER.pack(
+                        self.MAGIC,
+                        self.num_bits,
+                        self.num_hashes,
+                        self.count,
+                        self.row_count,
+                    )
+                )
+                f.write(self.bits)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        从文件加载
+        输入: 文件路径
+        输出: BloomFilter(文件不存在或格式错误时返回None)
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            header = f.read(cls.HEADER.size)
+            if len(header) != cls.HEADER.size:
+                return None
+            magic, num_bits, num_hashes, count, row_count = cls.HEADER.unpack(header)
+            bits = bytearray(f.read())
+        if magic != cls.MAGIC or len(bits) != (num_bits + 7) // 8:
+            return None
+        bloom = cls.__new__(cls)
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.capacity = max(1, round(num_bits * math.log(2) / num_hashes))
+        bloom.error_rate = None
+        bloom.bits = bits
+        bloom.count = count
+        bloom.row_count = row_count
+        bloom._lock = threading.Lock()
+        return bloom
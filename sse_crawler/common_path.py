@@ -0,0 +1,12 @@
+import os
+import sys
+
+"""
+两个爬虫共用的模块(限速、下载、文件存储、全文索引等)位于仓库根目录的common目录，
+导入本模块后可按顶层模块名导入
+"""
+COMMON_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"
+)
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
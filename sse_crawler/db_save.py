@@ -1,12 +1,62 @@
 import sqlite3
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import os
 import logging
 from datetime import datetime
 import hashlib
+import threading
+from contextlib import contextmanager
+from bloom_filter import BloomFilter
 
 
 class AnnouncementDB:
+    """
+    公告写入语句(url已存在时只更新文件信息)
+    """
+    INSERT_SQL = """
+        INSERT INTO announcements (
+            stock_code, stock_name, announcement_title, announcement_type, announcement_date,
+            announcement_url, url_hash, url_key, file_name, file_path, blob_hash
+        ) VALUES (
+            :stock_code, :stock_name, :announcement_title, :announcement_type, :announcement_date,
+            :announcement_url, :url_hash, :url_key, :file_name, :file_path, :blob_hash
+        )
+        ON CONFLICT(announcement_url) DO UPDATE SET
+            file_name = excluded.file_name,
+            file_path = excluded.file_path,
+            blob_hash = excluded.blob_hash
+        """
+
+    """
+    文件内容写入语句(相同内容只记录一次)
+    """
+    INSERT_BLOB_SQL = """
+        INSERT OR IGNORE INTO blobs (blob_hash, file_path, file_size)
+        VALUES (:blob_hash, :file_path, :file_size)
+        """
+
+    """
+    保存公告时的必填字段
+    """
+    REQUIRED_FIELDS = [
+        "stock_code",
+        "stock_name",
+        "announcement_title",
+        "announcement_date",
+        "announcement_url",
+    ]
+
+    """
+    连接参数
+    """
+    PRAGMAS = {
+        "busy_timeout": 10000,
+        "synchronous": "NORMAL",
+        "cache_size": -65536,  # 64MB
+        "mmap_size": 268435456,  # 256MB
+        "temp_store": "MEMORY",
+    }
+
     def __init__(self, db_path: str):
         """
         输入:
@@ -14,15 +64,21 @@ class AnnouncementDB:
         输出: 无
         功能:
           1. 创建数据库目录(如果不存在)
-          2. 初始化数据库连接
-          3. 创建内存中的URL缓存(用于快速去重)
+          2. 初始化长期复用的写连接(WAL模式)
+          3. 加载/重建布隆过滤器(用于快速去重，内存占用固定)
         """
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self.db_path = os.path.abspath(db_path)
         self.logger = logging.getLogger("AnnouncementDB")
+        self._write_lock = threading.RLock()
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._readers = threading.local()
+        self._reader_conns = []
         self._init_db()
-        self._url_cache = set()
-        self._load_url_cache()
+        self._bloom_path = os.path.splitext(self.db_path)[0] + ".bloom"
+        self._bloom = None
+        self._load_bloom()
 
     def _init_db(self):
         """
@@ -30,8 +86,9 @@ class AnnouncementDB:
         输入: 无
         输出: 无
         功能:
-          1. 创建announcements表(如果不存在)
-          2. 建立url_hash和stock_code索引
+          1. 创建announcements表和blobs表(如果不存在)
+          2. 旧版数据库补充url_key、blob_hash列
+          3. 建立url_hash、url_key、stock_code和blob_hash索引
         表结构:
           - id: 自增主键
           - stock_code: 股票代码
@@ -41,9 +98,16 @@ class AnnouncementDB:
           - announcement_date: 公告日期
           - announcement_url: 公告URL(唯一)
           - url_hash: 存储URL的SHA256哈希值（截取前32位/64位）(唯一)
-          - file_path: 文件存储路径
+          - url_key: URL的SHA256前16字节(二进制，与url_hash对应，用于去重查询)
+          - file_path: 文件存储路径(BlobStore中的路径)
           - file_name: 文件名
           - created_time: 记录创建时间
+          - blob_hash: 文件内容SHA256(对应blobs表)
+        blobs表结构:
+          - blob_hash: 文件内容SHA256(主键)
+          - file_path: 文件在BlobStore中的路径
+          - file_size: 文件大小(字节)
+          - created_time: 记录创建时间
         """
         with self._get_connection() as conn:
             conn.execute(
@@ -59,26 +123,112 @@ class AnnouncementDB:
                 url_hash TEXT NOT NULL UNIQUE,
                 file_path TEXT,
                 file_name TEXT,
+                created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                url_key BLOB,
+                blob_hash TEXT
+            )"""
+            )
+            conn.execute(
+                """
+            CREATE TABLE IF NOT EXISTS blobs (
+                blob_hash TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                file_size INTEGER,
                 created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )"""
             )
+            self._migrate(conn)
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_url_hash ON announcements(url_hash)"
             )
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_url_key ON announcements(url_key)"
+            )
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_stock_code ON announcements(stock_code)"
             )  # 修改这里
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_blob_hash ON announcements(blob_hash)"
+            )
 
-    def _get_connection(self) -> sqlite3.Connection:
+    def _migrate(self, conn: sqlite3.Connection):
         """
-        获取数据库连接
-        输入: 无
+        旧版数据库迁移
+        输入: 写连接
+        输出: 无
+        功能: 补充url_key列，并由url_hash(十六进制)回填二进制key；补充blob_hash列
+        """
+        columns = {
+            row["name"] for row in conn.execute("PRAGMA table_info(announcements)")
+        }
+        if "url_key" not in columns:
+            conn.execute("ALTER TABLE announcements ADD COLUMN url_key BLOB")
+            rows = conn.execute("SELECT id, url_hash FROM announcements").fetchall()
+            conn.executemany(
+                "UPDATE announcements SET url_key = ? WHERE id = ?",
+                ((bytes.fromhex(row["url_hash"]), row["id"]) for row in rows),
+            )
+            self.logger.info(f"migrated url_key for {len(rows)} records")
+        if "blob_hash" not in columns:
+            conn.execute("ALTER TABLE announcements ADD COLUMN blob_hash TEXT")
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """
+        创建数据库连接并设置pragma
+        输入: read_only(是否以只读方式打开)
         输出: 返回 sqlite3.Connection
         """
-        conn = sqlite3.connect(self.db_path)
+        if read_only:
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        for name, value in self.PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
         return conn
 
+    @contextmanager
+    def _get_connection(self):
+        """
+        获取长期复用的写连接
+        输入: 无
+        输出: sqlite3.Connection(串行使用，退出时提交事务，异常时回滚)
+        """
+        with self._write_lock:
+            with self._conn:
+                yield self._conn
+
+    @contextmanager
+    def _get_read_connection(self):
+        """
+        获取当前线程的只读连接
+        输入: 无
+        输出: sqlite3.Connection(WAL模式下不会被写事务阻塞)
+        """
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._connect(read_only=True)
+            self._readers.conn = conn
+            with self._write_lock:
+                self._reader_conns.append(conn)
+        yield conn
+
+    def close(self):
+        """
+        关闭写连接和所有只读连接
+        输入: 无
+        输出: 无
+        """
+        with self._write_lock:
+            for conn in self._reader_conns:
+                conn.close()
+            self._reader_conns = []
+            self._readers = threading.local()
+            self._conn.close()
+            self._bloom.save(self._bloom_path)
+
     def _hash_url(self, url: str) -> str:
         """
         生成URL哈希值(SHA256截取前32位)，节省性能，很少有不同的url出现相同的哈希值
@@ -88,27 +238,68 @@ class AnnouncementDB:
         """
         return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
 
-    def _load_url_cache(self):
+    def _url_key(self, url: str) -> bytes:
         """
-        加载现有URL哈希到内存缓存
-        输入: 无
+        生成URL的定长二进制key(SHA256前16字节，与_hash_url的结果对应)
+        输入: url字符串
+        输出: 16字节key
+        """
+        return hashlib.sha256(url.encode("utf-8")).digest()[:16]
+
+    def _load_bloom(self, force: bool = False):
+        """
+        加载布隆过滤器
+        输入: force(是否强制重建)
         输出: 无
-        功能: 初始化时预加载所有已有URL的哈希值
+        功能: 过滤器文件缺失、覆盖的行数与数据库不一致(异常退出)或容量不足时，
+              由数据库中的url_key重建
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT url_hash FROM announcements")
-            self._url_cache = {row["url_hash"] for row in cursor.fetchall()}
+        with self._get_read_connection() as conn:
+            row_count = conn.execute("SELECT COUNT(*) FROM announcements").fetchone()[0]
+            bloom = BloomFilter.load(self._bloom_path)
+            if (
+                not force
+                and bloom
+                and bloom.row_count == row_count
+                and not bloom.is_full()
+            ):
+                self._bloom = bloom
+                return
+
+            self.logger.info("rebuilding url bloom filter")
+            bloom = BloomFilter(capacity=max(1000000, row_count * 2))
+            cursor = conn.execute("SELECT url_key FROM announcements")
+            for row in cursor:
+                bloom.add(row[0])
+            bloom.row_count = row_count
+            self._bloom = bloom
+
+    def _remember(self, url_key: bytes):
+        """
+        记录新写入的url_key，过滤器容量不足时按两倍容量重建
+        输入: url_key
+        输出: 无
+        """
+        self._bloom.add(url_key)
+        self._bloom.row_count += 1
+        if self._bloom.is_full():
+            self._load_bloom(force=True)
 
     def record_exists(self, url: str) -> bool:
         """
         检查URL是否已存在
         输入: 公告URL
         输出: bool(True表示url已存在于db中)
-        功能: 通过cache快速判断url是否重复
+        功能: 布隆过滤器判断不存在时直接返回，可能存在时再通过url_key索引查询数据库确认
         """
-        url_hash = self._hash_url(url)
-        return url_hash in self._url_cache
+        url_key = self._url_key(url)
+        if url_key not in self._bloom:
+            return False
+        with self._get_read_connection() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM announcements WHERE url_key = ?", (url_key,)
+            ).fetchone()
+            return row is not None
 
     def save_record(self, record: Dict, file_info: Optional[Dict] = None) -> bool:
         """
@@ -121,57 +312,198 @@ class AnnouncementDB:
           1. 校验必填字段
           2. 生成URL的哈希值
           3. 执行插入或更新操作
-          4. 更新cache
-        """
-        required_fields = [
-            "stock_code",
-            "stock_name",
-            "announcement_title",
-            "announcement_date",
-            "announcement_url",
-        ]
-        if not all(field in record for field in required_fields):
+          4. 更新布隆过滤器
+        """
+        data = self._to_row(record, file_info)
+        if data is None:
             self.logger.error("lack of essential attribute")
             return False
 
-        url_hash = self._hash_url(record["announcement_url"])
-        data = {
+        try:
+            with self._write_lock:
+                with self._get_connection() as conn:
+                    cursor = conn.execute(
+                        "SELECT 1 FROM announcements WHERE url_key = ?",
+                        (data["url_key"],),
+                    )
+                    is_new = cursor.fetchone() is None
+                    conn.execute(self.INSERT_SQL, data)
+                    if data["blob_hash"]:
+                        conn.execute(self.INSERT_BLOB_SQL, data)
+                if is_new:
+                    self._remember(data["url_key"])
+            return True
+        except Exception as e:
+            self.logger.error(f"save failed: {str(e)}")
+            return False
+
+    def save_records(self, batch: List[Tuple[Dict, Optional[Dict]]]) -> int:
+        """
+        批量保存公告记录
+        输入:
+          - batch: [(record, file_info)] 列表，字段要求同save_record
+        输出: int(保存的记录数，保存失败返回-1)
+        功能:
+          1. 校验必填字段(缺失的记录跳过)
+          2. 单个事务内executemany写入，只提交一次
+          3. 提交成功后更新布隆过滤器
+        """
+        rows = []
+        for record, file_info in batch:
+            data = self._to_row(record, file_info)
+            if data is None:
+                self.logger.error(
+                    f"lack of essential attribute: {record.get('announcement_url')}"
+                )
+                continue
+            rows.append(data)
+        if not rows:
+            return 0
+
+        try:
+            with self._write_lock:
+                with self._get_connection() as conn:
+                    new_keys = set()
+                    for data in rows:
+                        cursor = conn.execute(
+                            "SELECT 1 FROM announcements WHERE url_key = ?",
+                            (data["url_key"],),
+                        )
+                        if cursor.fetchone() is None:
+                            new_keys.add(data["url_key"])
+                    conn.executemany(self.INSERT_SQL, rows)
+                    conn.executemany(
+                        self.INSERT_BLOB_SQL,
+                        [data for data in rows if data["blob_hash"]],
+                    )
+                for url_key in new_keys:
+                    self._remember(url_key)
+            return len(rows)
+        except Exception as e:
+            self.logger.error(f"batch save failed: {str(e)}")
+            return -1
+
+    def list_files(self) -> List[Tuple]:
+        """
+        列出已保存文件的公告(全文索引的输入)
+        输入: 无
+        输出: [(url_hash, announcement_title, file_path, blob_hash)]
+        """
+        with self._get_read_connection() as conn:
+            cursor = conn.execute(
+                "SELECT url_hash, announcement_title, file_path, blob_hash "
+                "FROM announcements WHERE file_path IS NOT NULL"
+            )
+            return [tuple(row) for row in cursor]
+
+    def _to_row(self, record: Dict, file_info: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        将公告字典和文件信息转换为INSERT_SQL参数
+        输入:
+          - record: 公告字典
+          - file_info: 文件信息字典(file_name/file_path/file_size/blob_hash)
+        输出: 参数字典(缺少必填字段时返回None)
+        """
+        if not all(field in record for field in self.REQUIRED_FIELDS):
+            return None
+
+        file_info = file_info or {}
+        return {
             "stock_code": record["stock_code"],
             "stock_name": record["stock_name"],
             "announcement_title": record["announcement_title"],
             "announcement_type": record.get("announcement_type"),
             "announcement_date": record["announcement_date"],
             "announcement_url": record["announcement_url"],
-            "url_hash": url_hash,
+            "url_hash": self._hash_url(record["announcement_url"]),
+            "url_key": self._url_key(record["announcement_url"]),
+            "file_name": file_info.get("file_name"),
+            "file_path": file_info.get("file_path"),
+            "file_size": file_info.get("file_size"),
+            "blob_hash": file_info.get("blob_hash"),
         }
 
-        if file_info:
-            data.update(
-                {
-                    "file_name": file_info.get("file_name"),
-                    "file_path": file_info.get("file_path"),
-                }
-            )
 
-        try:
-            with self._get_connection() as conn:
-                conn.execute(
-                    """
-                INSERT INTO announcements (
-                    stock_code, stock_name, announcement_title, announcement_type, announcement_date, 
-                    announcement_url, url_hash, file_name, file_path
-                ) VALUES (
-                    :stock_code, :stock_name, :announcement_title, :announcement_type, :announcement_date,
-                    :announcement_url, :url_hash, :file_name, :file_path
-                )
-                ON CONFLICT(announcement_url) DO UPDATE SET
-                    file_name = excluded.file_name,
-                    file_path = excluded.file_path
-                """,
-                    data,
-                )
-                self._url_cache.add(url_hash)
-                return True
-        except Exception as e:
-            self.logger.error(f"save failed: {str(e)}")
-            return False
+class BufferedRecordWriter:
+    """
+    缓冲写入器
+    功能:
+      1. 记录先放入内存缓冲区
+      2. 缓冲区达到batch_size、定时(flush_interval秒)或关闭时，
+         通过AnnouncementDB.save_records一次性写入
+    """
+
+    def __init__(
+        self, db: AnnouncementDB, batch_size: int = 500, flush_interval: float = 5.0
+    ):
+        """
+        输入:
+          - db: 公告数据库
+          - batch_size: 缓冲记录数达到该值时写入
+          - flush_interval: 定时写入间隔(秒)
+        输出: 无
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger("BufferedRecordWriter")
+        self._buffer = []
+        self._pending_urls = set()
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._timer.start()
+
+    def _flush_periodically(self):
+        """后台线程: 定时写入缓冲区"""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def add(self, record: Dict, file_info: Optional[Dict] = None) -> None:
+        """
+        添加一条记录，缓冲区满时立即写入
+        输入:
+          - record: 公告字典
+          - file_info: 文件信息字典
+        输出: 无
+        """
+        with self._lock:
+            self._buffer.append((record, file_info))
+            self._pending_urls.add(record.get("announcement_url"))
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def is_pending(self, url: str) -> bool:
+        """
+        检查URL是否已在缓冲区中(尚未写入数据库)
+        输入: 公告URL
+        输出: bool
+        """
+        return url in self._pending_urls
+
+    def flush(self) -> int:
+        """
+        将缓冲区写入数据库，写入失败时保留缓冲区等待下次重试
+        输入: 无
+        输出: int(写入的记录数)
+        """
+        with self._lock:
+            if not self._buffer:
+                return 0
+            saved = self.db.save_records(self._buffer)
+            if saved < 0:
+                return 0
+            self._buffer = []
+            self._pending_urls = set()
+            return saved
+
+    def close(self) -> None:
+        """
+        停止定时写入并写入剩余记录
+        输入: 无
+        输出: 无
+        """
+        self._stop.set()
+        self._timer.join()
+        if self.flush() == 0 and self._buffer:
+            self.logger.error(f"{len(self._buffer)} records left unsaved on close")
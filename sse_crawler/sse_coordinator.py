@@ -0,0 +1,138 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from db_save import AnnouncementDB
+from sse_crawler import AnnouncementDownloadController, split_date_windows
+
+
+def crawl_window(
+    start_date,
+    end_date,
+    download_dir,
+    max_bulletin_num=100000,
+    use_api=True,
+    http_download=True,
+):
+    """
+    功能：
+        在子进程中抓取一个日期窗口: 启动无头浏览器，写入共享数据库，文件保存在窗口自己的下载目录
+
+    参数:
+        start_date / end_date: 窗口日期(datetime.date)
+        download_dir: 本窗口的文件下载目录
+        max_bulletin_num: 本窗口的最大下载公告数
+        use_api: 是否通过公告列表接口获取公告
+        http_download: 是否使用HTTP下载器下载文件
+
+    返回:
+        int - 下载的公告数
+    """
+    controller = AnnouncementDownloadController(http_download=http_download)
+    try:
+        controller.start_browser(headless=True, download_dir=download_dir)
+        return controller.crawl_date_range(
+            start_date,
+            end_date,
+            max_bulletin_num,
+            use_api=use_api,
+            save_dir=download_dir,
+        )
+    finally:
+        controller.close()
+
+
+class SseCrawlCoordinator:
+    """
+    SseCrawlCoordinator - 多进程抓取上交所公告
+    - 把日期区间切分为互不重叠的窗口，分配给N个进程，每个进程运行一个无头浏览器
+    - 每个窗口使用独立的下载目录，避免浏览器下载互相干扰
+    - 所有进程写入同一个AnnouncementDB(WAL模式 + busy_timeout，多进程写入安全)，
+      窗口日期互不重叠，不会重复下载同一公告
+    - 最大下载公告数是所有窗口合计的上限，平均分配给各窗口(窗口公告不足时剩余额度不转给其他窗口)
+    """
+
+    def __init__(
+        self,
+        processes: int = 4,
+        download_dir: str = "data/announcements",
+        window_months: int = 1,
+        use_api: bool = True,
+        http_download: bool = True,
+        logger: logging.Logger = None,
+    ):
+        """
+        输入:
+          - processes: 进程数
+          - download_dir: 下载根目录(各窗口在其下建立子目录)
+          - window_months: 单个窗口的月数(不超过3个月；窗口越小越容易均匀分配)
+          - use_api: 是否通过公告列表接口获取公告
+          - http_download: 是否使用HTTP下载器下载文件
+          - logger: 可指定的自定义日志记录器
+        输出: 无
+        """
+        self.processes = max(1, int(processes))
+        self.download_dir = download_dir
+        self.window_months = min(3, max(1, int(window_months)))
+        self.use_api = use_api
+        self.http_download = http_download
+        self.logger = logger or logging.getLogger("SseCrawlCoordinator")
+
+    def window_dir(self, start_date, end_date) -> str:
+        """窗口的下载目录"""
+        return os.path.join(self.download_dir, f"{start_date}_{end_date}")
+
+    @staticmethod
+    def split_budget(max_bulletin_num: int, window_cnt: int) -> list:
+        """
+        合计上限平均分配给各窗口，余数分给靠前的窗口
+        输入:
+          - max_bulletin_num: 所有窗口合计的最大下载公告数
+          - window_cnt: 窗口数
+        输出: 各窗口的最大下载公告数列表
+        """
+        base, extra = divmod(max(0, int(max_bulletin_num)), max(1, window_cnt))
+        return [base + (1 if i < extra else 0) for i in range(window_cnt)]
+
+    def run(self, start_date, end_date, max_bulletin_num: int = 100000) -> dict:
+        """
+        并行抓取日期区间
+        输入:
+          - start_date / end_date: 日期区间(datetime.date)
+          - max_bulletin_num: 所有窗口合计的最大下载公告数(平均分配给各窗口)
+        输出: {(窗口开始, 窗口结束): 下载的公告数}，失败的窗口为None，未分到额度的窗口不抓取
+        """
+        windows = split_date_windows(start_date, end_date, months=self.window_months)
+        budgets = self.split_budget(max_bulletin_num, len(windows))
+        # 在父进程中建库并完成迁移，避免多个子进程同时迁移旧数据库
+        AnnouncementDB("data/announcements.db").close()
+        results = {}
+        workers = max(1, min(self.processes, len(windows)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    crawl_window,
+                    w_start,
+                    w_end,
+                    self.window_dir(w_start, w_end),
+                    budget,
+                    self.use_api,
+                    self.http_download,
+                ): (w_start, w_end)
+                for (w_start, w_end), budget in zip(windows, budgets)
+                if budget > 0
+            }
+            for future in as_completed(futures):
+                window = futures[future]
+                try:
+                    results[window] = future.result()
+                    self.logger.info(
+                        f"[{len(results)}/{len(windows)}] {window[0]} ~ {window[1]}: "
+                        f"{results[window]} files"
+                    )
+                except Exception as e:
+                    results[window] = None
+                    self.logger.error(f"window {window[0]} ~ {window[1]} failed: {e}")
+        total = sum(cnt for cnt in results.values() if cnt)
+        self.logger.info(f"Finished. Downloaded {total} files in {len(windows)} windows")
+        return results
@@ -11,8 +11,18 @@ from datetime import datetime
 from typing import Tuple
 import random
 import os
+import threading
 from urllib.parse import urljoin
-from db_save import AnnouncementDB
+from db_save import AnnouncementDB, BufferedRecordWriter
+from sse_listing import SseListingClient
+from sse_downloader import SseHttpDownloader
+import common_path  # noqa: F401 (共用模块目录加入sys.path)
+from download_watcher import DownloadWatcher
+from blob_store import BlobStore
+from file_manifest import FileManifest
+from file_downloader import FileDownloader
+from text_index import TextIndex
+from rate_limiter import get_limiter
 
 
 class AnnouncementDownloadController:
@@ -23,20 +33,53 @@ class AnnouncementDownloadController:
         driver (webdriver.Chrome): Selenium浏览器驱动实例
         logger (logging.Logger): 日志记录器
         _is_self_managed_driver (bool): 标记是否由本实例创建的驱动,只操作由该实体创建的driver
+        debug (bool): 调试模式，高亮操作的元素并加入随机停顿，便于观察流程；
+            关闭时只按页面条件(元素可点击、表格刷新、公告数变化)显式等待
+        http_download (bool): 是否使用HTTP下载器(复用浏览器Cookie)并发下载文件，
+            否则在浏览器新标签页中逐个下载
+        blob_store (BlobStore): 下载完成的文件按内容哈希分层存储，相同内容只保存一份
+        manifest (FileManifest): 已保存文件清单(与公告数据库同库)，文件是否存在在内存中判断
         downloader: 用于公告文件下载
+        saved_announcements / failed_downloads (int): 本次抓取保存完成/失败的公告数，
+            HTTP下载在下载完成时计入
+        consecutive_failures (int): 连续失败次数，达到5次时停止抓取
     """
 
-    def __init__(self, driver: webdriver.Chrome = None, logger: logging.Logger = None):
+    def __init__(
+        self,
+        driver: webdriver.Chrome = None,
+        logger: logging.Logger = None,
+        debug: bool = False,
+        http_download: bool = True,
+        download_workers: int = 4,
+        blob_dir: str = "data/blobs",
+    ):
         """
         - 初始化driver
         - 输入：
             - driver: 可选的现有浏览器驱动实例
             - logger: 可指定的自定义日志记录器
+            - debug: 是否开启调试模式(高亮元素及随机停顿)
+            - http_download: 是否使用HTTP下载器并发下载文件
+            - download_workers: HTTP并发下载数
+            - blob_dir: 文件存储(BlobStore)根目录
         - 输出：无
         """
         self.driver = driver
         self.logger = logger or self._setup_default_logger()
         self._is_self_managed_driver = False
+        self.debug = debug
+        self.http_download = http_download
+        self.download_workers = download_workers
+        self.blob_store = BlobStore(blob_dir)
+        self.manifest = None
+        self.http_downloader = None
+        self.download_watcher = None
+        self._download_lock = threading.Lock()
+        self._downloading_urls = set()
+        self.saved_announcements = 0
+        self.failed_downloads = 0
+        self.consecutive_failures = 0
 
     def _setup_default_logger(self) -> logging.Logger:
         """
@@ -66,7 +109,7 @@ class AnnouncementDownloadController:
         """
         options = webdriver.ChromeOptions()
         if headless:
-            options.add_argument("--headless")
+            options.add_argument("--headless=new")
         options.add_argument("--disable-gpu")
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-blink-features=AutomationControlled")
@@ -79,13 +122,14 @@ class AnnouncementDownloadController:
             "safebrowsing.enabled": False,
         }
         options.add_experimental_option("prefs", prefs)
+        DownloadWatcher.enable_logging(options)
         return options
 
     def start_browser(
         self, headless: bool = False, download_dir: str = "data/announcements"
     ) -> None:
         """
-        - 启动浏览器
+        - 启动浏览器(同时清理下载目录中崩溃残留的临时文件)
         - 输入：
             - headless: 是否无界面运行
             - download_dir: 文件下载存储路径
@@ -94,6 +138,7 @@ class AnnouncementDownloadController:
         if self.driver is not None:
             self.logger.warning("Browser already initialized")
             return
+        FileDownloader.cleanup(download_dir, logger=self.logger)
         options = self._setup_driver_options(
             download_dir=download_dir, headless=headless
         )
@@ -101,6 +146,10 @@ class AnnouncementDownloadController:
             self.driver = webdriver.Chrome(options=options)
             self.driver.maximize_window()
             self._is_self_managed_driver = True
+            self.download_watcher = DownloadWatcher(
+                self.driver, download_dir, self.logger
+            )
+            self.download_watcher.enable()
             self.logger.info(
                 f"Browser started with download path: {os.path.abspath(download_dir)}"
             )
@@ -117,6 +166,7 @@ class AnnouncementDownloadController:
         ),
         picker_locator: Tuple[str, str] = (By.CSS_SELECTOR, ".layui-laydate"),
         timeout: int = 15,
+        date_range: Tuple = None,
     ) -> bool:
         """
          - 打开目标页面的日期选择器
@@ -125,6 +175,8 @@ class AnnouncementDownloadController:
             - trigger_locator: 日期选择器触发元素定位器
             - picker_locator: 定位打开后的日期选择器，作为自动化测试用例的检查点，可视化检查操作流程
             - timeout: 最大等待时间(秒)
+            - date_range: 可选的(开始日期, 结束日期)，打开前直接写入触发元素，
+              日期选择器打开时即定位到对应年月，无需逐月翻页
         - 输出：成功返回True，失败返回False
         """
         if self.driver is None:
@@ -134,8 +186,13 @@ class AnnouncementDownloadController:
             self.driver.get(url)
             self.logger.info(f"Navigated to: {url}")
             trigger = self._wait_and_highlight(
-                *trigger_locator, timeout=timeout, highlight_color="red"
+                *trigger_locator,
+                timeout=timeout,
+                highlight_color="red",
+                clickable=True,
             )
+            if date_range:
+                self._preset_date_range(trigger, *date_range)
             self._reliable_click(trigger)
             self._wait_and_highlight(
                 *picker_locator, timeout=timeout, highlight_color="blue"
@@ -146,6 +203,29 @@ class AnnouncementDownloadController:
             self._take_screenshot("date_picker_error")
             return False
 
+    def _preset_date_range(self, trigger, start_date, end_date) -> bool:
+        """
+        - 直接写入日期区间(laydate打开时读取触发元素的值定位面板年月)
+        - 沿用页面当前值中的分隔符；当前值不是日期区间格式时不做修改
+        - 输入：
+            - trigger: 日期选择器触发元素
+            - start_date / end_date: datetime.date对象
+        - 输出：写入成功返回True
+        """
+        current = trigger.get_attribute("value") or trigger.text or ""
+        match = re.match(r"\s*\d{4}-\d{2}-\d{2}(.*?)\d{4}-\d{2}-\d{2}\s*$", current)
+        if not match:
+            return False
+        value = f"{start_date:%Y-%m-%d}{match.group(1)}{end_date:%Y-%m-%d}"
+        self.driver.execute_script(
+            "var el = arguments[0];"
+            "if (el.tagName === 'INPUT') { el.value = arguments[1]; }"
+            "else { el.textContent = arguments[1]; }",
+            trigger,
+            value,
+        )
+        return True
+
     """
     6. minus_year_cliker(by: str, locator: str) -> None
     - 点击年份减按钮
@@ -168,16 +248,16 @@ class AnnouncementDownloadController:
     """
 
     def minus_year_cliker(self, by: str, locator: str):
-        self._reliable_click(self._wait_and_highlight(by, locator))
+        self._reliable_click(self._wait_and_highlight(by, locator, clickable=True))
 
     def plus_year_cliker(self, by: str, locator: str):
-        self._reliable_click(self._wait_and_highlight(by, locator))
+        self._reliable_click(self._wait_and_highlight(by, locator, clickable=True))
 
     def minus_month_cliker(self, by: str, locator: str):
-        self._reliable_click(self._wait_and_highlight(by, locator))
+        self._reliable_click(self._wait_and_highlight(by, locator, clickable=True))
 
     def plus_month_cliker(self, by: str, locator: str):
-        self._reliable_click(self._wait_and_highlight(by, locator))
+        self._reliable_click(self._wait_and_highlight(by, locator, clickable=True))
 
     """
     10. operate_start_year_box(offset: int) -> None
@@ -286,27 +366,62 @@ class AnnouncementDownloadController:
             start_selector = f'.laydate-main-list-0 td[lay-ymd="{self.compose_date(s_date.year, s_date.month, s_date.day)}"]'
             end_selector = f'.laydate-main-list-1 td[lay-ymd="{self.compose_date(e_date.year, e_date.month, e_date.day)}"]'
             self._reliable_click(
-                self._wait_and_highlight(By.CSS_SELECTOR, start_selector)
+                self._wait_and_highlight(
+                    By.CSS_SELECTOR, start_selector, clickable=True
+                )
             )
             self._reliable_click(
-                self._wait_and_highlight(By.CSS_SELECTOR, end_selector)
+                self._wait_and_highlight(By.CSS_SELECTOR, end_selector, clickable=True)
             )
-            time.sleep(random.randint(1, 3))
+            self._pause(1, 3)
+            return True
         except Exception as e:
             self.logger.error(f"Failed to select date: {str(e)}")
             self._take_screenshot("select_date_error")
             return False
 
-    def confirm(self):
+    def confirm(self, timeout: int = 10):
         """
-        - 确认日期选择
-        - 输入：无
+        - 确认日期选择，并等待查询结果刷新(公告数变化或旧表格被替换)
+        - 输入：
+        - timeout: 等待结果刷新的最大时间(秒)，超时后继续执行
         - 输出：无
         """
+        old_total = self._find_text(By.CSS_SELECTOR, "span.bulletinNum")
+        old_rows = self.driver.find_elements(
+            By.CSS_SELECTOR, "table.table-hover tbody tr"
+        )
         self._reliable_click(
-            self._wait_and_highlight(By.CSS_SELECTOR, "span.laydate-btns-confirm")
+            self._wait_and_highlight(
+                By.CSS_SELECTOR, "span.laydate-btns-confirm", clickable=True
+            )
         )
-        time.sleep(random.randint(1, 2))
+
+        def refreshed(driver):
+            total = self._find_text(By.CSS_SELECTOR, "span.bulletinNum")
+            if total and total != old_total:
+                return True
+            return bool(old_rows) and EC.staleness_of(old_rows[0])(driver)
+
+        try:
+            WebDriverWait(self.driver, timeout).until(refreshed)
+        except Exception:
+            # 新旧查询结果的公告数可能相同，超时不视为失败
+            self.logger.info("查询结果未检测到变化，继续执行")
+        self._pause(1, 2)
+
+    def _find_text(self, by: str, locator: str):
+        """
+        - 读取元素文本(元素不存在或已失效时返回None)
+        - 输入：
+        - by: 定位策略
+        - locator: 元素定位表达式
+        - 输出：元素文本
+        """
+        try:
+            return self.driver.find_element(by, locator).text.strip()
+        except Exception:
+            return None
 
     def data_statistics(self):
         """
@@ -346,13 +461,17 @@ class AnnouncementDownloadController:
         os.makedirs(save_dir, exist_ok=True)
 
         # 检查文件是否已存在
-        if os.path.exists(save_path):
-            file_size = os.path.getsize(save_path)
-            if file_size > 0:  # 确保不是空文件
-                self.logger.info(
-                    f"文件已存在，跳过下载: {filename} (大小: {file_size/1024:.2f}KB)"
-                )
-                return False
+        file_size = self._file_size(save_path)
+        if file_size > 0:  # 确保不是空文件
+            self.logger.info(
+                f"文件已存在，跳过下载: {filename} (大小: {file_size/1024:.2f}KB)"
+            )
+            return False
+
+        # 外部传入的浏览器没有下载监听时，按下载目录创建(未开启性能日志时使用轮询)
+        if self.download_watcher is None:
+            self.download_watcher = DownloadWatcher(self.driver, save_dir, self.logger)
+            self.download_watcher.enable()
 
         # 记录当前页面状态
         original_window = self.driver.current_window_handle
@@ -362,12 +481,8 @@ class AnnouncementDownloadController:
 
         for attempt in range(max_attempt):
             try:
-                # 记录下载前的文件状态
-                original_files = set(
-                    f
-                    for f in os.listdir(save_dir)
-                    if os.path.isfile(os.path.join(save_dir, f))
-                )
+                # 记录下载开始前的状态(下载事件或目录文件)
+                token = self.download_watcher.begin()
 
                 # 访问下载链接
                 self.driver.get(url)
@@ -375,36 +490,8 @@ class AnnouncementDownloadController:
                     f"Downloading: Target={filename} (Attempt {attempt+1}/{max_attempt})"
                 )
 
-                # 监控下载进度
-                downloaded_file = None
-                for _ in range(60):  # 最多等待30秒
-                    time.sleep(0.5)  # 控制间隔时间
-                    # current_file 排除新文件
-                    current_files = set(
-                        f
-                        for f in os.listdir(save_dir)
-                        if os.path.isfile(os.path.join(save_dir, f))
-                        and not f.endswith(".crdownload")  # 核心修复点
-                    )
-                    new_files = current_files - original_files
-
-                    # 检查新文件
-                    if new_files:
-                        # 查看最新修改的文件
-                        newest_file = max(
-                            new_files,
-                            key=lambda f: os.path.getmtime(os.path.join(save_dir, f)),
-                        )
-                        temp_path = os.path.join(save_dir, newest_file)
-
-                        # 检查文件是否完整（大小稳定）
-                        size1 = os.path.getsize(temp_path)
-                        time.sleep(random.uniform(0.5, 1.0))
-                        size2 = os.path.getsize(temp_path)
-
-                        if size1 == size2 and size1 > 0:
-                            downloaded_file = temp_path
-                            break
+                # 等待下载完成(最多30秒)
+                downloaded_file = self.download_watcher.wait(token, timeout=30)
 
                 if downloaded_file:
                     try:
@@ -459,131 +546,94 @@ class AnnouncementDownloadController:
         - max_page: 最大处理页数
         - download_files: 是否下载文件
         - save_dir: 文件保存目录
-        - 输出：无(数据存入数据库)
+        - 输出：下载完成的公告数(数据存入数据库)
         """
         db = AnnouncementDB("data/announcements.db")
+        writer = BufferedRecordWriter(db)
+        self._open_manifest(db)
+        self._reset_download_stats()
+        if download_files:
+            self._start_http_downloads()
         current_page = 1
-        download_cnt = 0
-        failures = 0
+        max_bulletin_num = min(max_bulletin_num, total_cnt)
 
         while (
             current_page <= max_page
-            and download_cnt < max_bulletin_num
-            and failures < 5
-            and download_cnt < total_cnt
+            and not self._download_limit_reached(max_bulletin_num)
+            and not self._too_many_failures()
         ):
             print(f"current page: {current_page}")
             try:
                 table = self._wait_and_highlight(By.CSS_SELECTOR, "table.table-hover")
-                rows = table.find_elements(By.CSS_SELECTOR, "tbody tr")
-
-                # 处理一个stock有多个公告的情况
-                current_code = ""
-                current_name = ""
+                rows, first_row = self._extract_table_rows(table)
 
                 for row in rows:
-                    if download_cnt % 10 == 0:
+                    # 浏览器下载时定期清理缓存(HTTP下载不经过浏览器)
+                    if not self.http_download and self.saved_announcements % 10 == 0:
                         self.driver.execute_cdp_cmd("Network.clearBrowserCache", {})
                         self.driver.execute_cdp_cmd(
                             "Storage.clearDataForOrigin",
                             {"origin": "*", "storageTypes": "all"},
                         )
 
-                    if (
-                        download_cnt >= total_cnt
-                        or download_cnt >= max_bulletin_num
-                        or failures >= 5
-                    ):
+                    if self._download_limit_reached(
+                        max_bulletin_num
+                    ) or self._too_many_failures():
                         break
 
                     try:
-                        cells = row.find_elements(By.TAG_NAME, "td")
-                        if len(cells) < 6:
-                            continue
-
-                        code = cells[0].text.strip()
-                        name = cells[1].text.strip()
-
-                        if code == "" or name == "":
-                            code = current_code
-                            name = current_name
-                        else:
-                            current_code = code
-                            current_name = name
-
-                        title = cells[2].text.strip()
-                        link = (
-                            cells[2]
-                            .find_element(By.TAG_NAME, "a")
-                            .get_attribute("href")
-                        )
-                        type = cells[4].text.strip()
-                        date = cells[5].text.strip()
-                        url = self.create_url(link)
-
+                        if not row["link"]:
+                            raise ValueError(f"no link found: {row['title']}")
                         record = {
-                            "stock_code": code,
-                            "stock_name": name,
-                            "announcement_title": title,
-                            "announcement_type": type,
-                            "announcement_date": date,
-                            "announcement_url": url,
+                            "stock_code": row["code"],
+                            "stock_name": row["name"],
+                            "announcement_title": row["title"],
+                            "announcement_type": row["type"],
+                            "announcement_date": row["date"],
+                            "announcement_url": self.create_url(row["link"]),
                         }
 
-                        if download_files and url and not db.record_exists(url):
+                        if download_files:
                             try:
-                                # Clean filename
-                                clean_title = re.sub(r'[\\/*?:"<>|]', "", title)[
-                                    :50
-                                ]  # Limit length
-                                file_name = f"{code}_{date}_{clean_title}.pdf"
-
-                                # download start
-                                success = self.download_file_function(
-                                    url=url,
-                                    save_dir=save_dir,
-                                    filename=file_name,
-                                    max_attempt=3,
-                                )
-                                if success:
-                                    file_info = {
-                                        "file_name": file_name,
-                                        "file_path": os.path.join(save_dir, file_name),
-                                    }
-                                    db.save_record(record, file_info)
-                                    download_cnt += 1
-                                    failures = 0
-                                    continue
-                                time.sleep(
-                                    random.randint(1, 3)
-                                )  # Delay between downloads
-
+                                self._save_announcement(record, db, writer, save_dir)
                             except Exception as e:
-                                failures += 1
+                                self._record_download(False)
                                 self.logger.error(f"Download error: {str(e)}")
 
                     except Exception as e:
-                        failures += 1
+                        self._record_download(False)
                         self.logger.warning(f"Row processing error: {str(e)}")
                         continue
 
-                    time.sleep(3)
-
                 current_page += 1
-                if (
-                    download_cnt < max_bulletin_num
-                    and failures < 5
-                    and download_cnt < total_cnt
-                ):
+                if not self._download_limit_reached(
+                    max_bulletin_num
+                ) and not self._too_many_failures():
                     try:
                         next_btn = self._wait_and_highlight(
-                            By.CSS_SELECTOR, "li.next a"
+                            By.CSS_SELECTOR, "li.next a", clickable=True
                         )
                         if "disabled" in next_btn.get_attribute("class"):
                             self.logger.info("已经是最后一页，无法继续翻页")
-                            return False
+                            break
+                        limiter = get_limiter(self.driver.current_url)
+                        limiter.acquire()
+                        start = time.monotonic()
                         self._reliable_click(next_btn)
-                        time.sleep(random.uniform(1, 3))
+                        # 等待旧表格行被替换，避免读到上一页的数据
+                        refreshed = True
+                        if first_row is not None:
+                            try:
+                                WebDriverWait(self.driver, 10).until(
+                                    EC.staleness_of(first_row)
+                                )
+                            except Exception:
+                                refreshed = False
+                                self.logger.warning("翻页后表格未刷新")
+                        # 表格刷新耗时即翻页请求的延迟，未刷新视为错误
+                        limiter.report(
+                            latency=time.monotonic() - start, error=not refreshed
+                        )
                     except:
                         print("翻页失败")
                         break  # No more pages
@@ -591,33 +641,422 @@ class AnnouncementDownloadController:
             except Exception as e:
                 self.logger.error(f"Page processing error: {str(e)}")
                 break
+        self._wait_http_downloads()
+        writer.close()
+        db.close()
+        download_cnt = self.saved_announcements
         print(f"total crawler announcement count: {download_cnt}")
         self.logger.info(
-            f"Finished. Downloaded {download_cnt} files. Failures: {failures}"
+            f"Finished. Downloaded {download_cnt} files. "
+            f"Failures: {self.failed_downloads}"
+        )
+        return download_cnt
+
+    def crawl_date_range(
+        self,
+        start_date,
+        end_date,
+        max_bulletin_num=100,
+        use_api=True,
+        url="https://www.sse.com.cn/disclosure/listedinfo/announcement/",
+        save_dir="data/announcements",
+    ):
+        """
+        - 抓取任意长度的日期区间: 自动切分为网站可接受的查询窗口后依次处理
+        - 输入：
+        - start_date: 开始日期(datetime.date)
+        - end_date: 结束日期(datetime.date)
+        - max_bulletin_num: 所有窗口合计的最大下载公告数
+        - use_api: 是否通过公告列表接口获取公告，否则操作日期选择器并解析网页表格
+        - url: 公告页面地址(解析网页表格时使用)
+        - save_dir: 文件保存目录
+        - 输出：下载的公告数
+        """
+        windows = split_date_windows(start_date, end_date)
+        total = 0
+        if use_api and self.http_download and self.driver is not None:
+            # 先访问公告页面获取Cookie，供HTTP下载器复用
+            self.driver.get(url)
+        for i, (w_start, w_end) in enumerate(windows, 1):
+            remaining = max_bulletin_num - total
+            if remaining <= 0:
+                break
+            self.logger.info(f"[window {i}/{len(windows)}] {w_start} ~ {w_end}")
+            if use_api:
+                total += self.listing_crawler(
+                    w_start, w_end, remaining, save_dir=save_dir
+                )
+            elif self.open_date_picker(url, date_range=(w_start, w_end)):
+                if not self.select_date(w_start, w_end):
+                    continue
+                self.confirm()
+                total_cnt = self.data_statistics()
+                total += self.data_crawler(total_cnt, remaining, save_dir=save_dir)
+        return total
+
+    """
+    一次脚本调用读取整张公告表格: 返回第一行元素(用于翻页后判断表格是否刷新)
+    以及每行各单元格的文本和链接
+    """
+    TABLE_ROWS_SCRIPT = """
+    var rows = arguments[0].querySelectorAll("tbody tr");
+    return {
+        first: rows.length ? rows[0] : null,
+        rows: Array.prototype.map.call(rows, function (tr) {
+            return Array.prototype.map.call(tr.querySelectorAll("td"), function (td) {
+                var a = td.querySelector("a");
+                return {
+                    text: (td.innerText || td.textContent || "").trim(),
+                    href: a ? a.href : null
+                };
+            });
+        })
+    };
+    """
+
+    def _extract_table_rows(self, table):
+        """
+        - 一次浏览器调用提取公告表格的全部行，再在Python中整理
+        - 输入：
+        - table: 公告表格元素
+        - 输出：(行数据列表, 第一行元素)
+          行数据: {"code", "name", "title", "link", "type", "date"}，
+          同一证券的多条公告只有第一行有代码/名称，后续行沿用上一行
+        """
+        result = self.driver.execute_script(self.TABLE_ROWS_SCRIPT, table) or {}
+
+        # 处理一个stock有多个公告的情况
+        current_code = ""
+        current_name = ""
+        rows = []
+        for cells in result.get("rows") or []:
+            if len(cells) < 6:
+                continue
+            code = cells[0]["text"]
+            name = cells[1]["text"]
+            if code == "" or name == "":
+                code = current_code
+                name = current_name
+            else:
+                current_code = code
+                current_name = name
+            rows.append(
+                {
+                    "code": code,
+                    "name": name,
+                    "title": cells[2]["text"],
+                    "link": cells[2]["href"],
+                    "type": cells[4]["text"],
+                    "date": cells[5]["text"],
+                }
+            )
+        return rows, result.get("first")
+
+    def _save_announcement(self, record, db, writer, save_dir):
+        """
+        - 下载单条公告文件并写入数据库(已保存的公告跳过)
+          下载结果在完成时计入下载统计(HTTP下载在下载线程的回调中计入)
+        - 输入：
+        - record: 公告字典
+        - db: 公告数据库
+        - writer: 缓冲写入器
+        - save_dir: 文件保存目录
+        - 输出：已下载或已提交下载返回True，跳过或下载失败返回False
+        """
+        url = record["announcement_url"]
+        if not url or db.record_exists(url) or writer.is_pending(url):
+            return False
+
+        # Clean filename
+        clean_title = re.sub(r'[\\/*?:"<>|]', "", record["announcement_title"])[
+            :50
+        ]  # Limit length
+        file_name = (
+            f"{record['stock_code']}_{record['announcement_date']}_{clean_title}.pdf"
+        )
+
+        if self.http_download:
+            return self._submit_http_download(record, writer, save_dir, file_name)
+
+        # download start
+        limiter = get_limiter(url)
+        limiter.acquire()
+        start = time.monotonic()
+        success = self.download_file_function(
+            url=url,
+            save_dir=save_dir,
+            filename=file_name,
+            max_attempt=3,
         )
+        # 文件已存在时未访问服务器，不计为错误
+        limiter.report(
+            latency=time.monotonic() - start,
+            error=not success
+            and not self._file_size(os.path.join(save_dir, file_name)),
+        )
+        if success:
+            file_info = self._store_file(
+                file_name, os.path.join(save_dir, file_name), url
+            )
+            writer.add(record, file_info)
+        self._record_download(success)
+        return success
+
+    def _open_manifest(self, db):
+        """
+        - 打开公告数据库对应的文件清单(已打开时复用)
+        - 输入：
+        - db: 公告数据库
+        - 输出：FileManifest
+        """
+        if self.manifest is None or self.manifest.db_path != db.db_path:
+            if self.manifest is not None:
+                self.manifest.close()
+            self.manifest = FileManifest(db.db_path)
+        return self.manifest
+
+    def _file_size(self, save_path):
+        """
+        - 查询文件大小: 有文件清单时在内存中查询(目录首次使用时扫描一次)，否则访问文件系统
+        - 输入：
+        - save_path: 文件路径
+        - 输出：文件大小(字节)，文件不存在时返回0
+        """
+        if self.manifest is None:
+            return os.path.getsize(save_path) if os.path.exists(save_path) else 0
+        self.manifest.scan_directory(os.path.dirname(save_path) or ".")
+        entry = self.manifest.get(save_path)
+        return (entry and entry["size"]) or 0
+
+    def _store_file(self, file_name, save_path, url=None):
+        """
+        - 下载完成的文件移入BlobStore，并同步更新文件清单
+        - 输入：
+        - file_name: 文件名
+        - save_path: 下载完成的文件路径
+        - url: 公告URL(文件清单中的公告key)
+        - 输出：文件信息字典(file_name/file_path/file_size/blob_hash)
+        """
+        digest, path, size = self.blob_store.put_file(save_path)
+        if self.manifest is not None:
+            self.manifest.remove(save_path)
+            self.manifest.add(path, size, digest, url)
+        return {
+            "file_name": file_name,
+            "file_path": path,
+            "file_size": size,
+            "blob_hash": digest,
+        }
+
+    def _start_http_downloads(self):
+        """
+        - 创建HTTP下载器(已创建时刷新浏览器Cookie)
+        - 输入：无
+        - 输出：无
+        """
+        if not self.http_download:
+            return
+        if self.http_downloader is None:
+            self.http_downloader = SseHttpDownloader(workers=self.download_workers)
+        if self.driver is not None:
+            self.http_downloader.sync_from_driver(self.driver)
+
+    def _submit_http_download(self, record, writer, save_dir, file_name):
+        """
+        - 提交HTTP下载任务，下载完成后在下载线程中写入数据库
+        - 输入：
+        - record: 公告字典
+        - writer: 缓冲写入器
+        - save_dir: 文件保存目录
+        - file_name: 目标文件名
+        - 输出：提交成功返回True(文件已存在或正在下载时返回False)
+        """
+        url = record["announcement_url"]
+        save_path = os.path.join(save_dir, file_name)
+        if self._file_size(save_path) > 0:
+            self.logger.info(f"文件已存在，跳过下载: {file_name}")
+            return False
+        with self._download_lock:
+            if url in self._downloading_urls:
+                return False
+            self._downloading_urls.add(url)
+
+        def on_done(success):
+            try:
+                if success:
+                    writer.add(record, self._store_file(file_name, save_path, url))
+                    self.logger.info(f"Download completed: {file_name}")
+            except Exception as e:
+                success = False
+                self.logger.error(f"Save error: {file_name}: {str(e)}")
+            # 先计入结果再移出下载中集合，避免统计时漏算这条公告
+            self._record_download(success)
+            with self._download_lock:
+                self._downloading_urls.discard(url)
+
+        self.http_downloader.submit(url, save_path, on_done)
+        return True
+
+    def _wait_http_downloads(self):
+        """
+        - 等待已提交的HTTP下载全部完成(写入器关闭前调用)
+        - 输入：无
+        - 输出：无
+        """
+        if self.http_downloader is not None:
+            self.http_downloader.wait()
+
+    def _reset_download_stats(self):
+        """
+        - 开始抓取前清零下载统计
+        - 输入：无
+        - 输出：无
+        """
+        with self._download_lock:
+            self.saved_announcements = 0
+            self.failed_downloads = 0
+            self.consecutive_failures = 0
+
+    def _record_download(self, success):
+        """
+        - 记录一条公告的保存结果(同步下载后或下载线程的回调中调用)
+        - 输入：
+        - success: 是否保存成功
+        - 输出：无
+        """
+        with self._download_lock:
+            if success:
+                self.saved_announcements += 1
+                self.consecutive_failures = 0
+            else:
+                self.failed_downloads += 1
+                self.consecutive_failures += 1
+
+    def _too_many_failures(self, max_failures=5):
+        """
+        - 连续失败次数(含下载线程中的失败)是否达到上限
+        """
+        with self._download_lock:
+            return self.consecutive_failures >= max_failures
+
+    def _download_limit_reached(self, max_bulletin_num):
+        """
+        - 是否已保存足够的公告: 已完成数+下载中数达到上限时，等待下载完成后按已完成数判断
+        - 输入：
+        - max_bulletin_num: 最大保存公告数
+        - 输出：bool
+        """
+        with self._download_lock:
+            saved = self.saved_announcements
+            pending = len(self._downloading_urls)
+        if saved + pending < max_bulletin_num:
+            return False
+        if pending:
+            self._wait_http_downloads()
+        with self._download_lock:
+            return self.saved_announcements >= max_bulletin_num
+
+    def listing_crawler(
+        self,
+        start_date,
+        end_date,
+        max_bulletin_num=100,
+        download_files=True,
+        save_dir="data/announcements",
+        listing_client=None,
+    ):
+        """
+        - 通过公告列表接口抓取公告数据(不解析网页表格)
+        - 输入：
+        - start_date: 开始日期(datetime.date或YYYY-MM-DD字符串)
+        - end_date: 结束日期(datetime.date或YYYY-MM-DD字符串)
+        - max_bulletin_num: 最大下载公告数
+        - download_files: 是否下载文件(需已启动浏览器)；为False时只保存公告列表
+        - save_dir: 文件保存目录
+        - listing_client: 可指定的SseListingClient(如指向本地模拟服务器)
+        - 输出：保存完成的公告数
+        """
+        client = listing_client or SseListingClient()
+        db = AnnouncementDB("data/announcements.db")
+        writer = BufferedRecordWriter(db)
+        self._open_manifest(db)
+        self._reset_download_stats()
+        if download_files:
+            self._start_http_downloads()
+        try:
+            for record in client.iter_records(str(start_date), str(end_date)):
+                if (
+                    self._download_limit_reached(max_bulletin_num)
+                    or self._too_many_failures()
+                ):
+                    break
+                if not download_files:
+                    url = record["announcement_url"]
+                    if not db.record_exists(url) and not writer.is_pending(url):
+                        writer.add(record)
+                        self._record_download(True)
+                    continue
+                try:
+                    self._save_announcement(record, db, writer, save_dir)
+                except Exception as e:
+                    self._record_download(False)
+                    self.logger.error(f"Download error: {str(e)}")
+        except Exception as e:
+            self.logger.error(f"Listing error: {str(e)}")
+        finally:
+            self._wait_http_downloads()
+            writer.close()
+            db.close()
+            if listing_client is None:
+                client.close()
+        saved_cnt = self.saved_announcements
+        self.logger.info(
+            f"Finished. Saved {saved_cnt} announcements. "
+            f"Failures: {self.failed_downloads}"
+        )
+        return saved_cnt
 
     def _wait_and_highlight(
-        self, by: str, locator: str, timeout: int = 10, highlight_color: str = "red"
+        self,
+        by: str,
+        locator: str,
+        timeout: int = 10,
+        highlight_color: str = "red",
+        clickable: bool = False,
     ):
         """
-        - 等待并高亮元素
+        - 等待元素出现(或可点击)，调试模式下高亮元素并停顿
         - 输入：
         - by: 定位策略
         - locator: 元素定位表达式
         - timeout: 最大等待时间
         - highlight_color: 高亮颜色
+        - clickable: 是否等待元素可点击
         - 输出：找到的页面元素
         """
-        context = self.driver
-        element = WebDriverWait(context, timeout).until(
-            EC.presence_of_element_located((by, locator))
+        condition = (
+            EC.element_to_be_clickable
+            if clickable
+            else EC.presence_of_element_located
         )
-        self.driver.execute_script(
-            f"arguments[0].style.border='3px solid {highlight_color}';", element
-        )
-        time.sleep(random.uniform(0.5, 1.0))
+        element = WebDriverWait(self.driver, timeout).until(condition((by, locator)))
+        if self.debug:
+            self.driver.execute_script(
+                f"arguments[0].style.border='3px solid {highlight_color}';", element
+            )
+            self._pause(0.5, 1.0)
         return element
 
+    def _pause(self, low: float, high: float):
+        """
+        - 随机停顿(仅调试模式)
+        - 输入：
+        - low / high: 停顿时间范围(秒)
+        - 输出：无
+        """
+        if self.debug:
+            time.sleep(random.uniform(low, high))
+
     def _reliable_click(self, element):
         """
         - 可靠点击元素
@@ -630,7 +1069,7 @@ class AnnouncementDownloadController:
         except:
             try:
                 ActionChains(self.driver).move_to_element(element).pause(
-                    random.uniform(0.5, 1.0)
+                    random.uniform(0.5, 1.0) if self.debug else 0
                 ).click().perform()
             except:
                 self.driver.execute_script("arguments[0].click();", element)
@@ -654,6 +1093,12 @@ class AnnouncementDownloadController:
         - 输入：无
         - 输出：无
         """
+        if self.http_downloader is not None:
+            self.http_downloader.close()
+            self.http_downloader = None
+        if self.manifest is not None:
+            self.manifest.close()
+            self.manifest = None
         if self.driver and self._is_self_managed_driver:
             self.driver.quit()
             self.logger.info("Browser closed")
@@ -663,13 +1108,58 @@ class AnnouncementDownloadController:
 from dateutil.relativedelta import relativedelta
 
 
+def split_date_windows(start_date, end_date, months=3):
+    """
+    功能：
+        将任意日期区间切分为网站可接受的查询窗口(每个窗口不超过months个月)
+
+    参数:
+        start_date: 开始日期(datetime.date)
+        end_date: 结束日期(datetime.date)
+        months: 单个窗口的最大月数
+
+    返回:
+        list [(window_start, window_end)] - 按时间顺序排列、首尾相接的窗口
+    """
+    windows = []
+    window_start = start_date
+    while window_start <= end_date:
+        window_end = min(
+            end_date, window_start + relativedelta(months=months, days=-1)
+        )
+        windows.append((window_start, window_end))
+        window_start = window_end + relativedelta(days=1)
+    return windows
+
+
+def build_text_index(db_path="data/announcements.db", workers=4, retry_failed=False):
+    """
+    - 为已下载的公告建立全文索引(可选功能，需安装pypdf)，只处理新增的文件
+    - 输入：
+    - db_path: 公告数据库路径
+    - workers: 文本提取进程数
+    - retry_failed: 是否重试提取失败的文件
+    - 输出：统计数据(pending/indexed/failed)
+    """
+    db = AnnouncementDB(db_path)
+    try:
+        documents = db.list_files()
+    finally:
+        db.close()
+    index = TextIndex(db_path, workers=workers)
+    try:
+        return index.build(documents, retry_failed=retry_failed)
+    finally:
+        index.close()
+
+
 def get_date_input():
     """
     功能流程：
         1. 循环提示用户输入开始/结束日期
         2. 验证日期格式有效性
         3. 检查日期范围合理性
-        4. 确保间隔不超过3个月
+        (超过3个月的区间由split_date_windows自动切分)
 
     返回:
         tuple (start_date, end_date) - 通过验证的datetime.date对象
@@ -688,13 +1178,7 @@ def get_date_input():
                 print("错误：结束日期不能早于开始日期")
                 continue
 
-            # 精确计算三个月的间隔
-            three_months_later = start_date + relativedelta(months=3)
-
-            if end_date > three_months_later:
-                print("错误：日期间隔不能超过三个月")
-            else:
-                return start_date, end_date
+            return start_date, end_date
 
         except ValueError:
             print("错误：日期格式不正确，请使用YYYY-MM-DD格式")
@@ -722,24 +1206,60 @@ def main():
     """
     start_date: datetime.date对象，用户输入的起始日期
     end_date: datetime.date对象，用户输入的结束日期
-    注意：日期范围不能超过3个月，通过get_date_input()内部验证
+    注意：日期范围超过3个月时自动切分为多个窗口依次抓取
     """
 
-    max_announcement_cnt = int(input("请输入你想要获取的最大公告条数(default = 100): "))
+    max_announcement_cnt = int(
+        input("请输入你想要获取的最大公告条数(整个日期区间合计，default = 100): ")
+    )
+    debug = (
+        input("是否开启调试模式(显示浏览器、高亮元素并放慢操作)?(Y/N, default = N): ")
+        .strip()
+        .upper()
+        == "Y"
+    )
+    use_api = (
+        input("是否通过公告列表接口获取公告(不解析网页表格)?(Y/N, default = Y): ")
+        .strip()
+        .upper()
+        != "N"
+    )
+    processes = input("请输入并行进程数(按日期窗口分配，default = 1): ").strip()
+    processes = int(processes) if processes.isdigit() else 1
+    text_index = (
+        input("下载完成后是否建立全文索引(需安装pypdf)?(Y/N, default = N): ")
+        .strip()
+        .upper()
+        == "Y"
+    )
     print("程序启动...")
 
-    controller = AnnouncementDownloadController()
-    try:
-        controller.start_browser(headless=False, download_dir="data/announcements")
-        if controller.open_date_picker(
-            "https://www.sse.com.cn/disclosure/listedinfo/announcement/"
-        ):
-            controller.select_date(start_date, end_date)
-            controller.confirm()
-            total_cnt = controller.data_statistics()
-            controller.data_crawler(total_cnt, max_announcement_cnt)
-    finally:
-        controller.close()
+    if processes > 1:
+        from sse_coordinator import SseCrawlCoordinator
+
+        results = SseCrawlCoordinator(processes=processes, use_api=use_api).run(
+            start_date, end_date, max_announcement_cnt
+        )
+        for (w_start, w_end), cnt in sorted(results.items()):
+            print(f"{w_start} ~ {w_end}: {'失败' if cnt is None else cnt}")
+    else:
+        controller = AnnouncementDownloadController(debug=debug)
+        try:
+            controller.start_browser(
+                headless=not debug, download_dir="data/announcements"
+            )
+            controller.crawl_date_range(
+                start_date, end_date, max_announcement_cnt, use_api=use_api
+            )
+        finally:
+            controller.close()
+
+    if text_index:
+        try:
+            stats = build_text_index()
+            print(f"索引完成: 新增{stats['indexed']}篇，失败{stats['failed']}篇")
+        except RuntimeError as e:
+            print(str(e))
 
 
 if __name__ == "__main__":
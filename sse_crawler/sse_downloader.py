@@ -0,0 +1,161 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import common_path  # noqa: F401 (共用模块目录加入sys.path)
+from file_downloader import FileDownloader
+
+
+class SseHttpDownloader:
+    """
+    SseHttpDownloader - 复用浏览器会话的并发HTTP文件下载器
+    - 从Selenium浏览器复制Cookie和User-Agent，请求与浏览器中的访问一致
+    - 文件由FileDownloader流式写入临时文件，中断时断点续传，校验大小后原子重命名，
+      不需要轮询下载目录
+    - 线程池并发下载，浏览器可以同时继续翻页；待下载任务过多时submit阻塞(背压)
+    """
+
+    DEFAULT_HEADERS = {
+        "Accept": "application/pdf,*/*",
+        "Accept-Language": "zh-CN,zh;q=0.9",
+        "Connection": "keep-alive",
+        "Referer": "https://www.sse.com.cn/",
+    }
+
+    def __init__(
+        self,
+        driver=None,
+        workers: int = 4,
+        max_pending: int = None,
+        timeout=(5, 60),
+        max_retries: int = 3,
+        chunk_size: int = 64 * 1024,
+        logger: logging.Logger = None,
+    ):
+        """
+        输入:
+          - driver: 可选的Selenium浏览器，用于复制Cookie和User-Agent
+          - workers: 并发下载数
+          - max_pending: 最多排队的下载任务数(默认workers*4)
+          - timeout: 请求超时时间(秒)，可为 (连接超时, 读取超时)
+          - max_retries: 5xx及连接异常的最大重试次数(传输中断时另外从断点续传)
+          - chunk_size: 流式写入的块大小(字节)
+          - logger: 可指定的自定义日志记录器
+        输出: 无
+        """
+        self.workers = max(1, int(workers))
+        self.logger = logger or logging.getLogger("SseHttpDownloader")
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.workers, pool_maxsize=self.workers, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.DEFAULT_HEADERS)
+        self.file_downloader = FileDownloader(
+            self.session,
+            timeout=timeout,
+            chunk_size=chunk_size,
+            max_attempts=max_retries,
+            logger=self.logger,
+        )
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="sse-download"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending or self.workers * 4)
+        self._futures = set()
+        self._lock = threading.Lock()
+        if driver is not None:
+            self.sync_from_driver(driver)
+
+    def sync_from_driver(self, driver) -> None:
+        """
+        从浏览器复制Cookie和User-Agent到HTTP会话
+        输入: Selenium浏览器
+        输出: 无
+        """
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/"),
+            )
+        user_agent = driver.execute_script("return navigator.userAgent")
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+
+    def download(self, url: str, save_path: str) -> bool:
+        """
+        下载单个文件(同步)
+        输入:
+          - url: 文件URL
+          - save_path: 保存路径
+        输出: 下载成功返回True，否则False
+        """
+        return self.file_downloader.download(url, save_path)
+
+    def submit(
+        self,
+        url: str,
+        save_path: str,
+        callback: Optional[Callable[[bool], None]] = None,
+    ):
+        """
+        提交下载任务(异步)，排队任务达到上限时阻塞
+        输入:
+          - url: 文件URL
+          - save_path: 保存路径
+          - callback: 下载结束后在下载线程中调用 callback(success)，下载异常时success为False
+        输出: Future
+        """
+        self._slots.acquire()
+
+        def run():
+            success = False
+            try:
+                success = self.download(url, save_path)
+                return success
+            finally:
+                try:
+                    if callback:
+                        callback(success)
+                finally:
+                    self._slots.release()
+
+        future = self._executor.submit(run)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+        if future.exception():
+            self.logger.error(f"download task error: {future.exception()}")
+
+    def wait(self) -> None:
+        """等待已提交的下载任务全部完成"""
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures)
+
+    def close(self) -> None:
+        """等待下载完成并关闭线程池和会话"""
+        self._executor.shutdown(wait=True)
+        self.session.close()
@@ -0,0 +1,216 @@
+import json
+import logging
+import re
+import time
+from typing import Dict, Iterator, Optional
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import common_path  # noqa: F401 (共用模块目录加入sys.path)
+from rate_limiter import get_limiter
+
+
+class SseListingClient:
+    """
+    SseListingClient - 上交所公告列表接口客户端
+    - 直接请求公告页面背后的JSON(P)查询接口，不需要浏览器
+    - 共享会话复用连接，5xx及连接异常自动重试，按host自适应限速
+    - 输出的记录字典与AnnouncementDB.save_record要求的字段一致
+    - base_url/site_url可配置，便于指向本地模拟服务器测试
+    """
+
+    """
+    公告查询接口及公告文件所在站点
+    """
+    BASE_URL = "https://query.sse.com.cn/security/stock/queryCompanyBulletinNew.do"
+    SITE_URL = "https://www.sse.com.cn"
+
+    """
+    接口校验Referer，需与网页请求保持一致
+    """
+    DEFAULT_HEADERS = {
+        "Accept": "*/*",
+        "Accept-Language": "zh-CN,zh;q=0.9",
+        "Connection": "keep-alive",
+        "Referer": "https://www.sse.com.cn/",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36",
+    }
+
+    JSONP_PATTERN = re.compile(r"^\s*[\w$.]+\((.*)\)\s*;?\s*$", re.S)
+
+    def __init__(
+        self,
+        base_url: str = None,
+        site_url: str = None,
+        page_size: int = 100,
+        timeout=(5, 30),
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        logger: logging.Logger = None,
+    ):
+        """
+        输入:
+          - base_url: 查询接口地址(默认BASE_URL)
+          - site_url: 公告文件相对路径的拼接站点(默认SITE_URL)
+          - page_size: 每页公告数
+          - timeout: 请求超时时间(秒)，可为 (连接超时, 读取超时)
+          - max_retries: 最大重试次数
+          - backoff_factor: 重试退避系数
+          - logger: 可指定的自定义日志记录器
+        输出: 无
+        """
+        self.base_url = base_url or self.BASE_URL
+        self.site_url = site_url or self.SITE_URL
+        self.page_size = page_size
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger("SseListingClient")
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_maxsize=10, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.DEFAULT_HEADERS)
+
+    def build_params(
+        self,
+        start_date: str,
+        end_date: str,
+        page_no: int = 1,
+        security_code: str = "",
+        title: str = "",
+        bulletin_type: str = "",
+    ) -> Dict:
+        """
+        构造查询参数
+        输入:
+          - start_date / end_date: 日期区间(YYYY-MM-DD)
+          - page_no: 页码
+          - security_code: 证券代码(为空表示全部)
+          - title: 标题关键词
+          - bulletin_type: 公告类型
+        输出: 参数字典
+        """
+        return {
+            "isPagination": "true",
+            "pageHelp.pageSize": self.page_size,
+            "pageHelp.cacheSize": 1,
+            "pageHelp.pageNo": page_no,
+            "pageHelp.beginPage": page_no,
+            "pageHelp.endPage": page_no,
+            "START_DATE": start_date,
+            "END_DATE": end_date,
+            "SECURITY_CODE": security_code,
+            "TITLE": title,
+            "BULLETIN_TYPE": bulletin_type,
+            "stockType": "",
+            "_": int(time.time() * 1000),
+        }
+
+    @classmethod
+    def parse_response(cls, text: str) -> Dict:
+        """
+        解析接口返回内容(JSON或JSONP)
+        输入: 响应文本
+        输出: 解析后的字典
+        """
+        match = cls.JSONP_PATTERN.match(text)
+        return json.loads(match.group(1) if match else text)
+
+    def fetch_page(self, start_date: str, end_date: str, page_no: int = 1, **filters):
+        """
+        请求一页公告
+        输入:
+          - start_date / end_date: 日期区间(YYYY-MM-DD)
+          - page_no: 页码
+          - filters: 透传给build_params的筛选条件
+        输出: (公告列表, 总页数, 公告总数)，请求失败时抛出异常
+        """
+        params = self.build_params(start_date, end_date, page_no, **filters)
+        limiter = get_limiter(self.base_url)
+        limiter.acquire()
+        start = time.monotonic()
+        try:
+            response = self.session.get(
+                self.base_url, params=params, timeout=self.timeout
+            )
+        except requests.RequestException:
+            limiter.report(latency=time.monotonic() - start, error=True)
+            raise
+        limiter.report(latency=time.monotonic() - start, status=response.status_code)
+        response.raise_for_status()
+
+        data = self.parse_response(response.text)
+        page_help = data.get("pageHelp") or {}
+        items = page_help.get("data") or data.get("result") or []
+        # 同一证券的多条公告可能被分为一组
+        bulletins = []
+        for item in items:
+            if isinstance(item, list):
+                bulletins.extend(item)
+            else:
+                bulletins.append(item)
+        total = int(page_help.get("total") or len(bulletins))
+        page_count = int(page_help.get("pageCount") or 0)
+        if not page_count and self.page_size:
+            page_count = -(-total // self.page_size)
+        return bulletins, page_count, total
+
+    def to_record(self, bulletin: Dict) -> Optional[Dict]:
+        """
+        接口返回的公告转换为数据库记录
+        输入: 接口返回的单条公告
+        输出: 公告字典(字段同AnnouncementDB.save_record)，缺少链接时返回None
+        """
+        url = bulletin.get("URL")
+        if not url:
+            return None
+        date = bulletin.get("SSEDATE") or str(bulletin.get("ADDDATE") or "")[:10]
+        return {
+            "stock_code": str(bulletin.get("SECURITY_CODE") or "").strip(),
+            "stock_name": str(bulletin.get("SECURITY_NAME") or "").strip(),
+            "announcement_title": str(bulletin.get("TITLE") or "").strip(),
+            "announcement_type": bulletin.get("BULLETIN_TYPE_DESC")
+            or bulletin.get("BULLETIN_TYPE"),
+            "announcement_date": date,
+            "announcement_url": urljoin(self.site_url, url),
+        }
+
+    def iter_records(
+        self, start_date: str, end_date: str, max_page: int = 10000, **filters
+    ) -> Iterator[Dict]:
+        """
+        逐页获取日期区间内的全部公告
+        输入:
+          - start_date / end_date: 日期区间(YYYY-MM-DD)
+          - max_page: 最大页数
+          - filters: 透传给build_params的筛选条件
+        输出: 公告字典生成器
+        """
+        page_no = 1
+        while page_no <= max_page:
+            bulletins, page_count, total = self.fetch_page(
+                start_date, end_date, page_no, **filters
+            )
+            if page_no == 1:
+                self.logger.info(f"{start_date}~{end_date}: {total} announcements")
+            for bulletin in bulletins:
+                record = self.to_record(bulletin)
+                if record:
+                    yield record
+            if not bulletins or page_no >= page_count:
+                break
+            page_no += 1
+
+    def close(self) -> None:
+        """关闭会话及连接池"""
+        self.session.close()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# 两个爬虫均以脚本方式运行(模块在各自目录下按顶层模块导入)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for name in ("cninf_crawler", "sse_crawler", "common"):
+    path = os.path.join(ROOT, name)
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import sqlite3
+
+from bloom_filter import BloomFilter
+from db_save import AnnouncementDB
+
+
+def url_key(url):
+    return hashlib.sha256(url.encode("utf-8")).digest()[:16]
+
+
+def make_record(i):
+    return {
+        "stock_code": "600000",
+        "stock_name": "浦发银行",
+        "announcement_title": f"公告{i}",
+        "announcement_type": "其他",
+        "announcement_date": "2025-07-01",
+        "announcement_url": f"https://www.sse.com.cn/disclosure/2025-07-01/{i}.pdf",
+    }
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "urls.bloom")
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [url_key(f"https://example.com/{i}.pdf") for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    bloom.row_count = 1000
+    bloom.save(path)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    loaded = BloomFilter.load(path)
+    assert (loaded.num_bits, loaded.num_hashes) == (bloom.num_bits, bloom.num_hashes)
+    assert (loaded.count, loaded.row_count) == (1000, 1000)
+    assert loaded.bits == bloom.bits
+    assert all(key in loaded for key in keys)
+    # 误判率应接近设定值
+    others = [url_key(f"https://example.com/other/{i}.pdf") for i in range(2000)]
+    assert sum(key in loaded for key in others) < 100
+
+
+def test_load_rejects_bad_file(tmp_path):
+    path = tmp_path / "urls.bloom"
+    assert BloomFilter.load(str(path)) is None
+    path.write_bytes(b"SSEBLM01")
+    assert BloomFilter.load(str(path)) is None
+    bloom = BloomFilter(capacity=100)
+    bloom.save(str(path))
+    path.write_bytes(path.read_bytes()[:-1])
+    assert BloomFilter.load(str(path)) is None
+
+
+def test_record_exists_after_reload(tmp_path):
+    db_path = str(tmp_path / "announcements.db")
+    db = AnnouncementDB(db_path)
+    db.save_record(make_record(0))
+    assert db.save_records([(make_record(i), None) for i in range(1, 50)]) == 49
+    db.close()
+
+    db = AnnouncementDB(db_path)
+    assert db._bloom.row_count == 50
+    assert all(db.record_exists(make_record(i)["announcement_url"]) for i in range(50))
+    assert not db.record_exists(make_record(50)["announcement_url"])
+    db.close()
+
+
+def test_bloom_rebuilt_when_rows_change_or_full(tmp_path):
+    db_path = str(tmp_path / "announcements.db")
+    db = AnnouncementDB(db_path)
+    db.save_records([(make_record(i), None) for i in range(3)])
+    db.close()
+
+    # 其他程序写入的行不在过滤器中，行数不一致时重建
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO announcements (stock_code, stock_name, announcement_title, "
+            "announcement_date, announcement_url, url_hash, url_key) "
+            "VALUES ('600000', 'X', 'T', '2025-07-01', ?, ?, ?)",
+            (
+                "https://example.com/external.pdf",
+                hashlib.sha256(b"https://example.com/external.pdf").hexdigest()[:32],
+                url_key("https://example.com/external.pdf"),
+            ),
+        )
+    db = AnnouncementDB(db_path)
+    assert db.record_exists("https://example.com/external.pdf")
+
+    # 容量不足时重建为更大的过滤器
+    db._bloom = BloomFilter(capacity=2)
+    db._bloom.row_count = 4
+    db.save_records([(make_record(i), None) for i in range(3, 6)])
+    assert db._bloom.capacity >= 1000000
+    assert all(db.record_exists(make_record(i)["announcement_url"]) for i in range(6))
+    db.close()
+
+
+def test_migrates_legacy_url_hash_db(tmp_path):
+    db_path = str(tmp_path / "announcements.db")
+    urls = [make_record(i)["announcement_url"] for i in range(3)]
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE announcements (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                stock_code TEXT NOT NULL,
+                stock_name TEXT NOT NULL,
+                announcement_title TEXT NOT NULL,
+                announcement_type TEXT,
+                announcement_date TEXT NOT NULL,
+                announcement_url TEXT NOT NULL UNIQUE,
+                url_hash TEXT NOT NULL UNIQUE,
+                file_path TEXT,
+                file_name TEXT,
+                created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )"""
+        )
+        conn.executemany(
+            "INSERT INTO announcements (stock_code, stock_name, announcement_title, "
+            "announcement_date, announcement_url, url_hash) "
+            "VALUES ('600000', 'X', 'T', '2025-07-01', ?, ?)",
+            [(url, hashlib.sha256(url.encode()).hexdigest()[:32]) for url in urls],
+        )
+
+    db = AnnouncementDB(db_path)
+    assert all(db.record_exists(url) for url in urls)
+    assert not db.record_exists(make_record(3)["announcement_url"])
+    # 迁移后的记录与新写入的记录使用相同的key，重复写入不会新增行
+    assert db.save_record(make_record(0))
+    db.close()
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT announcement_url, url_key FROM announcements")
+        rows = rows.fetchall()
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(announcements)")]
+    assert len(rows) == 3
+    assert all(key == url_key(url) for url, key in rows)
+    assert "blob_hash" in columns
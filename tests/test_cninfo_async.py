@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+from cninfo_async import AsyncPageFetcher
+
+
+class FakeCninfo:
+    def __init__(self):
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def build_payload(self, start_date, end_date, page_num=1):
+        return page_num
+
+    def post_query(self, page_num):
+        with self._lock:
+            self.requested.append(page_num)
+        time.sleep(0.01)
+        return {"announcements": [], "page": page_num}
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_stops_fetching_soon_after_handler_stops(concurrency):
+    cninfo = FakeCninfo()
+    stop_page = 4
+    handled = []
+
+    def handle_page(page_num, data):
+        # 处理比抓取慢，未限制窗口时页面会全部提前请求
+        time.sleep(0.05)
+        handled.append(page_num)
+        return page_num != stop_page
+
+    fetcher = AsyncPageFetcher(cninfo, concurrency=concurrency)
+    count = fetcher.run_sync("2025-07-01", "2025-07-01", range(1, 101), handle_page)
+
+    assert stop_page in handled
+    assert count == len(handled)
+    assert max(cninfo.requested) <= stop_page + concurrency
+    assert len(cninfo.requested) <= len(handled) + concurrency
+
+
+def test_handles_every_page():
+    cninfo = FakeCninfo()
+    handled = []
+
+    fetcher = AsyncPageFetcher(cninfo, concurrency=3)
+    count = fetcher.run_sync(
+        "2025-07-01", "2025-07-01", range(1, 11), lambda p, d: handled.append(p)
+    )
+
+    assert count == 10
+    assert sorted(handled) == list(range(1, 11))
+    assert sorted(cninfo.requested) == list(range(1, 11))
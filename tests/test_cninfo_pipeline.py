@@ -0,0 +1,101 @@
+import threading
+
+from cninfo_pipeline import CninfoPipeline
+
+
+class FakeWriter:
+    def __init__(self):
+        self.ids = set()
+
+    def add(self, record):
+        self.ids.add(record["announcementId"])
+
+    def is_pending(self, announcement_id):
+        return announcement_id in self.ids
+
+    def flush(self):
+        pass
+
+
+class FakeManifest:
+    def contains(self, path):
+        return False
+
+
+class FakeCheckpoint:
+    def completed_pages(self, crawl_key):
+        return set()
+
+
+class FakeCninfo:
+    """两页都返回同一条公告，第1页的下载失败"""
+
+    def __init__(self):
+        self.writer = FakeWriter()
+        self.manifest = FakeManifest()
+        self.checkpoint = FakeCheckpoint()
+        self.first_failed = threading.Event()
+        self.downloads = []
+        self.done_pages = []
+
+    def crawl_key(self, start_date, end_date):
+        return f"{start_date}~{end_date}"
+
+    def prepare_download_dir(self, download_dir):
+        pass
+
+    def build_payload(self, start_date, end_date, page_num=1):
+        return page_num
+
+    def post_query(self, page_num):
+        if page_num == 2:
+            # 第1页的下载失败后才返回第2页
+            self.first_failed.wait(5)
+        return {"announcements": [{"announcementId": "1224", "page": page_num}]}
+
+    def record_exists(self, announcement_id):
+        return self.writer.is_pending(announcement_id)
+
+    def build_record(self, announcement):
+        return {"announcementId": announcement["announcementId"], "downloadUrl": ""}
+
+    def file_name(self, announcement):
+        return "1224.pdf"
+
+    def download_announcement(self, announcement, url, download_dir):
+        self.downloads.append(announcement["page"])
+        if announcement["page"] == 1:
+            return None
+        return "1224.pdf"
+
+    def store_file(self, record, downloaded_file):
+        pass
+
+    def mark_page_done(self, crawl_key, page_num):
+        self.done_pages.append(page_num)
+
+
+class FailFirstPipeline(CninfoPipeline):
+    def _download(self, item, emit):
+        try:
+            super()._download(item, emit)
+        finally:
+            if item[0] == 1:
+                self.cninfo.first_failed.set()
+
+
+def test_failed_download_is_retried_on_later_page(tmp_path):
+    cninfo = FakeCninfo()
+    pipeline = FailFirstPipeline(cninfo, download_dir=str(tmp_path))
+    result = {}
+    thread = threading.Thread(
+        target=lambda: result.update(pipeline.run("2025-07-01", "2025-07-01", 2)),
+        daemon=True,
+    )
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert cninfo.downloads == [1, 2]
+    assert result["saved"] == 1 and result["failed_downloads"] == 1
+    assert cninfo.done_pages == [2]
@@ -0,0 +1,106 @@
+import math
+from datetime import date, timedelta
+
+import pytest
+
+from cninfo_shard import ShardPlanner
+
+# 每日公告数: 有空白日期、可合并的小日期以及超过上限需按页切分的日期
+DAY_COUNTS = {
+    "2025-07-01": 40,
+    "2025-07-02": 50,
+    "2025-07-03": 0,
+    "2025-07-04": 5,
+    "2025-07-05": 250,
+    "2025-07-06": 0,
+    "2025-07-07": 90,
+    "2025-07-08": 20,
+    "2025-07-09": 101,
+    "2025-07-10": 30,
+}
+
+
+class FakeCninfo:
+    def __init__(self, counts):
+        self.counts = counts
+        self.probes = []
+
+    def build_payload(self, start_date, end_date, page_num=1):
+        return {"seDate": f"{start_date}~{end_date}", "pageNum": str(page_num)}
+
+    def post_query(self, payload):
+        start_date, end_date = payload["seDate"].split("~")
+        self.probes.append((start_date, end_date))
+        total = sum(
+            count
+            for day, count in self.counts.items()
+            if start_date <= day <= end_date
+        )
+        return {"totalAnnouncement": total, "announcements": []}
+
+
+def days(start_date, end_date):
+    day = date.fromisoformat(start_date)
+    while day <= date.fromisoformat(end_date):
+        yield day.isoformat()
+        day += timedelta(days=1)
+
+
+@pytest.fixture
+def shards():
+    planner = ShardPlanner(FakeCninfo(DAY_COUNTS), max_shard_records=100, page_size=10)
+    return planner.plan("2025-07-01", "2025-07-10")
+
+
+def test_shards_cover_range_once(shards):
+    # 多日分片覆盖的日期互不重叠；单日分片按页码区间覆盖该日全部页
+    day_shards = {}
+    for shard in shards:
+        for day in days(shard["start_date"], shard["end_date"]):
+            day_shards.setdefault(day, []).append(shard)
+
+    for day, count in DAY_COUNTS.items():
+        if count == 0:
+            continue
+        covering = day_shards[day]
+        if len(covering) == 1:
+            continue
+        # 同一天被多个分片覆盖时，只能是该日的页码区间分片
+        assert all(s["start_date"] == s["end_date"] == day for s in covering)
+        pages = sorted((s["start_page"], s["end_page"]) for s in covering)
+        assert pages[0][0] == 1
+        assert pages[-1][1] == math.ceil(count / 10)
+        for (_, last), (first, _) in zip(pages, pages[1:]):
+            assert first == last + 1
+
+    assert sum(s["records"] for s in shards) == sum(DAY_COUNTS.values())
+    assert len({s["id"] for s in shards}) == len(shards)
+
+
+def test_page_ranges_of_merged_and_split_shards(shards):
+    plan = [
+        (s["start_date"], s["end_date"], s["start_page"], s["end_page"], s["records"])
+        for s in shards
+    ]
+    assert plan == [
+        # 相邻小区间合并(含无公告的日期)，页码从1开始
+        ("2025-07-01", "2025-07-04", 1, 10, 95),
+        # 单日超过上限，按每个分片max_shard_records条切分页码
+        ("2025-07-05", "2025-07-05", 1, 10, 100),
+        ("2025-07-05", "2025-07-05", 11, 20, 100),
+        ("2025-07-05", "2025-07-05", 21, 25, 50),
+        ("2025-07-06", "2025-07-07", 1, 9, 90),
+        ("2025-07-08", "2025-07-08", 1, 2, 20),
+        ("2025-07-09", "2025-07-09", 1, 10, 100),
+        ("2025-07-09", "2025-07-09", 11, 11, 1),
+        ("2025-07-10", "2025-07-10", 1, 3, 30),
+    ]
+
+
+def test_probe_failure_raises():
+    cninfo = FakeCninfo(DAY_COUNTS)
+    cninfo.post_query = lambda payload: None
+    with pytest.raises(RuntimeError):
+        ShardPlanner(cninfo, max_shard_records=100, page_size=10).plan(
+            "2025-07-01", "2025-07-10"
+        )
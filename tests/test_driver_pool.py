@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from driverPool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.crashed = False
+
+    @property
+    def window_handles(self):
+        if self.crashed:
+            raise RuntimeError("chrome not reachable")
+        return ["main"]
+
+
+class FakeController:
+    def __init__(self):
+        self.driver = FakeDriver()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool(DriverPool):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.created = []
+
+    def _create(self):
+        dc = FakeController()
+        self.created.append(dc)
+        return dc
+
+
+def test_discard_wakes_waiting_worker():
+    pool = FakePool(size=1)
+    first = pool.acquire()
+    acquired = []
+    started = threading.Event()
+
+    def worker():
+        started.set()
+        acquired.append(pool.acquire(timeout=5))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    started.wait()
+
+    # 借出的浏览器崩溃，归还时被移除，等待的线程应新建浏览器
+    first.driver.crashed = True
+    pool.release(first)
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert first.closed
+    assert len(acquired) == 1 and acquired[0] is not first
+    assert len(pool.created) == 2
+    pool.close()
+
+
+def test_released_driver_is_reused():
+    pool = FakePool(size=1)
+    dc = pool.acquire()
+    pool.release(dc)
+    assert pool.acquire() is dc
+    assert len(pool.created) == 1
+    pool.close()
+
+
+def test_acquire_times_out_when_pool_is_full():
+    import queue
+
+    pool = FakePool(size=1)
+    pool.acquire()
+    with pytest.raises(queue.Empty):
+        pool.acquire(timeout=0.1)
+    pool.close()
@@ -0,0 +1,188 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from file_downloader import FileDownloader
+
+CONTENT = b"%PDF-1.4 " + bytes(range(256)) * 40
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """按脚本依次返回响应，记录每次请求的Range头"""
+
+    script = []
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.requests.append(self.headers.get("Range"))
+        action, *args = self.script.pop(0)
+        getattr(self, action)(*args)
+
+    def full(self):
+        self._send(200, CONTENT)
+
+    def cut(self, size):
+        """返回200并声明完整长度，只发送前size字节后断开连接"""
+        self._send(200, CONTENT, cut=size)
+
+    def partial(self, start=None, cut=None):
+        """
+        按请求的Range返回206，start指定时返回错误的起始位置，
+        cut指定时只发送cut字节后断开连接
+        """
+        requested = int(self.headers["Range"].split("=")[1].rstrip("-"))
+        start = requested if start is None else start
+        self._send(
+            206,
+            CONTENT[start:],
+            {"Content-Range": f"bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}"},
+            cut=cut,
+        )
+
+    def unsatisfiable(self):
+        self._send(416, b"", {"Content-Range": f"bytes */{len(CONTENT)}"})
+
+    def _send(self, status, body, headers=None, cut=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if cut is None:
+            self.wfile.write(body)
+        else:
+            self.wfile.write(body[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr("file_downloader.time.sleep", lambda seconds: None)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FileHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    FileHandler.script = []
+    FileHandler.requests = []
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/a.pdf"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def downloader():
+    session = requests.Session()
+    # 块大小较小，连接断开前收到的数据能写入临时文件
+    yield FileDownloader(session, timeout=5, chunk_size=256, rate_limit=False)
+    session.close()
+
+
+def run(downloader, url, save_path, script, part=None, **kwargs):
+    FileHandler.script = list(script)
+    if part is not None:
+        with open(save_path + FileDownloader.PART_SUFFIX, "wb") as f:
+            f.write(part)
+    return downloader.download(url, save_path, **kwargs)
+
+
+def assert_saved(save_path):
+    with open(save_path, "rb") as f:
+        assert f.read() == CONTENT
+    assert not os.path.exists(save_path + FileDownloader.PART_SUFFIX)
+
+
+def test_resumes_after_cut_off_response(server, downloader, tmp_path):
+    save_path = str(tmp_path / "a.pdf")
+    ok = run(downloader, server, save_path, [("cut", 1024), ("partial",)])
+
+    assert ok
+    assert FileHandler.requests == [None, "bytes=1024-"]
+    assert_saved(save_path)
+
+
+def test_resumes_repeatedly_within_max_attempts(server, downloader, tmp_path):
+    save_path = str(tmp_path / "a.pdf")
+    ok = run(
+        downloader,
+        server,
+        save_path,
+        [("cut", 1024), ("partial", None, 1024), ("partial",)],
+    )
+
+    assert ok
+    assert FileHandler.requests == [None, "bytes=1024-", "bytes=2048-"]
+    assert_saved(save_path)
+
+
+def test_gives_up_after_max_attempts_and_keeps_part(server, downloader, tmp_path):
+    save_path = str(tmp_path / "a.pdf")
+    ok = run(
+        downloader,
+        server,
+        save_path,
+        [("cut", 1024), ("partial", None, 1024), ("partial", None, 1024)],
+    )
+
+    assert not ok
+    assert len(FileHandler.requests) == 3
+    assert not os.path.exists(save_path)
+    # 保留已下载的部分，下次下载时续传
+    with open(save_path + FileDownloader.PART_SUFFIX, "rb") as f:
+        assert f.read() == CONTENT[:3072]
+
+    FileHandler.requests = []
+    assert run(downloader, server, save_path, [("partial",)])
+    assert FileHandler.requests == ["bytes=3072-"]
+    assert_saved(save_path)
+
+
+def test_416_when_part_file_already_complete(server, downloader, tmp_path):
+    save_path = str(tmp_path / "a.pdf")
+    ok = run(downloader, server, save_path, [("unsatisfiable",)], part=CONTENT)
+
+    assert ok
+    assert FileHandler.requests == [f"bytes={len(CONTENT)}-"]
+    assert_saved(save_path)
+
+
+def test_mismatched_206_start_restarts_from_scratch(server, downloader, tmp_path):
+    save_path = str(tmp_path / "a.pdf")
+    ok = run(
+        downloader,
+        server,
+        save_path,
+        [("partial", 0), ("full",)],
+        part=CONTENT[:500],
+    )
+
+    assert ok
+    assert FileHandler.requests == ["bytes=500-", None]
+    assert_saved(save_path)
+
+
+def test_200_response_overwrites_part_file(server, downloader, tmp_path):
+    save_path = str(tmp_path / "a.pdf")
+    ok = run(downloader, server, save_path, [("full",)], part=b"stale bytes")
+
+    assert ok
+    assert FileHandler.requests == ["bytes=11-"]
+    assert_saved(save_path)
+
+
+def test_expected_size_mismatch_is_rejected(server, downloader, tmp_path):
+    save_path = str(tmp_path / "a.pdf")
+    ok = run(
+        downloader, server, save_path, [("full",)], expected_size=len(CONTENT) + 100
+    )
+
+    assert not ok
+    assert FileHandler.requests == [None]
+    assert not os.path.exists(save_path)
+    assert not os.path.exists(save_path + FileDownloader.PART_SUFFIX)
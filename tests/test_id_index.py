@@ -0,0 +1,113 @@
+import struct
+
+from cninfo_db import CninfoAnnouncementDB
+from id_index import AnnouncementIdIndex
+
+
+def make_record(announcement_id):
+    return {
+        "secCode": "000001",
+        "secName": "平安银行",
+        "announcementId": str(announcement_id),
+        "announcementTitle": f"公告{announcement_id}",
+        "downloadUrl": f"http://static.cninfo.com.cn/{announcement_id}.PDF",
+        "pageColumn": "SZZB",
+        "announcementTime": "2025-07-01 00:00:00",
+    }
+
+
+def test_add_contains_and_reopen(tmp_path):
+    path = str(tmp_path / "a.ids")
+    index = AnnouncementIdIndex(path)
+    index.build(["1224000001", "1224000003"], row_count=2)
+    index.add("1224000002")
+    index.add("not-a-number")
+
+    for announcement_id in ("1224000001", "1224000002", "1224000003", "not-a-number"):
+        assert announcement_id in index
+    assert "1224000004" not in index
+    assert len(index) == 4
+    index.close()
+
+    reopened = AnnouncementIdIndex(path)
+    assert reopened.open()
+    assert reopened.row_count == 4
+    for announcement_id in ("1224000001", "1224000002", "1224000003", "not-a-number"):
+        assert announcement_id in reopened
+    assert "1224000004" not in reopened
+    reopened.close()
+
+
+def test_remove_and_reopen(tmp_path):
+    path = str(tmp_path / "a.ids")
+    index = AnnouncementIdIndex(path)
+    index.build(["1", "2", "3"], row_count=3)
+    index.add("4")
+    index.discard("2")  # 文件中的ID
+    index.discard("4")  # 尚未写回文件的ID
+    assert "2" not in index and "4" not in index
+    index.add("2")  # 删除后重新加入
+    assert "2" in index
+    index.discard("2")
+    index.close()
+
+    reopened = AnnouncementIdIndex(path)
+    assert reopened.open()
+    assert reopened.row_count == 2
+    assert [i in reopened for i in ("1", "2", "3", "4")] == [True, False, True, False]
+    reopened.close()
+
+
+def test_merge_threshold_writes_file(tmp_path):
+    path = str(tmp_path / "a.ids")
+    index = AnnouncementIdIndex(path, merge_threshold=10)
+    index.build([str(i) for i in range(0, 100, 2)], row_count=50)
+    for i in range(1, 21, 2):
+        index.add(str(i))
+
+    # 第10个新增ID触发合并，合并后内存集合清空，文件中包含全部ID
+    assert not index._pending
+    assert len(index._ids) == 60
+    assert list(index._ids) == sorted(index._ids)
+    assert all(str(i) in index for i in range(20))
+    assert "21" not in index
+
+    reopened = AnnouncementIdIndex(path)
+    assert reopened.open()
+    assert reopened.row_count == 60
+    assert all(str(i) in reopened for i in range(20))
+    reopened.close()
+    index.close()
+
+
+def test_db_rebuilds_index_when_row_count_differs(tmp_path):
+    db_path = str(tmp_path / "cninfo.db")
+    db = CninfoAnnouncementDB(db_path)
+    db.save_records([make_record(i) for i in (1, 2, 3)])
+    db.close()
+
+    # 篡改索引文件: 只保留一个错误的ID，并改写行数
+    ids_path = str(tmp_path / "cninfo.ids")
+    with open(ids_path, "wb") as f:
+        f.write(AnnouncementIdIndex.HEADER.pack(AnnouncementIdIndex.MAGIC, 7, 1))
+        f.write(struct.pack("=Q", 99))
+
+    db = CninfoAnnouncementDB(db_path)
+    assert [db.record_exists(str(i)) for i in (1, 2, 3, 99)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    db.close()
+
+    index = AnnouncementIdIndex(ids_path)
+    assert index.open()
+    assert index.row_count == 3
+    index.close()
+
+
+def test_corrupt_index_file_is_rejected(tmp_path):
+    path = tmp_path / "a.ids"
+    path.write_bytes(AnnouncementIdIndex.HEADER.pack(AnnouncementIdIndex.MAGIC, 1, 2))
+    assert not AnnouncementIdIndex(str(path)).open()
@@ -0,0 +1,104 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from rate_limiter import get_limiter
+from sse_listing import SseListingClient
+
+TOTAL = 7
+
+
+def make_bulletin(i):
+    return {
+        "SECURITY_CODE": f"{600000 + i // 3} ",
+        "SECURITY_NAME": "浦发银行",
+        "TITLE": f"公告{i}",
+        "URL": f"/disclosure/listedinfo/announcement/c/new/2025-07-01/{i}.pdf",
+        "BULLETIN_TYPE_DESC": "其他",
+        "SSEDATE": "2025-07-01",
+    }
+
+
+class ListingHandler(BaseHTTPRequestHandler):
+    """模拟公告查询接口，同一证券的公告分为一组，/jsonp返回JSONP"""
+
+    requested_pages = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        size = int(query["pageHelp.pageSize"][0])
+        page_no = int(query["pageHelp.pageNo"][0])
+        self.requested_pages.append(page_no)
+
+        rows = []
+        for i in range((page_no - 1) * size, min(TOTAL, page_no * size)):
+            if i % 3 == 0 or not rows:
+                rows.append([make_bulletin(i)])
+            else:
+                rows[-1].append(make_bulletin(i))
+        body = json.dumps(
+            {"pageHelp": {"data": rows, "total": TOTAL, "pageCount": -(-TOTAL // size)}}
+        )
+        if url.path == "/jsonp":
+            body = f"jsonpCallback12345({body})"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ListingHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    ListingHandler.requested_pages = []
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    get_limiter(base, rate=1000, max_rate=1000)
+    yield base
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_parse_response_accepts_json_and_jsonp():
+    data = {"pageHelp": {"total": 1}}
+    assert SseListingClient.parse_response(json.dumps(data)) == data
+    assert SseListingClient.parse_response(f"cb_1({json.dumps(data)});") == data
+
+
+@pytest.mark.parametrize("path", ["/json", "/jsonp"])
+def test_fetch_page_flattens_grouped_rows(server, path):
+    client = SseListingClient(base_url=server + path, site_url=server, page_size=5)
+    bulletins, page_count, total = client.fetch_page("2025-07-01", "2025-07-01")
+    client.close()
+
+    assert [b["TITLE"] for b in bulletins] == [f"公告{i}" for i in range(5)]
+    assert page_count == 2
+    assert total == TOTAL
+
+
+@pytest.mark.parametrize("path", ["/json", "/jsonp"])
+def test_iter_records_follows_pages(server, path):
+    client = SseListingClient(base_url=server + path, site_url=server, page_size=5)
+    records = list(client.iter_records("2025-07-01", "2025-07-01"))
+    client.close()
+
+    assert ListingHandler.requested_pages == [1, 2]
+    assert len(records) == TOTAL
+    assert records[0] == {
+        "stock_code": "600000",
+        "stock_name": "浦发银行",
+        "announcement_title": "公告0",
+        "announcement_type": "其他",
+        "announcement_date": "2025-07-01",
+        "announcement_url": server
+        + "/disclosure/listedinfo/announcement/c/new/2025-07-01/0.pdf",
+    }
+    assert records[-1]["announcement_title"] == f"公告{TOTAL - 1}"